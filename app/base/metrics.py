@@ -0,0 +1,67 @@
+import asyncio
+import math
+import time
+from collections import deque
+
+
+class LatencyStats:
+    """Скользящее окно последних замеров (в секундах)."""
+
+    def __init__(self, window: int = 10_000) -> None:
+        self.count = 0
+        self.total = 0.0
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self._samples.append(value)
+
+    def percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+        return ordered[index]
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": max(self._samples, default=0.0),
+        }
+
+
+class LoopLagMonitor:
+    """
+    Замеряет, на сколько позже запланированного просыпается цикл.
+
+    Большая задержка значит, что кто-то блокирует loop.
+    """
+
+    def __init__(self, interval: float = 0.01, window: int = 10_000) -> None:
+        self.interval = interval
+        self.lag = LatencyStats(window)
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.lag.add(
+                max(0.0, time.monotonic() - started - self.interval)
+            )
@@ -0,0 +1,59 @@
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    func,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.store.database.sqlalchemy_base import BaseModel
+
+
+class OutboxModel(BaseModel):
+    __tablename__ = "outbox"
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(BigInteger, nullable=False)
+    text = Column(String, nullable=False)
+    # Постоянный random_id: повторная отправка не создаст дубль в VK
+    random_id = Column(Integer, nullable=False)
+    keyboard = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    last_error = Column(String, nullable=True)
+    dead = Column(Boolean, nullable=False, default=False, server_default="false")
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (
+        # Воркеры выбирают только живые сообщения, чей срок подошел
+        Index(
+            "ix_outbox_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=dead.is_(False),
+        ),
+    )
+
+
+class VkLongPollStateModel(BaseModel):
+    __tablename__ = "vk_long_poll_state"
+
+    id = Column(Integer, primary_key=True)
+    group_id = Column(BigInteger, nullable=False, unique=True)
+    # ts, до которого все апдейты гарантированно обработаны
+    ts = Column(String, nullable=False)
+    # id недавно обработанных сообщений для отсечения повторов
+    recent_ids = Column(JSONB, nullable=False, server_default="[]")
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
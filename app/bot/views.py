@@ -0,0 +1,61 @@
+import asyncio
+import hmac
+
+from aiohttp.web import HTTPForbidden, Response
+
+from app.web.app import View
+from app.web.utils import error_json_response
+
+
+class VkCallbackView(View):
+    async def post(self):
+        try:
+            event = await self.request.json()
+        except ValueError:
+            event = None
+        if not isinstance(event, dict):
+            return error_json_response(
+                http_status=400,
+                status="bad_request",
+                message="Invalid JSON",
+                data={},
+            )
+        config = self.request.app.config.bot
+
+        if event.get("group_id") != config.group_id:
+            raise HTTPForbidden
+
+        if event.get("type") == "confirmation":
+            return Response(text=config.callback_confirmation)
+
+        # Без секрета подлинность события не проверить: маршрут открыт
+        # без сессии, и принять можно было бы чье угодно сообщение
+        secret = event.get("secret")
+        if (
+            not config.callback_secret
+            or not isinstance(secret, str)
+            or not hmac.compare_digest(
+                secret.encode(), config.callback_secret.encode()
+            )
+        ):
+            raise HTTPForbidden
+
+        # VK повторяет событие, если не дождался "ok" вовремя или получил
+        # 503; повтор уже принятого подтверждаем, но в очередь не ставим
+        event_id = event.get("event_id")
+        seen = self.store.vk_api.callback_events
+        if event_id is not None and event_id in seen:
+            return Response(text="ok")
+
+        # Отвечаем сразу, обработка идет в общем конвейере BotManager
+        update = self.store.vk_api.parser.parse(event)
+        if update is not None:
+            try:
+                self.store.bots_manager.queue.put_nowait([update])
+            except asyncio.QueueFull:
+                # Не "ok" - VK повторит доставку события позже
+                return Response(status=503, text="busy")
+
+        if event_id is not None:
+            seen.add(event_id)
+        return Response(text="ok")
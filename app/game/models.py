@@ -0,0 +1,147 @@
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.store.database.sqlalchemy_base import BaseModel
+
+
+class GameModel(BaseModel):
+    """
+    Снимок состояния игры.
+
+    Живое состояние хранится в памяти (app.store.game) и сбрасывается
+    сюда пачками.
+    """
+
+    __tablename__ = "games"
+
+    id = Column(BigInteger, primary_key=True)
+    peer_id = Column(BigInteger, nullable=False)
+    # Без внешних ключей на themes/questions: тему или вопрос могут
+    # удалить посреди игры, и снимок не должен из-за этого падать
+    theme_id = Column(Integer, nullable=True)
+    # active или finished
+    status = Column(String(16), nullable=False, default="active")
+    round = Column(Integer, nullable=False, default=0)
+    question_id = Column(Integer, nullable=True)
+    asked_question_ids = Column(
+        JSONB, nullable=False, default=list, server_default="[]"
+    )
+    # Игроки, уже ответившие в текущем раунде
+    answered_vk_ids = Column(
+        JSONB, nullable=False, default=list, server_default="[]"
+    )
+    round_deadline = Column(DateTime(timezone=True), nullable=True)
+    started_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        # При восстановлении читаются только незавершенные игры
+        Index(
+            "ix_games_active_peer_id",
+            "peer_id",
+            unique=True,
+            postgresql_where=text("status = 'active'"),
+        ),
+    )
+
+
+class PlayerModel(BaseModel):
+    __tablename__ = "players"
+
+    id = Column(BigInteger, primary_key=True)
+    vk_id = Column(BigInteger, nullable=False, unique=True)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class ScoreModel(BaseModel):
+    __tablename__ = "scores"
+
+    id = Column(BigInteger, primary_key=True)
+    game_id = Column(
+        BigInteger,
+        ForeignKey("games.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    player_id = Column(
+        BigInteger,
+        ForeignKey("players.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    points = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (UniqueConstraint("game_id", "player_id"),)
+
+
+class AnswerEventModel(BaseModel):
+    """
+    Журнал ответов игроков.
+
+    Только добавление: пишется COPY пачками, читается только сверткой
+    в question_stats.
+    """
+
+    __tablename__ = "answer_events"
+
+    id = Column(BigInteger, primary_key=True)
+    question_id = Column(Integer, nullable=False)
+    peer_id = Column(BigInteger, nullable=False)
+    vk_id = Column(BigInteger, nullable=False)
+    is_correct = Column(Boolean, nullable=False)
+    # От показа вопроса до ответа
+    answer_time_ms = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class QuestionStatsModel(BaseModel):
+    __tablename__ = "question_stats"
+
+    id = Column(Integer, primary_key=True)
+    question_id = Column(Integer, nullable=False, unique=True)
+    attempts = Column(BigInteger, nullable=False, default=0)
+    correct = Column(BigInteger, nullable=False, default=0)
+    total_answer_time_ms = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+
+class RollupWatermarkModel(BaseModel):
+    """До какого события журнал уже свернут в агрегаты."""
+
+    __tablename__ = "rollup_watermarks"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(64), nullable=False, unique=True)
+    last_event_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
@@ -0,0 +1,43 @@
+from marshmallow import (
+    Schema,
+    ValidationError,
+    fields,
+    validate,
+    validates_schema,
+)
+
+
+class LeaderboardQuerySchema(Schema):
+    scope = fields.Str(
+        required=False,
+        load_default="global",
+        validate=validate.OneOf(["global", "chat", "theme"]),
+    )
+    # peer_id чата или id темы
+    id = fields.Int(required=False)
+    vk_id = fields.Int(required=False)
+    limit = fields.Int(
+        required=False, load_default=10, validate=validate.Range(min=1, max=100)
+    )
+    offset = fields.Int(
+        required=False, load_default=0, validate=validate.Range(min=0)
+    )
+
+    @validates_schema
+    def check_id(self, data, **kwargs):
+        if data["scope"] != "global" and "id" not in data:
+            raise ValidationError("id is required for this scope", "id")
+
+
+class LeaderboardEntrySchema(Schema):
+    rank = fields.Int()
+    vk_id = fields.Int()
+    score = fields.Int()
+
+
+class LeaderboardSchema(Schema):
+    scope = fields.Str()
+    id = fields.Int(allow_none=True)
+    total = fields.Int()
+    players = fields.Nested(LeaderboardEntrySchema, many=True)
+    player = fields.Nested(LeaderboardEntrySchema, allow_none=True)
@@ -0,0 +1,43 @@
+from aiohttp_apispec import querystring_schema, response_schema
+
+from app.game.schemes import LeaderboardQuerySchema, LeaderboardSchema
+from app.web.app import View
+from app.web.utils import json_response
+
+
+class LeaderboardView(View):
+    @querystring_schema(LeaderboardQuerySchema)
+    @response_schema(LeaderboardSchema)
+    async def get(self):
+        params = LeaderboardQuerySchema().load(self.request.query)
+        board = self.store.leaderboard.board(params["scope"], params.get("id"))
+
+        players, player, total = [], None, 0
+        if board is not None:
+            total = len(board)
+            players = [
+                {"rank": rank, "vk_id": vk_id, "score": score}
+                for rank, vk_id, score in board.top(
+                    params["limit"], params["offset"]
+                )
+            ]
+            vk_id = params.get("vk_id")
+            rank = None if vk_id is None else board.rank(vk_id)
+            if rank is not None:
+                player = {
+                    "rank": rank,
+                    "vk_id": vk_id,
+                    "score": board.scores[vk_id],
+                }
+
+        return json_response(
+            data=LeaderboardSchema().dump(
+                {
+                    "scope": params["scope"],
+                    "id": params.get("id"),
+                    "total": total,
+                    "players": players,
+                    "player": player,
+                }
+            )
+        )
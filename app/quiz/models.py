@@ -1,17 +1,46 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Boolean,
+    Column,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    event,
+    func,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from app.store.database.sqlalchemy_base import BaseModel
 
+# Конфигурация 'simple' не зависит от языка: вопросы бывают и на русском,
+# и на английском, поэтому обходимся без стемминга
+SEARCH_CONFIG = "simple"
+
 
 class ThemeModel(BaseModel):
     __tablename__ = "themes"
     
     id = Column(Integer, primary_key=True)
     title = Column(String, unique=True, nullable=False)
+    # Денормализованный счетчик, поддерживается триггерами на questions
+    question_count = Column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
     
     # Связь с вопросами
-    questions = relationship("QuestionModel", back_populates="theme", cascade="all, delete-orphan")
+    # Удаление каскадом выполняет сама БД (ON DELETE CASCADE),
+    # ORM не подгружает дочерние записи перед DELETE
+    questions = relationship(
+        "QuestionModel",
+        back_populates="theme",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
 
 class QuestionModel(BaseModel):
@@ -19,11 +48,46 @@ class QuestionModel(BaseModel):
     
     id = Column(Integer, primary_key=True)
     title = Column(String, unique=True, nullable=False)
-    theme_id = Column(Integer, ForeignKey("themes.id", ondelete="CASCADE"), nullable=False)
+    theme_id = Column(
+        Integer,
+        ForeignKey("themes.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
     
+    # Копия ответов для чтения без второго запроса; источник истины - answers
+    answers_snapshot = deferred(Column(JSONB, nullable=True))
+
+    # Вычисляемое поле нужно только для поиска, в обычных выборках не грузим
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(f"to_tsvector('{SEARCH_CONFIG}', title)", persisted=True),
+        )
+    )
+
     # Связи
     theme = relationship("ThemeModel", back_populates="questions")
-    answers = relationship("AnswerModel", back_populates="question", cascade="all, delete-orphan")
+    answers = relationship(
+        "AnswerModel",
+        back_populates="question",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_questions_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_questions_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
 
 
 class AnswerModel(BaseModel):
@@ -32,7 +96,94 @@ class AnswerModel(BaseModel):
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
     is_correct = Column(Boolean, nullable=False)
-    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
+    question_id = Column(
+        Integer,
+        ForeignKey("questions.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
     
     # Связь
-    question = relationship("QuestionModel", back_populates="answers")
\ No newline at end of file
+    question = relationship("QuestionModel", back_populates="answers")
+
+
+class QuestionDeletionModel(BaseModel):
+    """
+    Журнал удаленных вопросов.
+
+    По нему банк вопросов каждого воркера узнает об удалениях,
+    сделанных через API другого воркера. Удаление темы записывается
+    одной строкой с theme_id, удаление вопросов - строкой на вопрос.
+    Записи старше bank.DELETIONS_RETENTION вычищает следующее удаление.
+    """
+
+    __tablename__ = "question_deletions"
+
+    id = Column(BigInteger, primary_key=True)
+    # Без внешних ключей: вопроса или темы уже нет
+    question_id = Column(Integer, nullable=True)
+    theme_id = Column(Integer, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+# Триграммный индекс требует расширения pg_trgm
+event.listen(
+    BaseModel.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+)
+
+
+# Триггеры уровня оператора: одна корректировка счетчика на тему
+# за весь INSERT/DELETE, даже при массовых операциях
+QUESTION_COUNT_FUNCTION = """
+CREATE OR REPLACE FUNCTION themes_question_count_{name}()
+RETURNS trigger AS $$
+BEGIN
+    UPDATE themes AS t
+    SET question_count = t.question_count + d.delta
+    FROM (
+        SELECT theme_id, sum(delta) AS delta
+        FROM ({changes}) AS changes
+        GROUP BY theme_id
+        HAVING sum(delta) <> 0
+    ) AS d
+    WHERE t.id = d.theme_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+QUESTION_COUNT_TRIGGER = """
+CREATE TRIGGER questions_count_{name}
+AFTER {event} ON questions
+REFERENCING {tables}
+FOR EACH STATEMENT EXECUTE FUNCTION themes_question_count_{name}()
+"""
+INSERTED_QUESTIONS = "SELECT theme_id, 1 AS delta FROM new_questions"
+DELETED_QUESTIONS = "SELECT theme_id, -1 AS delta FROM old_questions"
+
+for name, changes, tables in (
+    ("insert", INSERTED_QUESTIONS, "NEW TABLE AS new_questions"),
+    ("delete", DELETED_QUESTIONS, "OLD TABLE AS old_questions"),
+    (
+        "update",
+        f"{INSERTED_QUESTIONS} UNION ALL {DELETED_QUESTIONS}",
+        "OLD TABLE AS old_questions NEW TABLE AS new_questions",
+    ),
+):
+    event.listen(
+        QuestionModel.__table__,
+        "after_create",
+        DDL(QUESTION_COUNT_FUNCTION.format(name=name, changes=changes)),
+    )
+    event.listen(
+        QuestionModel.__table__,
+        "after_create",
+        DDL(
+            QUESTION_COUNT_TRIGGER.format(
+                name=name, event=name.upper(), tables=tables
+            )
+        ),
+    )
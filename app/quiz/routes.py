@@ -3,7 +3,12 @@ import typing
 from app.quiz.views import (
     QuestionAddView,
     QuestionListView,
+    QuestionsDeleteView,
+    QuestionSearchView,
+    QuestionsGetView,
+    QuestionStatsView,
     ThemeAddView,
+    ThemeDeleteView,
     ThemeListView,
 )
 
@@ -14,5 +19,10 @@ if typing.TYPE_CHECKING:
 def setup_routes(app: "Application"):
     app.router.add_view("/quiz.add_theme", ThemeAddView)
     app.router.add_view("/quiz.list_themes", ThemeListView)
+    app.router.add_view("/quiz.delete_theme", ThemeDeleteView)
     app.router.add_view("/quiz.add_question", QuestionAddView)
     app.router.add_view("/quiz.list_questions", QuestionListView)
+    app.router.add_view("/quiz.search_questions", QuestionSearchView)
+    app.router.add_view("/quiz.get_questions", QuestionsGetView)
+    app.router.add_view("/quiz.delete_questions", QuestionsDeleteView)
+    app.router.add_view("/quiz.question_stats", QuestionStatsView)
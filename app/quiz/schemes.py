@@ -4,6 +4,7 @@ from marshmallow import Schema, fields, validate, pre_load, ValidationError
 class ThemeSchema(Schema):
     id = fields.Int(required=False)
     title = fields.Str(required=True, validate=validate.Length(min=1))
+    question_count = fields.Int(dump_only=True)
 
 
 class AnswerSchema(Schema):
@@ -44,4 +45,85 @@ class ThemeIdSchema(Schema):
 
 
 class ListQuestionSchema(Schema):
-    questions = fields.Nested(QuestionSchema, many=True)
\ No newline at end of file
+    questions = fields.Nested(QuestionSchema, many=True)
+
+
+class SearchQuestionsQuerySchema(Schema):
+    query = fields.Str(required=True, validate=validate.Length(min=1))
+    theme_id = fields.Int(required=False)
+    limit = fields.Int(
+        required=False, load_default=20, validate=validate.Range(min=1, max=100)
+    )
+    offset = fields.Int(
+        required=False, load_default=0, validate=validate.Range(min=0)
+    )
+
+
+class SearchQuestionsSchema(Schema):
+    questions = fields.Nested(QuestionSchema, many=True)
+    limit = fields.Int()
+    offset = fields.Int()
+
+
+class ThemeDeleteSchema(Schema):
+    theme_id = fields.Int(required=True)
+
+
+class QuestionsDeleteSchema(Schema):
+    ids = fields.List(
+        fields.Int(), required=True, validate=validate.Length(min=1)
+    )
+
+
+class QuestionIdsSchema(Schema):
+    ids = fields.List(
+        fields.Int(), required=True, validate=validate.Length(min=1, max=1000)
+    )
+
+
+class QuestionsDeletedSchema(Schema):
+    questions = fields.Int()
+    answers = fields.Int()
+
+
+class ThemeDeletedSchema(QuestionsDeletedSchema):
+    themes = fields.Int()
+
+
+class QuestionsByIdsSchema(Schema):
+    questions = fields.Nested(QuestionSchema, many=True)
+    missing_ids = fields.List(fields.Int())
+
+
+class QuestionStatsQuerySchema(Schema):
+    question_id = fields.Int(required=False)
+    min_attempts = fields.Int(
+        required=False, load_default=1, validate=validate.Range(min=1)
+    )
+    limit = fields.Int(
+        required=False, load_default=20, validate=validate.Range(min=1, max=100)
+    )
+    offset = fields.Int(
+        required=False, load_default=0, validate=validate.Range(min=0)
+    )
+
+
+class QuestionStatSchema(Schema):
+    question_id = fields.Int()
+    attempts = fields.Int()
+    correct = fields.Int()
+    correct_rate = fields.Method("get_correct_rate")
+    avg_answer_time_ms = fields.Method("get_avg_answer_time_ms")
+    updated_at = fields.DateTime()
+
+    def get_correct_rate(self, obj) -> float:
+        return round(obj.correct / obj.attempts, 4)
+
+    def get_avg_answer_time_ms(self, obj) -> int:
+        return obj.total_answer_time_ms // obj.attempts
+
+
+class QuestionStatsSchema(Schema):
+    stats = fields.Nested(QuestionStatSchema, many=True)
+    limit = fields.Int()
+    offset = fields.Int()
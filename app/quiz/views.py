@@ -4,7 +4,17 @@ from marshmallow import ValidationError
 
 from app.quiz.schemes import (
     ListQuestionSchema,
+    QuestionIdsSchema,
     QuestionSchema,
+    QuestionsByIdsSchema,
+    QuestionsDeletedSchema,
+    QuestionsDeleteSchema,
+    QuestionStatsQuerySchema,
+    QuestionStatsSchema,
+    SearchQuestionsQuerySchema,
+    SearchQuestionsSchema,
+    ThemeDeletedSchema,
+    ThemeDeleteSchema,
     ThemeIdSchema,
     ThemeListSchema,
     ThemeSchema,
@@ -95,4 +105,91 @@ class QuestionListView(View):
             theme_id = int(theme_id)
         
         questions = await self.store.quizzes.list_questions(theme_id)
-        return json_response(data=ListQuestionSchema().dump({"questions": questions}))
\ No newline at end of file
+        return json_response(data=ListQuestionSchema().dump({"questions": questions}))
+
+
+class QuestionSearchView(View):
+    @querystring_schema(SearchQuestionsQuerySchema)
+    @response_schema(SearchQuestionsSchema)
+    async def get(self):
+        params = SearchQuestionsQuerySchema().load(self.request.query)
+
+        questions = await self.store.quizzes.search_questions(
+            query=params["query"],
+            theme_id=params.get("theme_id"),
+            limit=params["limit"],
+            offset=params["offset"],
+        )
+        return json_response(
+            data=SearchQuestionsSchema().dump(
+                {
+                    "questions": questions,
+                    "limit": params["limit"],
+                    "offset": params["offset"],
+                }
+            )
+        )
+
+
+class ThemeDeleteView(View):
+    @request_schema(ThemeDeleteSchema)
+    @response_schema(ThemeDeletedSchema)
+    async def post(self):
+        deleted = await self.store.quizzes.delete_theme(self.data["theme_id"])
+        if not deleted["themes"]:
+            return error_json_response(
+                http_status=404,
+                status="not_found",
+                message="Theme not found",
+                data={}
+            )
+
+        return json_response(data=ThemeDeletedSchema().dump(deleted))
+
+
+class QuestionsDeleteView(View):
+    @request_schema(QuestionsDeleteSchema)
+    @response_schema(QuestionsDeletedSchema)
+    async def post(self):
+        deleted = await self.store.quizzes.delete_questions(self.data["ids"])
+        return json_response(data=QuestionsDeletedSchema().dump(deleted))
+
+
+class QuestionsGetView(View):
+    @request_schema(QuestionIdsSchema)
+    @response_schema(QuestionsByIdsSchema)
+    async def post(self):
+        ids = self.data["ids"]
+        questions = await self.store.quizzes.get_questions_by_ids(ids)
+
+        found = {question.id for question in questions}
+        missing_ids = list(dict.fromkeys(id_ for id_ in ids if id_ not in found))
+        return json_response(
+            data=QuestionsByIdsSchema().dump(
+                {"questions": questions, "missing_ids": missing_ids}
+            )
+        )
+
+
+class QuestionStatsView(View):
+    @querystring_schema(QuestionStatsQuerySchema)
+    @response_schema(QuestionStatsSchema)
+    async def get(self):
+        params = QuestionStatsQuerySchema().load(self.request.query)
+
+        # Только агрегаты: журнал ответов сюда не читается
+        stats = await self.store.analytics.get_stats(
+            question_id=params.get("question_id"),
+            min_attempts=params["min_attempts"],
+            limit=params["limit"],
+            offset=params["offset"],
+        )
+        return json_response(
+            data=QuestionStatsSchema().dump(
+                {
+                    "stats": stats,
+                    "limit": params["limit"],
+                    "offset": params["offset"],
+                }
+            )
+        )
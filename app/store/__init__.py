@@ -1,8 +1,14 @@
 from typing import TYPE_CHECKING
 
 from app.store.admin.accessor import AdminAccessor
+from app.store.game.analytics import AnswerAnalytics
+from app.store.game.engine import GameEngine
+from app.store.game.leaderboard import Leaderboard
+from app.store.outbox.accessor import OutboxAccessor
 from app.store.quiz.accessor import QuizAccessor
+from app.store.quiz.bank import QuestionBank
 from app.store.vk_api.accessor import VkApiAccessor
+from app.store.bot.leader import LeaderElection
 from app.store.bot.manager import BotManager
 from app.store.database.database import Database
 
@@ -15,8 +21,17 @@ class Store:
         self.app = app
         self.admins = AdminAccessor(app)
         self.quizzes = QuizAccessor(app)
+        self.question_bank = QuestionBank(app)
         self.vk_api = VkApiAccessor(app)
+        self.outbox = OutboxAccessor(app)
+        self.leaderboard = Leaderboard(app)
+        self.analytics = AnswerAnalytics(app)
+        self.games = GameEngine(app)
         self.bots_manager = BotManager(app)
+        # Несколько воркеров: игры и прием апдейтов только у лидера
+        self.leader: LeaderElection | None = None
+        if app.config.server.workers != 1:
+            self.leader = LeaderElection(app, [self.games, self.vk_api])
 
 
 def setup_store(app: "Application"):
@@ -0,0 +1,77 @@
+import asyncio
+from asyncio import Future, Task
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.store import Store
+
+
+class UpdatesConsumer:
+    def __init__(self, store: "Store", drain_timeout: float = 10) -> None:
+        self.store = store
+        self.drain_timeout = drain_timeout
+        self.is_running = False
+        self.consume_task: Task | None = None
+
+    def _done_callback(self, result: Future) -> None:
+        if result.cancelled():
+            return
+        if result.exception():
+            self.store.app.logger.exception(
+                "consumer stopped with exception", exc_info=result.exception()
+            )
+        if self.is_running:
+            self.start()
+
+    def start(self) -> None:
+        self.is_running = True
+        self.consume_task = asyncio.create_task(self.consume())
+        self.consume_task.add_done_callback(self._done_callback)
+
+    async def stop(self) -> None:
+        self.is_running = False
+        if not self.consume_task:
+            return
+
+        # Даем дообработать то, что уже принято из long poll
+        try:
+            await asyncio.wait_for(
+                self.store.bots_manager.queue.join(), self.drain_timeout
+            )
+        except TimeoutError:
+            self.store.app.logger.warning("updates queue was not drained")
+
+        self.consume_task.cancel()
+        try:
+            await self.consume_task
+        except asyncio.CancelledError:
+            pass
+
+    async def consume(self) -> None:
+        queue = self.store.bots_manager.queue
+        while True:
+            batch = await queue.get()
+            try:
+                # Не ждем окончания обработки: пачки разных чатов
+                # не должны задерживать друг друга
+                futures = await self.store.bots_manager.dispatch_updates(
+                    batch.updates
+                )
+            except Exception:
+                self.store.app.logger.exception("Handling error")
+                futures = []
+            finally:
+                queue.task_done()
+
+            if batch.done is not None:
+                self._complete_when_handled(batch.done, futures)
+
+    @staticmethod
+    def _complete_when_handled(
+        done: asyncio.Future, futures: list[asyncio.Future]
+    ) -> None:
+        def on_handled(_: asyncio.Future) -> None:
+            if not done.done():
+                done.set_result(None)
+
+        asyncio.gather(*futures).add_done_callback(on_handled)
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from logging import getLogger
+from typing import Any
+
+
+class _Worker:
+    __slots__ = ("busy", "last_active", "queue", "task")
+
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue[tuple[Any, asyncio.Future]] = asyncio.Queue()
+        self.task: asyncio.Task | None = None
+        self.busy = False
+        self.last_active = time.monotonic()
+
+
+class Dispatcher:
+    """
+    Параллельная обработка апдейтов с порядком внутри одного чата.
+
+    Апдейты разных ключей (чатов) обрабатываются параллельно, одного
+    ключа - строго по порядку. На каждый активный ключ заводится
+    отдельная задача-воркер со своей очередью. Общее число одновременно
+    выполняемых обработчиков ограничено concurrency, число принятых, но
+    не обработанных апдейтов - max_pending. Простаивающие воркеры
+    завершаются через idle_timeout.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[None]],
+        concurrency: int = 100,
+        max_pending: int = 10_000,
+        idle_timeout: float = 60,
+    ) -> None:
+        self.handler = handler
+        self.idle_timeout = idle_timeout
+        self.logger = getLogger("dispatcher")
+
+        self._concurrency = asyncio.Semaphore(concurrency)
+        self._pending = asyncio.Semaphore(max_pending)
+        self._workers: dict[Hashable, _Worker] = {}
+        self._reaper: asyncio.Task | None = None
+        self.handled = 0
+        self.reaped = 0
+
+    @property
+    def active_workers(self) -> int:
+        return len(self._workers)
+
+    async def submit(self, key: Hashable, item: Any) -> asyncio.Future:
+        # Ждем, если принято слишком много необработанных апдейтов
+        await self._pending.acquire()
+
+        worker = self._workers.get(key)
+        if worker is None:
+            worker = self._spawn(key)
+
+        future = asyncio.get_running_loop().create_future()
+        worker.queue.put_nowait((item, future))
+        return future
+
+    def _spawn(self, key: Hashable) -> _Worker:
+        worker = _Worker()
+        worker.task = asyncio.create_task(self._run(worker))
+        self._workers[key] = worker
+
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap())
+        return worker
+
+    async def _run(self, worker: _Worker) -> None:
+        while True:
+            item, future = await worker.queue.get()
+            worker.busy = True
+            try:
+                async with self._concurrency:
+                    await self.handler(item)
+            except Exception:
+                self.logger.exception("Handling error")
+            finally:
+                worker.busy = False
+                worker.last_active = time.monotonic()
+                self.handled += 1
+                self._pending.release()
+                worker.queue.task_done()
+                if not future.done():
+                    future.set_result(None)
+
+    async def _reap(self) -> None:
+        while self._workers:
+            await asyncio.sleep(self.idle_timeout / 2)
+            deadline = time.monotonic() - self.idle_timeout
+            for key, worker in list(self._workers.items()):
+                # Воркер ждет на пустой очереди - отмена безопасна
+                if (
+                    not worker.busy
+                    and worker.queue.empty()
+                    and worker.last_active < deadline
+                ):
+                    worker.task.cancel()
+                    del self._workers[key]
+                    self.reaped += 1
+
+    async def join(self) -> None:
+        for worker in list(self._workers.values()):
+            await worker.queue.join()
+
+    async def stop(self, timeout: float = 10) -> None:
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except TimeoutError:
+            self.logger.warning("dispatcher was not drained")
+
+        tasks = [worker.task for worker in self._workers.values()]
+        if self._reaper:
+            tasks.append(self._reaper)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._workers.clear()
+        self._reaper = None
+
+    def stats(self) -> dict:
+        return {
+            "active_workers": self.active_workers,
+            "handled": self.handled,
+            "reaped": self.reaped,
+        }
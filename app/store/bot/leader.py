@@ -0,0 +1,152 @@
+import asyncio
+import os
+from typing import TYPE_CHECKING
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.base.base_accessor import BaseAccessor
+
+if TYPE_CHECKING:
+    from app.web.app import Application
+
+# Первая половина ключа advisory-блокировки, вторая - id группы VK
+LOCK_NAMESPACE = 0x564B
+
+
+async def try_lock(connection: AsyncConnection, group_id: int) -> bool:
+    locked = await connection.scalar(
+        select(func.pg_try_advisory_lock(LOCK_NAMESPACE, group_id))
+    )
+    # Блокировка уровня сессии переживает коммит, а открытая
+    # транзакция держала бы снимок БД все время лидерства
+    await connection.commit()
+    return bool(locked)
+
+
+class LeaderElection(BaseAccessor):
+    """
+    Выбор единственного воркера, который принимает апдейты VK.
+
+    Каждый воркер держит отдельное соединение с БД и раз в
+    election_interval пытается взять advisory-блокировку по id группы.
+    Лидер запускает components, остальные только обслуживают HTTP.
+    Блокировка уровня сессии снимается сервером вместе с соединением,
+    в том числе когда лидер падает, и ее забирает следующий воркер.
+    Лидер, у которого соединение оборвалось, сразу останавливает
+    components, не дожидаясь, пока его место займут.
+    """
+
+    def __init__(
+        self,
+        app: "Application",
+        components: list[BaseAccessor],
+        *args,
+        **kwargs,
+    ):
+        super().__init__(app, *args, **kwargs)
+        self.components = components
+        self.connection: AsyncConnection | None = None
+        self.is_leader = False
+        self._started: list[BaseAccessor] = []
+        self._task: asyncio.Task | None = None
+
+        # Компоненты запускает и останавливает только лидер; при
+        # остановке приложения он слагает полномочия там же, где раньше
+        # останавливался первый из них
+        first = min(app.on_cleanup.index(c.disconnect) for c in components)
+        for component in components:
+            app.on_startup.remove(component.connect)
+            app.on_cleanup.remove(component.disconnect)
+        app.on_cleanup.remove(self.disconnect)
+        app.on_cleanup.insert(first, self.disconnect)
+
+    async def connect(self, app: "Application") -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def disconnect(self, app: "Application") -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._step_down()
+        await self._close()
+
+    async def _run(self) -> None:
+        config = self.app.config.server
+        loop = asyncio.get_running_loop()
+        refreshed_at = loop.time()
+        while True:
+            try:
+                # Зависший запрос к БД считается потерей соединения
+                elected = await asyncio.wait_for(
+                    self._elect(), config.election_interval
+                )
+                if elected:
+                    await self._lead()
+            except Exception:
+                self.logger.exception("leader election error")
+                await self._step_down()
+                await self._close()
+
+            interval = config.leaderboard_refresh_interval
+            if (
+                not self.is_leader
+                and interval
+                and loop.time() - refreshed_at >= interval
+            ):
+                # Очки меняет только лидер, остальным рейтинг достается
+                # из БД с задержкой
+                refreshed_at = loop.time()
+                try:
+                    await self.app.store.leaderboard.load()
+                except Exception:
+                    self.logger.exception("leaderboard refresh error")
+
+            await asyncio.sleep(config.election_interval)
+
+    async def _elect(self) -> bool:
+        """Пробует стать лидером; True, если воркер только что им стал."""
+        if self.connection is None:
+            self.connection = await self.app.database.engine.connect()
+
+        if self.is_leader:
+            # Блокировка жива, пока живо соединение
+            await self.connection.scalar(select(1))
+            await self.connection.commit()
+            return False
+
+        return await try_lock(self.connection, self.app.config.bot.group_id)
+
+    async def _lead(self) -> None:
+        self.is_leader = True
+        self.logger.info("worker %d is the bot leader", os.getpid())
+        # Пока этот воркер не был лидером, рейтинг менял другой
+        await self.app.store.leaderboard.load()
+        for component in self.components:
+            await component.connect(self.app)
+            self._started.append(component)
+
+    async def _step_down(self) -> None:
+        if not self.is_leader:
+            return
+        self.is_leader = False
+        self.logger.info("worker %d is no longer the bot leader", os.getpid())
+        while self._started:
+            component = self._started.pop()
+            try:
+                await component.disconnect(self.app)
+            except Exception:
+                self.logger.exception("component stop error")
+
+    async def _close(self) -> None:
+        if self.connection is None:
+            return
+        connection, self.connection = self.connection, None
+        try:
+            # Соединение не возвращается в пул: если блокировка еще
+            # держится, она снимется вместе с ним
+            await connection.invalidate()
+            await connection.close()
+        except Exception:
+            self.logger.exception("leader connection close error")
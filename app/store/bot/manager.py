@@ -1,6 +1,12 @@
+import asyncio
 import typing
 from logging import getLogger
 
+from app.store.bot.consumer import UpdatesConsumer
+from app.store.bot.dispatcher import Dispatcher
+from app.store.bot.queue import UpdatesQueue
+from app.store.game.state import RoundTimeout
+from app.store.outbox.worker import OutboxWorkerPool
 from app.store.vk_api.dataclasses import Message, Update
 
 if typing.TYPE_CHECKING:
@@ -12,12 +18,73 @@ class BotManager:
         self.app = app
         self.bot = None
         self.logger = getLogger("handler")
+        # Poller только кладет апдейты в очередь, обработка идет
+        # в отдельной задаче и не задерживает следующий long poll
+        self.queue = UpdatesQueue(app.config.bot.queue_size)
+        self.consumer: UpdatesConsumer | None = None
+        self.outbox_workers: OutboxWorkerPool | None = None
+        # Разные чаты обрабатываются параллельно, один чат - по порядку
+        self.dispatcher = Dispatcher(
+            self.handle_update,
+            concurrency=app.config.bot.concurrency,
+            max_pending=app.config.bot.max_pending,
+            idle_timeout=app.config.bot.worker_idle_timeout,
+        )
+
+    def start(self) -> None:
+        self.consumer = UpdatesConsumer(self.app.store)
+        self.consumer.start()
+
+        if self.app.config.outbox.enabled:
+            self.outbox_workers = OutboxWorkerPool(self.app.store)
+            self.outbox_workers.start()
+
+    async def stop(self) -> None:
+        if self.consumer:
+            await self.consumer.stop()
+        await self.dispatcher.stop()
+
+        if self.outbox_workers:
+            await self.outbox_workers.stop()
+            self.outbox_workers = None
+
+    async def reply(self, message: Message) -> None:
+        # С outbox ответ переживет падение процесса и ретраи не идут
+        # из цикла обработки апдейтов
+        if self.app.config.outbox.enabled:
+            await self.app.store.outbox.enqueue([message])
+        else:
+            await self.app.store.vk_api.send_message(message)
+
+    @staticmethod
+    def chat_key(update: Update | RoundTimeout) -> int:
+        if isinstance(update, RoundTimeout):
+            return update.peer_id
+        message = update.object.message
+        return message.peer_id or message.from_id
+
+    async def dispatch_updates(
+        self, updates: list[Update | RoundTimeout]
+    ) -> list[asyncio.Future]:
+        return [
+            await self.dispatcher.submit(self.chat_key(update), update)
+            for update in updates
+        ]
 
     async def handle_updates(self, updates: list[Update]):
-        for update in updates:
-            await self.app.store.vk_api.send_message(
-                Message(
-                    user_id=update.object.message.from_id,
-                    text="Привет!",
-                )
+        await asyncio.gather(*await self.dispatch_updates(updates))
+
+    async def handle_update(self, update: Update | RoundTimeout) -> None:
+        games = self.app.store.games
+        if isinstance(update, RoundTimeout):
+            messages = await games.handle_timeout(update)
+        else:
+            message = update.object.message
+            messages = await games.handle_message(
+                peer_id=message.peer_id or message.from_id,
+                from_id=message.from_id,
+                text=message.text,
             )
+
+        for message in messages:
+            await self.reply(message)
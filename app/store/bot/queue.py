@@ -0,0 +1,82 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from app.base.metrics import LatencyStats
+from app.store.vk_api.dataclasses import Update
+
+
+@dataclass
+class QueueMetrics:
+    enqueued: int = 0
+    dequeued: int = 0
+    # Сколько раз продюсер ждал свободного места (backpressure)
+    blocked_puts: int = 0
+    max_depth: int = 0
+    # Время от постановки пачки в очередь до начала ее обработки
+    lag: LatencyStats = field(default_factory=LatencyStats)
+
+
+class UpdatesBatch:
+    __slots__ = ("done", "enqueued_at", "updates")
+
+    def __init__(
+        self, updates: list[Update], done: asyncio.Future | None = None
+    ) -> None:
+        self.updates = updates
+        # Завершается, когда обработаны все апдейты пачки
+        self.done = done
+        self.enqueued_at = time.monotonic()
+
+
+class UpdatesQueue:
+    """Ограниченная очередь пачек апдейтов между Poller и BotManager."""
+
+    def __init__(self, maxsize: int) -> None:
+        self._queue: asyncio.Queue[UpdatesBatch] = asyncio.Queue(maxsize)
+        self.metrics = QueueMetrics()
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _on_put(self) -> None:
+        self.metrics.enqueued += 1
+        self.metrics.max_depth = max(self.metrics.max_depth, self.depth)
+
+    async def put(
+        self, updates: list[Update], done: asyncio.Future | None = None
+    ) -> None:
+        if self._queue.full():
+            self.metrics.blocked_puts += 1
+        await self._queue.put(UpdatesBatch(updates, done))
+        self._on_put()
+
+    def put_nowait(
+        self, updates: list[Update], done: asyncio.Future | None = None
+    ) -> None:
+        # Бросает asyncio.QueueFull, если места нет
+        self._queue.put_nowait(UpdatesBatch(updates, done))
+        self._on_put()
+
+    async def get(self) -> UpdatesBatch:
+        batch = await self._queue.get()
+        self.metrics.dequeued += 1
+        self.metrics.lag.add(time.monotonic() - batch.enqueued_at)
+        return batch
+
+    def task_done(self) -> None:
+        self._queue.task_done()
+
+    async def join(self) -> None:
+        await self._queue.join()
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "enqueued": self.metrics.enqueued,
+            "dequeued": self.metrics.dequeued,
+            "blocked_puts": self.metrics.blocked_puts,
+            "max_depth": self.metrics.max_depth,
+            "lag": self.metrics.lag.snapshot(),
+        }
@@ -0,0 +1,308 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, NamedTuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.base.base_accessor import BaseAccessor
+
+if TYPE_CHECKING:
+    from app.game.models import QuestionStatsModel
+    from app.web.app import Application
+
+ROLLUP_NAME = "question_stats"
+ROLLUP_BATCH = 100_000
+
+
+class AnswerEvent(NamedTuple):
+    # Порядок полей совпадает с EVENT_COLUMNS: кортеж уходит в COPY как есть
+    question_id: int
+    peer_id: int
+    vk_id: int
+    is_correct: bool
+    answer_time_ms: int
+    created_at: datetime
+
+
+EVENT_COLUMNS = AnswerEvent._fields
+
+
+class EventRing:
+    """
+    Кольцевой буфер фиксированного размера.
+
+    Запись - O(1) без аллокаций, при переполнении затираются самые
+    старые события.
+    """
+
+    __slots__ = ("buffer", "count", "dropped", "head")
+
+    def __init__(self, capacity: int) -> None:
+        self.buffer: list[AnswerEvent | None] = [None] * capacity
+        self.head = 0
+        self.count = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def push(self, event: AnswerEvent) -> None:
+        capacity = len(self.buffer)
+        self.buffer[(self.head + self.count) % capacity] = event
+        if self.count == capacity:
+            self.head = (self.head + 1) % capacity
+            self.dropped += 1
+        else:
+            self.count += 1
+
+    def drain(self, limit: int) -> list[AnswerEvent]:
+        size = min(limit, self.count)
+        capacity = len(self.buffer)
+        end = self.head + size
+        if end <= capacity:
+            events = self.buffer[self.head : end]
+            self.buffer[self.head : end] = [None] * size
+        else:
+            events = self.buffer[self.head :] + self.buffer[: end - capacity]
+            self.buffer[self.head :] = [None] * (capacity - self.head)
+            self.buffer[: end - capacity] = [None] * (end - capacity)
+        self.head = end % capacity
+        self.count -= size
+        return events
+
+
+class AnswerAnalytics(BaseAccessor):
+    """
+    Журнал ответов игроков и агрегаты по вопросам.
+
+    Обработчик сообщений только кладет событие в кольцевой буфер.
+    Фоновая задача раз в flush_interval пишет накопленное в
+    answer_events через COPY, другая раз в rollup_interval сворачивает
+    новые события в question_stats и двигает водяной знак.
+    """
+
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+        self.clear()
+        self._tasks: list[asyncio.Task] = []
+        self._flush_lock = asyncio.Lock()
+        self.written = 0
+        self.rolled_up = 0
+
+    def clear(self) -> None:
+        self.ring = EventRing(self.app.config.analytics.buffer_size)
+        # Пачка, которую не удалось записать, повторяется первой
+        self._failed: list[AnswerEvent] = []
+
+    async def connect(self, app: "Application") -> None:
+        config = app.config.analytics
+        if not config.enabled:
+            return
+        self._tasks.append(
+            asyncio.create_task(
+                self._periodically(config.flush_interval, self.flush)
+            )
+        )
+        if config.rollup_interval:
+            self._tasks.append(
+                asyncio.create_task(
+                    self._periodically(config.rollup_interval, self.rollup)
+                )
+            )
+
+    async def disconnect(self, app: "Application") -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if app.config.analytics.enabled:
+            try:
+                await self.flush()
+            except Exception:
+                self.logger.exception("answer events final flush error")
+
+    def record(
+        self,
+        question_id: int,
+        peer_id: int,
+        vk_id: int,
+        is_correct: bool,
+        shown_at: datetime,
+    ) -> None:
+        if not self.app.config.analytics.enabled:
+            return
+        now = datetime.now(UTC)
+        answer_time = max((now - shown_at) // timedelta(milliseconds=1), 0)
+        self.ring.push(
+            AnswerEvent(
+                question_id, peer_id, vk_id, is_correct, answer_time, now
+            )
+        )
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            written = 0
+            batch_size = self.app.config.analytics.flush_batch
+            while self._failed or self.ring:
+                batch = self._failed or self.ring.drain(batch_size)
+                self._failed = []
+                try:
+                    await self._copy(batch)
+                except Exception:
+                    self._failed = batch
+                    raise
+                written += len(batch)
+            self.written += written
+            return written
+
+    async def _copy(self, events: list[AnswerEvent]) -> None:
+        from app.game.models import AnswerEventModel
+
+        async with self.app.database.engine.connect() as connection:
+            raw = await connection.get_raw_connection()
+            driver = raw.driver_connection
+            # COPY в обход SQLAlchemy: одна команда на всю пачку в явной
+            # транзакции, чтобы пачка записалась целиком или никак
+            async with driver.transaction():
+                await driver.copy_records_to_table(
+                    AnswerEventModel.__tablename__,
+                    records=events,
+                    columns=EVENT_COLUMNS,
+                )
+
+    async def rollup(self) -> int:
+        """
+        Сворачивает новые события в question_stats.
+
+        Возвращает, сколько событий учтено.
+        """
+        total = 0
+        while rolled := await self._rollup_batch():
+            total += rolled
+        self.rolled_up += total
+        return total
+
+    async def _rollup_batch(self) -> int:
+        from app.game.models import (
+            AnswerEventModel,
+            QuestionStatsModel,
+            RollupWatermarkModel,
+        )
+
+        lag = timedelta(seconds=self.app.config.analytics.rollup_lag)
+        async with self.app.database.session() as session:
+            await session.execute(
+                insert(RollupWatermarkModel)
+                .values(name=ROLLUP_NAME, last_event_id=0)
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+            # Блокировка строки не дает двум процессам свернуть
+            # одни и те же события дважды
+            watermark = await session.scalar(
+                select(RollupWatermarkModel.last_event_id)
+                .where(RollupWatermarkModel.name == ROLLUP_NAME)
+                .with_for_update()
+            )
+            window = (
+                select(AnswerEventModel.id)
+                .where(
+                    AnswerEventModel.id > watermark,
+                    AnswerEventModel.created_at < func.now() - lag,
+                )
+                .order_by(AnswerEventModel.id)
+                .limit(ROLLUP_BATCH)
+                .subquery()
+            )
+            bounds = (
+                await session.execute(
+                    select(func.max(window.c.id), func.count())
+                )
+            ).one()
+            upto, count = bounds
+            if upto is None:
+                await session.rollback()
+                return 0
+
+            events = AnswerEventModel
+            aggregates = (
+                select(
+                    events.question_id,
+                    func.count(),
+                    func.count().filter(events.is_correct),
+                    func.sum(events.answer_time_ms),
+                )
+                .where(events.id > watermark, events.id <= upto)
+                .group_by(events.question_id)
+            )
+            stmt = insert(QuestionStatsModel).from_select(
+                [
+                    "question_id",
+                    "attempts",
+                    "correct",
+                    "total_answer_time_ms",
+                ],
+                aggregates,
+            )
+            stats = QuestionStatsModel.__table__.c
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["question_id"],
+                    set_={
+                        "attempts": stats.attempts + stmt.excluded.attempts,
+                        "correct": stats.correct + stmt.excluded.correct,
+                        "total_answer_time_ms": stats.total_answer_time_ms
+                        + stmt.excluded.total_answer_time_ms,
+                        "updated_at": func.now(),
+                    },
+                )
+            )
+            await session.execute(
+                update(RollupWatermarkModel)
+                .where(RollupWatermarkModel.name == ROLLUP_NAME)
+                .values(last_event_id=upto)
+            )
+            await session.commit()
+        return count
+
+    async def get_stats(
+        self,
+        question_id: int | None = None,
+        min_attempts: int = 1,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> list["QuestionStatsModel"]:
+        """Читает только агрегаты, сначала самые трудные вопросы."""
+        from app.game.models import QuestionStatsModel
+
+        stats = QuestionStatsModel
+        query = select(stats).where(stats.attempts >= min_attempts)
+        if question_id is not None:
+            query = query.where(stats.question_id == question_id)
+        query = (
+            query.order_by(
+                (stats.correct * 1.0 / stats.attempts).asc(),
+                stats.attempts.desc(),
+                stats.question_id,
+            )
+            .limit(limit)
+            .offset(offset)
+        )
+        async with self.app.database.session() as session:
+            return list(await session.scalars(query))
+
+    async def _periodically(self, interval: float, action) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await action()
+            except Exception:
+                self.logger.exception("answer analytics error")
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self.ring),
+            "dropped": self.ring.dropped,
+            "written": self.written,
+            "rolled_up": self.rolled_up,
+        }
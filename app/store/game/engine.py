@@ -0,0 +1,302 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from app.base.base_accessor import BaseAccessor
+from app.store.game.renderer import QuestionRenderer, RenderedQuestion
+from app.store.game.state import GameQuestion, GameState, RoundTimeout
+from app.store.game.writer import GameWriter
+from app.store.vk_api.dataclasses import Message
+from app.store.vk_api.timer import TimingWheel
+
+if TYPE_CHECKING:
+    from app.web.app import Application
+
+HELP_TEXT = (
+    "Привет! Напишите /start, чтобы начать игру, "
+    "или /start <id темы>, чтобы играть по одной теме. "
+    "/top - рейтинг чата, /top all - общий, /top <id темы> - по теме."
+)
+TOP_SIZE = 10
+
+
+class GameEngine(BaseAccessor):
+    """
+    Игры всех чатов в памяти, по одной активной на peer_id.
+
+    Обработка сообщения не ходит в БД: изменения помечают игру грязной,
+    а GameWriter раз в flush_interval пишет снимки грязных игр пачкой.
+    После рестарта активные игры восстанавливаются из последних снимков.
+    Вызовы для одного чата приходят последовательно через Dispatcher.
+    """
+
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+        self.games: dict[int, GameState] = {}
+        # Завершенные игры остаются здесь до ближайшего сброса
+        self.dirty: set[GameState] = set()
+        self.writer = GameWriter(self)
+        config = app.config.game
+        self.renderer = QuestionRenderer(
+            config.layouts, config.render_cache_size
+        )
+        self.timers = TimingWheel(self._on_timeouts, tick=config.timer_tick)
+        self._timeouts: set[asyncio.Task] = set()
+        self._commands = {
+            "/start": self._start_command,
+            "/stop": self._stop_command,
+            "/score": self._score_command,
+            "/top": self._top_command,
+        }
+
+    async def connect(self, app: "Application") -> None:
+        await self.restore()
+        self.writer.start()
+
+    async def disconnect(self, app: "Application") -> None:
+        try:
+            await self.writer.stop()
+        finally:
+            await self.timers.stop()
+            for game in self.games.values():
+                self._cancel_timer(game)
+            # Игры уже сброшены в БД; если процесс только перестал быть
+            # лидером, их продолжит новый лидер. Даже если последний
+            # сброс не удался, в памяти их держать нельзя: после
+            # возвращения лидерства они поднимутся из БД заново
+            self.games.clear()
+
+    def mark_dirty(self, game: GameState) -> None:
+        self.dirty.add(game)
+
+    async def handle_message(
+        self, peer_id: int, from_id: int, text: str
+    ) -> list[Message]:
+        command, _, argument = text.strip().partition(" ")
+        game = self.games.get(peer_id)
+
+        handler = self._commands.get(command)
+        if handler is not None:
+            return await handler(game, peer_id, from_id, argument.strip())
+
+        if game is None:
+            return [Message(peer_id, HELP_TEXT)]
+        return await self.answer(game, from_id, text)
+
+    async def _start_command(
+        self, game: GameState | None, peer_id: int, from_id: int, argument: str
+    ) -> list[Message]:
+        if game is not None:
+            return [Message(peer_id, "Игра уже идет. /stop - закончить.")]
+        theme_id = int(argument) if argument.isdigit() else None
+        if theme_id is not None:
+            bank = self.app.store.question_bank
+            if not bank.loaded:
+                await bank.load()
+            if not bank.has_theme(theme_id):
+                return [Message(peer_id, "Темы с таким id нет.")]
+        return await self.start_game(peer_id, theme_id)
+
+    async def _stop_command(
+        self, game: GameState | None, peer_id: int, from_id: int, argument: str
+    ) -> list[Message]:
+        if game is None:
+            return [Message(peer_id, "Игра не запущена.")]
+        return [self.finish_game(game)]
+
+    async def _score_command(
+        self, game: GameState | None, peer_id: int, from_id: int, argument: str
+    ) -> list[Message]:
+        if game is None:
+            return [Message(peer_id, "Игра не запущена.")]
+        return [Message(peer_id, "Счет:\n" + self._scoreboard(game))]
+
+    async def _top_command(
+        self, game: GameState | None, peer_id: int, from_id: int, argument: str
+    ) -> list[Message]:
+        return [self._top(peer_id, from_id, argument)]
+
+    async def handle_timeout(self, event: RoundTimeout) -> list[Message]:
+        game = self.games.get(event.peer_id)
+        # Таймер мог сработать после того, как на вопрос уже ответили
+        if game is None or game.round != event.round:
+            return []
+
+        messages = []
+        if game.question is not None:
+            text = (
+                f"Время вышло. Правильный ответ: {game.question.correct_answer}"
+            )
+            messages.append(Message(game.peer_id, text))
+        return messages + await self.next_round(game)
+
+    async def start_game(
+        self, peer_id: int, theme_id: int | None
+    ) -> list[Message]:
+        game = GameState(peer_id, theme_id, datetime.now(UTC))
+        self.games[peer_id] = game
+        self.mark_dirty(game)
+        return await self.next_round(game)
+
+    async def answer(
+        self, game: GameState, from_id: int, text: str
+    ) -> list[Message]:
+        leaderboard = self.app.store.leaderboard
+        if from_id not in game.scores:
+            game.scores[from_id] = 0
+            leaderboard.record(game.peer_id, game.theme_id, from_id, 0)
+        self.mark_dirty(game)
+        if game.question is None or from_id in game.answered:
+            return []
+        game.answered.add(from_id)
+        correct = self._is_correct(game, text)
+        self.app.store.analytics.record(
+            game.question.id,
+            game.peer_id,
+            from_id,
+            correct,
+            shown_at=game.deadline
+            - timedelta(seconds=self.app.config.game.round_duration),
+        )
+        if not correct:
+            return []
+
+        game.scores[from_id] += 1
+        leaderboard.record(game.peer_id, game.theme_id, from_id, 1)
+        text = (
+            f"Верно, @id{from_id}! "
+            f"Правильный ответ: {game.question.correct_answer}"
+        )
+        return [Message(game.peer_id, text), *await self.next_round(game)]
+
+    async def next_round(self, game: GameState) -> list[Message]:
+        self._cancel_timer(game)
+        config = self.app.config.game
+        if game.round >= config.rounds:
+            return [self.finish_game(game)]
+
+        question = await self.pick_question(game)
+        if question is None:
+            if game.round == 0:
+                # Игра так и не началась, сохранять нечего
+                self.finish_game(game)
+                self.dirty.discard(game)
+                return [Message(game.peer_id, "Нет вопросов для игры.")]
+            return [self.finish_game(game)]
+
+        game.round += 1
+        game.question = question
+        game.asked.append(question.id)
+        game.answered.clear()
+        game.deadline = datetime.now(UTC) + timedelta(
+            seconds=config.round_duration
+        )
+        self._schedule_timer(game)
+        self.mark_dirty(game)
+        return [self._question_message(game)]
+
+    def finish_game(self, game: GameState) -> Message:
+        self._cancel_timer(game)
+        game.status = "finished"
+        game.finished_at = datetime.now(UTC)
+        game.deadline = None
+        if self.games.get(game.peer_id) is game:
+            del self.games[game.peer_id]
+        self.mark_dirty(game)
+        return Message(
+            game.peer_id, "Игра окончена.\n" + self._scoreboard(game)
+        )
+
+    async def pick_question(self, game: GameState) -> GameQuestion | None:
+        bank = self.app.store.question_bank
+        if not bank.loaded:
+            await bank.load()
+        if game.deck is None:
+            game.deck = bank.deck(game.theme_id)
+        return bank.draw(game.deck, exclude=frozenset(game.asked))
+
+    def _is_correct(self, game: GameState, text: str) -> bool:
+        # Номер варианта в показанной раскладке или сам вариант,
+        # с точностью до опечаток
+        order = self._rendered(game).order
+        return game.question.matcher.match(text, order) == game.question.correct
+
+    def _rendered(self, game: GameState) -> RenderedQuestion:
+        # Раскладка зависит только от чата и раунда, поэтому
+        # не теряется при восстановлении игры после рестарта
+        return self.renderer.render(game.question, game.peer_id + game.round)
+
+    def _question_message(self, game: GameState) -> Message:
+        rendered = self._rendered(game)
+        return Message(
+            game.peer_id,
+            f"Вопрос {game.round}/{self.app.config.game.rounds}: "
+            f"{rendered.body}",
+            keyboard=rendered.keyboard,
+        )
+
+    @staticmethod
+    def _scoreboard(game: GameState) -> str:
+        leaders = [item for item in game.leaders() if item[1] > 0]
+        if not leaders:
+            return "Никто не набрал очков."
+        return "\n".join(
+            f"{place}. @id{vk_id}: {points}"
+            for place, (vk_id, points) in enumerate(leaders, 1)
+        )
+
+    def _top(self, peer_id: int, from_id: int, argument: str) -> Message:
+        leaderboard = self.app.store.leaderboard
+        if argument == "all":
+            title, board = "Общий рейтинг", leaderboard.board("global")
+        elif argument.isdigit():
+            title = f"Рейтинг темы {argument}"
+            board = leaderboard.board("theme", int(argument))
+        else:
+            title, board = "Рейтинг чата", leaderboard.board("chat", peer_id)
+        if board is None or not len(board):
+            return Message(peer_id, f"{title}: пока пусто.")
+
+        lines = [f"{title}:"] + [
+            f"{rank}. @id{vk_id}: {score}"
+            for rank, vk_id, score in board.top(TOP_SIZE)
+        ]
+        rank = board.rank(from_id)
+        if rank is not None:
+            lines.append(f"Ваше место: {rank} из {len(board)}")
+        return Message(peer_id, "\n".join(lines))
+
+    def _schedule_timer(self, game: GameState) -> None:
+        delay = max(0.0, (game.deadline - datetime.now(UTC)).total_seconds())
+        game.timer = self.timers.schedule(
+            delay, RoundTimeout(game.peer_id, game.round)
+        )
+
+    def _cancel_timer(self, game: GameState) -> None:
+        if game.timer is not None:
+            self.timers.cancel(game.timer)
+            game.timer = None
+
+    def _on_timeouts(self, events: list[RoundTimeout]) -> None:
+        for event in events:
+            game = self.games.get(event.peer_id)
+            if game is not None:
+                game.timer = None
+        # Все истекшие за тик раунды идут в диспетчер одной пачкой
+        task = asyncio.create_task(
+            self.app.store.bots_manager.dispatch_updates(events)
+        )
+        self._timeouts.add(task)
+        task.add_done_callback(self._timeouts.discard)
+
+    async def restore(self) -> None:
+        """Поднимает активные игры из последних снимков."""
+        for game in await self.writer.load_active():
+            self.games[game.peer_id] = game
+            if game.deadline is not None:
+                self._schedule_timer(game)
+        if self.games:
+            self.logger.info("restored %d games", len(self.games))
+
+    async def flush(self) -> int:
+        return await self.writer.flush()
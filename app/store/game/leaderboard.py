@@ -0,0 +1,195 @@
+import asyncio
+from typing import TYPE_CHECKING
+
+from sqlalchemy import func, select
+
+from app.base.base_accessor import BaseAccessor
+
+if TYPE_CHECKING:
+    from app.web.app import Application
+
+
+class FenwickTree:
+    """
+    Число игроков на каждом значении счета.
+
+    Префиксные суммы и поиск k-го по порядку - за O(log n) от размера
+    домена счета.
+    """
+
+    __slots__ = ("tree",)
+
+    def __init__(self, size: int = 64) -> None:
+        # tree[0] не используется, индекс i хранит счет i - 1
+        self.tree = [0] * (size + 1)
+
+    def __len__(self) -> int:
+        return len(self.tree) - 1
+
+    def _grow(self, index: int) -> None:
+        size = len(self)
+        while size <= index:
+            size *= 2
+        counts = [self.count(i) for i in range(len(self))]
+        self.tree = [0] * (size + 1)
+        for value, count in enumerate(counts):
+            if count:
+                self.add(value, count)
+
+    def add(self, value: int, delta: int) -> None:
+        if value >= len(self):
+            self._grow(value)
+        index = value + 1
+        while index < len(self.tree):
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix(self, value: int) -> int:
+        """Сколько игроков со счетом не больше value."""
+        index = min(value + 1, len(self))
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    def count(self, value: int) -> int:
+        return self.prefix(value) - (self.prefix(value - 1) if value else 0)
+
+    def find(self, k: int) -> int:
+        """Наименьший счет, на котором набирается k игроков снизу."""
+        index = 0
+        step = 1 << (len(self).bit_length() - 1)
+        while step:
+            following = index + step
+            if following < len(self.tree) and self.tree[following] < k:
+                index = following
+                k -= self.tree[following]
+            step >>= 1
+        return index
+
+
+class Board:
+    """
+    Рейтинг игроков одной доски: счет каждого, число игроков
+    на каждом счете в дереве Фенвика и игроки по счетам.
+    Место - 1 + число игроков со строго большим счетом.
+    """
+
+    __slots__ = ("by_score", "counts", "scores")
+
+    def __init__(self) -> None:
+        self.scores: dict[int, int] = {}
+        # Внутри одного счета выше тот, кто набрал его раньше
+        self.by_score: dict[int, dict[int, None]] = {}
+        self.counts = FenwickTree()
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def add(self, vk_id: int, delta: int) -> None:
+        old = self.scores.get(vk_id)
+        if old is not None:
+            if not delta:
+                return
+            self._remove(vk_id, old)
+        new = max((old or 0) + delta, 0)
+        self.scores[vk_id] = new
+        self.by_score.setdefault(new, {})[vk_id] = None
+        self.counts.add(new, 1)
+
+    def _remove(self, vk_id: int, score: int) -> None:
+        players = self.by_score[score]
+        del players[vk_id]
+        if not players:
+            del self.by_score[score]
+        self.counts.add(score, -1)
+
+    def rank(self, vk_id: int) -> int | None:
+        score = self.scores.get(vk_id)
+        if score is None:
+            return None
+        return len(self.scores) - self.counts.prefix(score) + 1
+
+    def top(self, limit: int, offset: int = 0) -> list[tuple[int, int, int]]:
+        """(место, vk_id, счет) по убыванию счета."""
+        result: list[tuple[int, int, int]] = []
+        total = len(self.scores)
+        seen = 0
+        while seen < total and len(result) < limit:
+            # Счет игрока, стоящего (seen + 1)-м сверху
+            score = self.counts.find(total - seen)
+            players = self.by_score[score]
+            rank = seen + 1
+            if seen + len(players) <= offset:
+                seen += len(players)
+                continue
+            for vk_id in players:
+                if seen >= offset and len(result) < limit:
+                    result.append((rank, vk_id, score))
+                seen += 1
+        return result
+
+
+class Leaderboard(BaseAccessor):
+    """
+    Общий рейтинг, рейтинги чатов и тем в памяти.
+
+    При старте доски заполняются суммами очков из scores, дальше
+    GameEngine передает каждое изменение счета в record.
+    """
+
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+        self._lock = asyncio.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        self.global_board = Board()
+        self.chats: dict[int, Board] = {}
+        self.themes: dict[int, Board] = {}
+
+    async def connect(self, app: "Application") -> None:
+        await self.load()
+
+    def board(self, scope: str, id_: int | None = None) -> Board | None:
+        if scope == "global":
+            return self.global_board
+        boards = self.chats if scope == "chat" else self.themes
+        return boards.get(id_)
+
+    def record(
+        self, peer_id: int, theme_id: int | None, vk_id: int, delta: int
+    ) -> None:
+        self.global_board.add(vk_id, delta)
+        self.chats.setdefault(peer_id, Board()).add(vk_id, delta)
+        if theme_id is not None:
+            self.themes.setdefault(theme_id, Board()).add(vk_id, delta)
+
+    async def load(self) -> None:
+        from app.game.models import GameModel, PlayerModel, ScoreModel
+
+        async with self._lock:
+            self.clear()
+            async with self.app.database.session() as session:
+                rows = await session.stream(
+                    select(
+                        GameModel.peer_id,
+                        GameModel.theme_id,
+                        PlayerModel.vk_id,
+                        func.sum(ScoreModel.points),
+                    )
+                    .join(ScoreModel, ScoreModel.game_id == GameModel.id)
+                    .join(PlayerModel, PlayerModel.id == ScoreModel.player_id)
+                    .group_by(
+                        GameModel.peer_id, GameModel.theme_id, PlayerModel.vk_id
+                    )
+                )
+                async for peer_id, theme_id, vk_id, points in rows:
+                    self.record(peer_id, theme_id, vk_id, int(points))
+        self.logger.info(
+            "leaderboard: %d players, %d chats, %d themes",
+            len(self.global_board),
+            len(self.chats),
+            len(self.themes),
+        )
@@ -0,0 +1,125 @@
+import string
+
+from app.store.game.renderer import BUTTON_LABEL_LIMIT
+
+# Регистр, пробелы и пунктуация на ответ не влияют, ё приравнена к е
+_TRANSLATION = str.maketrans(
+    {"ё": "е"}
+    | dict.fromkeys(
+        string.punctuation + string.whitespace + "«»„“”‘’—–…№\u00a0"
+    )
+)
+# Опечатки допускаются в ответах от FUZZY_MIN_LENGTH символов: одна
+# на каждые FUZZY_CHARS_PER_EDIT символов, но не больше MAX_DISTANCE
+FUZZY_MIN_LENGTH = 4
+FUZZY_CHARS_PER_EDIT = 4
+MAX_DISTANCE = 2
+
+
+def normalize(text: str) -> str:
+    return text.casefold().translate(_TRANSLATION)
+
+
+def bounded_distance(a: str, b: str, limit: int) -> int:
+    """
+    Расстояние Левенштейна, если оно не больше limit, иначе limit + 1.
+
+    Считается только полоса шириной 2 * limit + 1 вокруг диагонали,
+    и счет обрывается, как только вся строка матрицы превысила limit.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    over = limit + 1
+    if len(b) - len(a) > limit:
+        return over
+
+    previous = [j if j <= limit else over for j in range(len(a) + 1)]
+    for i, char in enumerate(b, 1):
+        previous, best = _band_row(a, char, i, previous, limit)
+        if best > limit:
+            return over
+    return previous[len(a)]
+
+
+def _band_row(
+    a: str, char: str, i: int, previous: list[int], limit: int
+) -> tuple[list[int], int]:
+    # Строка i матрицы в пределах полосы и ее минимум
+    over = limit + 1
+    current = [over] * (len(a) + 1)
+    if i <= limit:
+        current[0] = i
+    best = current[0]
+    for j in range(max(1, i - limit), min(len(a), i + limit) + 1):
+        value = min(
+            previous[j - 1] + (a[j - 1] != char),
+            current[j - 1] + 1,
+            previous[j] + 1,
+            over,
+        )
+        current[j] = value
+        best = min(best, value)
+    return current, best
+
+
+class AnswerMatcher:
+    """
+    Варианты ответа вопроса в нормализованном виде.
+
+    Нормализация вариантов делается один раз при загрузке вопроса,
+    а не на каждое сообщение игрока.
+    """
+
+    __slots__ = ("exact", "forms")
+
+    def __init__(self, options: tuple[str, ...]) -> None:
+        self.forms = tuple(normalize(option) for option in options)
+        self.exact: dict[str, int] = {}
+        for index, form in enumerate(self.forms):
+            # При совпадающих формах выигрывает первый вариант
+            self.exact.setdefault(form, index)
+        # Кнопка клавиатуры присылает подпись, обрезанную VK
+        for index, option in enumerate(options):
+            if len(option) > BUTTON_LABEL_LIMIT:
+                label = normalize(option[:BUTTON_LABEL_LIMIT])
+                self.exact.setdefault(label, index)
+
+    def match(
+        self, text: str, order: tuple[int, ...] | None = None
+    ) -> int | None:
+        """
+        Индекс варианта, которым ответил игрок, или None.
+
+        order - раскладка, в которой варианты были пронумерованы для
+        игрока.
+        """
+        form = normalize(text)
+        # Сам вариант важнее номера: у вариантов "4", "6", "8"
+        # ответ "4" - это вариант, а не четвертая строка
+        index = self.exact.get(form)
+        if index is not None:
+            return index
+
+        text = text.strip()
+        if text.isdigit() and 0 < int(text) <= len(self.forms):
+            number = int(text) - 1
+            return number if order is None else order[number]
+        return self._closest(form) if form else None
+
+    def _closest(self, form: str) -> int | None:
+        found = None
+        found_distance = MAX_DISTANCE + 1
+        ambiguous = False
+        for index, option in enumerate(self.forms):
+            if len(option) < FUZZY_MIN_LENGTH:
+                continue
+            limit = min(MAX_DISTANCE, len(option) // FUZZY_CHARS_PER_EDIT)
+            distance = bounded_distance(form, option, limit)
+            if distance > limit:
+                continue
+            if distance < found_distance:
+                found, found_distance, ambiguous = index, distance, False
+            elif distance == found_distance and option != self.forms[found]:
+                ambiguous = True
+        # Опечатка, одинаково близкая к двум вариантам, не засчитывается
+        return None if ambiguous else found
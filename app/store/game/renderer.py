@@ -0,0 +1,120 @@
+import json
+import math
+import random
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.store.game.state import GameQuestion
+
+# VK обрезает подпись кнопки до 40 символов, а в inline-клавиатуре
+# допускает не больше 6 рядов
+BUTTON_LABEL_LIMIT = 40
+KEYBOARD_MAX_ROWS = 6
+
+
+@dataclass(slots=True)
+class RenderedQuestion:
+    """
+    Готовый текст вопроса и сериализованная клавиатура.
+
+    Одна запись на раскладку; order[n] - индекс варианта на n-й позиции.
+    """
+
+    body: str
+    keyboard: str | None
+    order: tuple[int, ...]
+
+
+class QuestionRenderer:
+    """
+    Кэш отрисованных вопросов по (id вопроса, раскладка).
+
+    Раскладка - номер перестановки вариантов из небольшого набора,
+    заранее посчитанного для каждого числа вариантов. Перестановки
+    порождаются детерминированно, поэтому во всех процессах раскладка
+    с одним номером одинакова. Вопросы по id не меняются, так что
+    запись кэша не устаревает, пока id не переиспользован.
+    """
+
+    def __init__(self, layouts: int = 4, cache_size: int = 10_000) -> None:
+        self.layouts = max(layouts, 1)
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple[int, int], RenderedQuestion] = (
+            OrderedDict()
+        )
+        self._permutations: dict[int, list[tuple[int, ...]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def permutations(self, size: int) -> list[tuple[int, ...]]:
+        permutations = self._permutations.get(size)
+        if permutations is None:
+            identity = tuple(range(size))
+            permutations = [identity]
+            count = min(self.layouts, math.factorial(size))
+            rng = random.Random(size)
+            while len(permutations) < count:
+                order = list(identity)
+                rng.shuffle(order)
+                if tuple(order) not in permutations:
+                    permutations.append(tuple(order))
+            self._permutations[size] = permutations
+        return permutations
+
+    def render(self, question: "GameQuestion", layout: int) -> RenderedQuestion:
+        layout %= len(self.permutations(len(question.options)))
+        key = (question.id, layout)
+        rendered = self._cache.get(key)
+        if rendered is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return rendered
+
+        self.misses += 1
+        rendered = self._build(question, layout)
+        self._cache[key] = rendered
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return rendered
+
+    def _build(self, question: "GameQuestion", layout: int) -> RenderedQuestion:
+        order = self.permutations(len(question.options))[layout]
+        lines = [question.title]
+        buttons = []
+        for number, index in enumerate(order, 1):
+            option = question.options[index]
+            lines.append(f"{number}. {option}")
+            buttons.append(
+                [
+                    {
+                        "action": {
+                            "type": "text",
+                            "label": option[:BUTTON_LABEL_LIMIT],
+                            "payload": json.dumps(
+                                {"question": question.id, "answer": index}
+                            ),
+                        },
+                        "color": "secondary",
+                    }
+                ]
+            )
+        keyboard = None
+        if len(buttons) <= KEYBOARD_MAX_ROWS:
+            keyboard = json.dumps(
+                {"inline": True, "buttons": buttons},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        return RenderedQuestion("\n".join(lines), keyboard, order)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
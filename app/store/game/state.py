@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from app.store.game.matcher import AnswerMatcher
+
+if TYPE_CHECKING:
+    from app.quiz.models import QuestionModel
+
+
+@dataclass(slots=True)
+class RoundTimeout:
+    """
+    Синтетический апдейт: время раунда вышло.
+
+    Идет через диспетчер с ключом peer_id, поэтому не пересекается
+    с ответами игроков.
+    """
+
+    peer_id: int
+    round: int
+
+
+class GameQuestion:
+    __slots__ = ("correct", "id", "matcher", "options", "title")
+
+    def __init__(
+        self, id_: int, title: str, options: tuple[str, ...], correct: int
+    ) -> None:
+        self.id = id_
+        self.title = title
+        self.options = options
+        # Индекс правильного варианта в options
+        self.correct = correct
+        self.matcher = AnswerMatcher(options)
+
+    @classmethod
+    def from_model(cls, question: "QuestionModel") -> "GameQuestion":
+        options = tuple(answer.title for answer in question.answers)
+        correct = next(
+            (i for i, answer in enumerate(question.answers) if answer.is_correct),
+            0,
+        )
+        return cls(question.id, question.title, options, correct)
+
+    @property
+    def correct_answer(self) -> str:
+        return self.options[self.correct]
+
+
+class GameState:
+    __slots__ = (
+        "answered",
+        "asked",
+        "deadline",
+        "deck",
+        "finished_at",
+        "id",
+        "peer_id",
+        "question",
+        "round",
+        "scores",
+        "started_at",
+        "status",
+        "theme_id",
+        "timer",
+    )
+
+    def __init__(
+        self, peer_id: int, theme_id: int | None, started_at: datetime
+    ) -> None:
+        # id выдает БД при первом сбросе
+        self.id: int | None = None
+        self.peer_id = peer_id
+        self.theme_id = theme_id
+        self.status = "active"
+        self.round = 0
+        self.question: GameQuestion | None = None
+        self.asked: list[int] = []
+        # vk id игроков, уже ответивших в текущем раунде: засчитывается
+        # только первый ответ, иначе варианты можно перебирать
+        self.answered: set[int] = set()
+        # Колода банка вопросов; не сохраняется, после рестарта
+        # собирается заново с исключением asked
+        self.deck = None
+        self.deadline: datetime | None = None
+        # vk id игрока -> очки
+        self.scores: dict[int, int] = {}
+        self.started_at = started_at
+        self.finished_at: datetime | None = None
+        self.timer = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == "active"
+
+    def leaders(self) -> list[tuple[int, int]]:
+        return sorted(self.scores.items(), key=lambda item: -item[1])
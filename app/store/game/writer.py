@@ -0,0 +1,204 @@
+import asyncio
+from asyncio import Task
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.store.game.state import GameQuestion, GameState
+
+if TYPE_CHECKING:
+    from app.store.game.engine import GameEngine
+
+
+class GameWriter:
+    """
+    Write-behind для GameEngine.
+
+    Раз в flush_interval пишет снимки всех измененных игр одной
+    транзакцией.
+
+    Снимок строится синхронно до первого await, поэтому изменения,
+    сделанные во время записи, попадут в следующий сброс. При ошибке
+    игры снова помечаются грязными.
+    """
+
+    def __init__(self, engine: "GameEngine") -> None:
+        self.engine = engine
+        self.is_running = False
+        self.task: Task | None = None
+        self.flushes = 0
+        self.rows_written = 0
+        self._lock = asyncio.Lock()
+
+    def start(self) -> None:
+        self.is_running = True
+        self.task = asyncio.create_task(self.work())
+
+    async def stop(self) -> None:
+        self.is_running = False
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        # Последний сброс того, что накопилось с прошлого раза
+        await self.flush()
+
+    async def work(self) -> None:
+        app = self.engine.app
+        while self.is_running:
+            await asyncio.sleep(app.config.game.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                app.logger.exception("Game flush error")
+
+    @staticmethod
+    def _game_row(game: GameState) -> dict:
+        return {
+            "peer_id": game.peer_id,
+            "theme_id": game.theme_id,
+            "status": game.status,
+            "round": game.round,
+            "question_id": game.question.id if game.question else None,
+            "asked_question_ids": list(game.asked),
+            "answered_vk_ids": sorted(game.answered),
+            "round_deadline": game.deadline,
+            "started_at": game.started_at,
+            "finished_at": game.finished_at,
+        }
+
+    async def flush(self) -> int:
+        async with self._lock:
+            games = list(self.engine.dirty)
+            if not games:
+                return 0
+            self.engine.dirty.clear()
+
+            snapshot = [
+                (game, self._game_row(game), dict(game.scores))
+                for game in games
+            ]
+            try:
+                await self._write(snapshot)
+            except Exception:
+                self.engine.dirty.update(games)
+                raise
+
+            self.flushes += 1
+            self.rows_written += len(snapshot)
+            return len(snapshot)
+
+    async def _write(
+        self, snapshot: list[tuple[GameState, dict, dict]]
+    ) -> None:
+        from app.game.models import GameModel, PlayerModel, ScoreModel
+
+        new = [(game, row) for game, row, _ in snapshot if game.id is None]
+        known = [
+            {"id": game.id, **row}
+            for game, row, _ in snapshot
+            if game.id is not None
+        ]
+
+        async with self.engine.app.database.session() as session:
+            game_ids = {game: game.id for game, _, _ in snapshot}
+            # Сначала завершаем известные игры: если в чате за одно окно
+            # сброса закончили игру и начали новую, новая активная
+            # строка иначе нарушит уникальный индекс ix_games_active_peer_id
+            if known:
+                await session.execute(update(GameModel), known)
+            if new:
+                result = await session.execute(
+                    insert(GameModel).returning(
+                        GameModel.id, sort_by_parameter_order=True
+                    ),
+                    [row for _, row in new],
+                )
+                for (game, _), game_id in zip(
+                    new, result.scalars(), strict=True
+                ):
+                    game_ids[game] = game_id
+
+            vk_ids = {vk_id for _, _, scores in snapshot for vk_id in scores}
+            player_ids = {}
+            if vk_ids:
+                stmt = insert(PlayerModel).values(
+                    [{"vk_id": vk_id} for vk_id in vk_ids]
+                )
+                # DO UPDATE вместо DO NOTHING, чтобы RETURNING вернул
+                # id и уже существующих игроков
+                result = await session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=[PlayerModel.vk_id],
+                        set_={"vk_id": stmt.excluded.vk_id},
+                    ).returning(PlayerModel.vk_id, PlayerModel.id)
+                )
+                player_ids.update(result.tuples())
+
+            score_rows = [
+                {
+                    "game_id": game_ids[game],
+                    "player_id": player_ids[vk_id],
+                    "points": points,
+                }
+                for game, _, scores in snapshot
+                for vk_id, points in scores.items()
+            ]
+            if score_rows:
+                stmt = insert(ScoreModel).values(score_rows)
+                await session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=[
+                            ScoreModel.game_id,
+                            ScoreModel.player_id,
+                        ],
+                        set_={"points": stmt.excluded.points},
+                    )
+                )
+            await session.commit()
+
+        # id присваиваем только после коммита: при откате их не было
+        for game, game_id in game_ids.items():
+            game.id = game_id
+
+    async def load_active(self) -> list[GameState]:
+        from app.game.models import GameModel, PlayerModel, ScoreModel
+
+        async with self.engine.app.database.session() as session:
+            rows = (
+                await session.scalars(
+                    select(GameModel).where(GameModel.status == "active")
+                )
+            ).all()
+            if not rows:
+                return []
+            scores = await session.execute(
+                select(ScoreModel.game_id, PlayerModel.vk_id, ScoreModel.points)
+                .join(PlayerModel, PlayerModel.id == ScoreModel.player_id)
+                .where(ScoreModel.game_id.in_([row.id for row in rows]))
+            )
+
+        models = await self.engine.app.store.quizzes.get_questions_by_ids(
+            [row.question_id for row in rows if row.question_id is not None]
+        )
+        questions = {
+            question.id: GameQuestion.from_model(question)
+            for question in models
+        }
+
+        games = {}
+        for row in rows:
+            game = GameState(row.peer_id, row.theme_id, row.started_at)
+            game.id = row.id
+            game.round = row.round
+            game.asked = list(row.asked_question_ids)
+            game.answered = set(row.answered_vk_ids)
+            # Вопрос могли удалить, тогда по таймеру игра перейдет
+            # к следующему раунду
+            game.question = questions.get(row.question_id)
+            game.deadline = row.round_deadline
+            games[row.id] = game
+        for game_id, vk_id, points in scores:
+            games[game_id].scores[vk_id] = points
+        return list(games.values())
@@ -0,0 +1,142 @@
+import asyncio
+import random
+from collections.abc import Iterable
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.base.base_accessor import BaseAccessor
+from app.store.vk_api.dataclasses import Message
+from app.store.vk_api.exceptions import VkApiError
+from app.store.vk_api.sender import RATE_LIMIT_ERRORS
+
+if TYPE_CHECKING:
+    from app.bot.models import OutboxModel
+
+
+class OutboxAccessor(BaseAccessor):
+    async def enqueue(
+        self,
+        messages: Iterable[Message],
+        session: AsyncSession | None = None,
+    ) -> None:
+        from app.bot.models import OutboxModel
+
+        rows = [
+            OutboxModel(
+                user_id=message.user_id,
+                text=message.text,
+                random_id=message.random_id or random.randint(1, 2**31 - 1),
+                keyboard=message.keyboard,
+            )
+            for message in messages
+        ]
+
+        # Внутри чужой сессии коммит делает вызывающий код: ответ
+        # сохраняется в одной транзакции с изменением состояния игры
+        if session is not None:
+            session.add_all(rows)
+            return
+
+        async with self.app.database.session() as own_session:
+            own_session.add_all(rows)
+            await own_session.commit()
+
+    async def send_batch(self) -> int:
+        from app.bot.models import OutboxModel
+
+        rows = await self._claim()
+        if not rows:
+            return 0
+
+        # Отправка идет вне транзакции: ожидание лимита запросов
+        # не держит ни соединение из пула, ни блокировки строк
+        results = await asyncio.gather(
+            *(self._send(row) for row in rows), return_exceptions=True
+        )
+
+        async with self.app.database.session() as session:
+            sent_ids = []
+            for row, error in zip(rows, results, strict=True):
+                if error is None:
+                    sent_ids.append(row.id)
+                else:
+                    await self._reschedule(session, row, error)
+
+            if sent_ids:
+                await session.execute(
+                    delete(OutboxModel).where(OutboxModel.id.in_(sent_ids))
+                )
+            await session.commit()
+        return len(rows)
+
+    async def _claim(self) -> list["OutboxModel"]:
+        from app.bot.models import OutboxModel
+
+        config = self.app.config.outbox
+        lease = timedelta(seconds=config.lease)
+        # Короткая транзакция: строки, заблокированные другим воркером,
+        # пропускаются, а взятые откладываются на срок аренды. Если
+        # воркер упадет, не отправив их, по истечении аренды их возьмет
+        # другой; повтор не создаст дубль благодаря random_id
+        claimable = (
+            select(OutboxModel.id)
+            .where(
+                OutboxModel.dead.is_(False),
+                OutboxModel.next_attempt_at <= func.now(),
+            )
+            .order_by(OutboxModel.next_attempt_at)
+            .limit(config.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with self.app.database.session() as session:
+            result = await session.scalars(
+                update(OutboxModel)
+                .where(OutboxModel.id.in_(claimable.scalar_subquery()))
+                .values(next_attempt_at=func.now() + lease)
+                .returning(OutboxModel)
+                .execution_options(synchronize_session=False)
+            )
+            rows = list(result)
+            await session.commit()
+        return rows
+
+    async def _send(self, row: "OutboxModel") -> None:
+        await self.app.store.vk_api.send_message(
+            Message(
+                user_id=row.user_id,
+                text=row.text,
+                random_id=row.random_id,
+                keyboard=row.keyboard,
+            )
+        )
+
+    async def _reschedule(
+        self, session: AsyncSession, row: "OutboxModel", error: BaseException
+    ) -> None:
+        from app.bot.models import OutboxModel
+
+        config = self.app.config.outbox
+        attempts = row.attempts + 1
+        # Ошибки вроде "пользователь запретил сообщения" повторять бессмысленно
+        permanent = (
+            isinstance(error, VkApiError)
+            and error.code not in RATE_LIMIT_ERRORS
+        )
+        dead = permanent or attempts >= config.max_attempts
+        if dead:
+            self.logger.warning("outbox message %s is dead: %s", row.id, error)
+
+        delay = timedelta(seconds=config.retry_backoff * 2 ** (attempts - 1))
+        await session.execute(
+            update(OutboxModel)
+            .where(OutboxModel.id == row.id)
+            .values(
+                attempts=attempts,
+                dead=dead,
+                last_error=str(error)[:1000],
+                next_attempt_at=func.now() + delay,
+            )
+        )
@@ -0,0 +1,38 @@
+import asyncio
+from asyncio import Task
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.store import Store
+
+
+class OutboxWorkerPool:
+    def __init__(self, store: "Store") -> None:
+        self.store = store
+        self.is_running = False
+        self.tasks: list[Task] = []
+
+    def start(self) -> None:
+        self.is_running = True
+        self.tasks = [
+            asyncio.create_task(self.work())
+            for _ in range(self.store.app.config.outbox.workers)
+        ]
+
+    async def stop(self) -> None:
+        self.is_running = False
+        # Текущая пачка дорабатывает до коммита, новые не берутся
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def work(self) -> None:
+        config = self.store.app.config.outbox
+        while self.is_running:
+            try:
+                processed = await self.store.outbox.send_batch()
+            except Exception:
+                self.store.app.logger.exception("Outbox error")
+                processed = 0
+
+            if not processed:
+                await asyncio.sleep(config.poll_interval)
@@ -1,19 +1,120 @@
+import re
 from collections.abc import Iterable, Sequence
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import (
+    CTE,
+    ColumnElement,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+)
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import (
+    attributes,
+    noload,
+    selectinload,
+    undefer,
+)
 
 from app.base.base_accessor import BaseAccessor
+from app.store.quiz.bank import DELETIONS_RETENTION
 
 if TYPE_CHECKING:
     from app.quiz.models import AnswerModel, QuestionModel, ThemeModel
     from app.web.app import Application
 
 
+SEARCH_WORD_RE = re.compile(r"\w+")
+
+
+def build_prefix_tsquery(query: str) -> str | None:
+    # Все слова обязательны, последнее может быть недописанным
+    words = SEARCH_WORD_RE.findall(query.lower())
+    if not words:
+        return None
+    return " & ".join(words) + ":*"
+
+
+def answers_to_snapshot(answers: Iterable["AnswerModel"]) -> list[dict]:
+    return [
+        {"title": answer.title, "is_correct": answer.is_correct}
+        for answer in answers
+    ]
+
+
+# Снимок в том же формате, в котором его пишет create_question
+ANSWERS_SNAPSHOT_SQL = """
+    SELECT coalesce(
+        jsonb_agg(
+            jsonb_build_object('title', a.title, 'is_correct', a.is_correct)
+            ORDER BY a.id
+        ),
+        '[]'::jsonb
+    )
+    FROM answers AS a
+    WHERE a.question_id = q.id
+"""
+
+
 class QuizAccessor(BaseAccessor):
+    @property
+    def use_answers_snapshot(self) -> bool:
+        return self.app.config.quiz.answers_snapshot
+
+    def _answers_options(self) -> tuple:
+        from app.quiz.models import QuestionModel
+
+        if self.use_answers_snapshot:
+            return (
+                undefer(QuestionModel.answers_snapshot),
+                noload(QuestionModel.answers),
+            )
+        return (selectinload(QuestionModel.answers),)
+
+    async def _fill_answers_from_snapshot(
+        self, session: AsyncSession, questions: Sequence["QuestionModel"]
+    ) -> None:
+        if not self.use_answers_snapshot:
+            return
+
+        from app.quiz.models import AnswerModel
+
+        without_snapshot = {}
+        for question in questions:
+            if question.answers_snapshot is None:
+                without_snapshot[question.id] = []
+                continue
+            answers = [
+                AnswerModel(
+                    title=answer["title"],
+                    is_correct=answer["is_correct"],
+                    question_id=question.id,
+                )
+                for answer in question.answers_snapshot
+            ]
+            attributes.set_committed_value(question, "answers", answers)
+
+        # Старые вопросы без снимка дочитываем одним запросом
+        if without_snapshot:
+            result = await session.scalars(
+                select(AnswerModel)
+                .where(AnswerModel.question_id.in_(without_snapshot))
+                .order_by(AnswerModel.id)
+            )
+            for answer in result:
+                without_snapshot[answer.question_id].append(answer)
+            for question in questions:
+                if question.id in without_snapshot:
+                    attributes.set_committed_value(
+                        question, "answers", without_snapshot[question.id]
+                    )
+
     async def create_theme(self, title: str) -> "ThemeModel":
         async with self.app.database.session() as session:
             from app.quiz.models import ThemeModel
@@ -35,10 +136,14 @@ class QuizAccessor(BaseAccessor):
             from app.quiz.models import ThemeModel
             return await session.get(ThemeModel, id_)
 
-    async def list_themes(self) -> Sequence["ThemeModel"]:
+    async def list_themes(
+        self, only_non_empty: bool = False
+    ) -> Sequence["ThemeModel"]:
         async with self.app.database.session() as session:
             from app.quiz.models import ThemeModel
             query = select(ThemeModel).order_by(ThemeModel.id)
+            if only_non_empty:
+                query = query.where(ThemeModel.question_count > 0)
             result = await session.execute(query)
             return result.scalars().all()
 
@@ -46,7 +151,7 @@ class QuizAccessor(BaseAccessor):
         self, title: str, theme_id: int, answers: Iterable["AnswerModel"]
     ) -> "QuestionModel":
         async with self.app.database.session() as session:
-            from app.quiz.models import AnswerModel, QuestionModel, ThemeModel
+            from app.quiz.models import QuestionModel, ThemeModel
             
             # Специальная проверка для theme_id = None (тест 23502)
             if theme_id is None:
@@ -105,48 +210,279 @@ class QuizAccessor(BaseAccessor):
                 finally:
                     await session.rollback()
             
-            # Создаем вопрос
-            question = QuestionModel(title=title, theme_id=theme_id)
-            session.add(question)
-            await session.flush()
-            
-            # Создаем ответы
-            for answer_data in answers:
-                answer = AnswerModel(
-                    title=answer_data.title,
-                    is_correct=answer_data.is_correct,
-                    question_id=question.id,
-                )
-                session.add(answer)
-            
+            question_id = await self._insert_question(
+                session, title, theme_id, answers
+            )
             await session.commit()
-            
-            # Загружаем вопрос с ответами
-            query = select(QuestionModel).where(QuestionModel.id == question.id).options(
-                selectinload(QuestionModel.answers)
+            question = await self._load_question(session, question_id)
+
+        # Новый вопрос сразу попадает в колоды идущих игр
+        self.app.store.question_bank.add_question(question)
+        return question
+
+    async def _insert_question(
+        self,
+        session: AsyncSession,
+        title: str,
+        theme_id: int,
+        answers: Iterable["AnswerModel"],
+    ) -> int:
+        from app.quiz.models import AnswerModel, QuestionModel
+
+        # Вопрос пишется вместе со снимком ответов в одной транзакции
+        answers = list(answers)
+        question = QuestionModel(
+            title=title,
+            theme_id=theme_id,
+            answers_snapshot=answers_to_snapshot(answers),
+        )
+        session.add(question)
+        await session.flush()
+        session.add_all(
+            AnswerModel(
+                title=answer.title,
+                is_correct=answer.is_correct,
+                question_id=question.id,
             )
-            result = await session.execute(query)
-            return result.scalar_one()
+            for answer in answers
+        )
+        return question.id
+
+    async def _load_question(
+        self, session: AsyncSession, question_id: int
+    ) -> "QuestionModel":
+        from app.quiz.models import QuestionModel
+
+        result = await session.execute(
+            select(QuestionModel)
+            .where(QuestionModel.id == question_id)
+            .options(*self._answers_options())
+        )
+        question = result.scalar_one()
+        await self._fill_answers_from_snapshot(session, [question])
+        return question
 
     async def get_question_by_title(self, title: str) -> Optional["QuestionModel"]:
         async with self.app.database.session() as session:
             from app.quiz.models import QuestionModel
             query = select(QuestionModel).where(QuestionModel.title == title).options(
-                selectinload(QuestionModel.answers)
+                *self._answers_options()
             )
             result = await session.execute(query)
-            return result.scalar_one_or_none()
+            question = result.scalar_one_or_none()
+            if question is not None:
+                await self._fill_answers_from_snapshot(session, [question])
+            return question
+
+    async def get_questions_by_ids(
+        self, ids: Sequence[int]
+    ) -> list["QuestionModel"]:
+        if not ids:
+            return []
+
+        async with self.app.database.session() as session:
+            from app.quiz.models import QuestionModel
+
+            # Два запроса независимо от размера списка: вопросы и их ответы
+            query = (
+                select(QuestionModel)
+                .where(QuestionModel.id.in_(set(ids)))
+                .options(*self._answers_options())
+            )
+            result = await session.execute(query)
+            questions = result.scalars().all()
+            await self._fill_answers_from_snapshot(session, questions)
+            by_id = {question.id: question for question in questions}
+
+        # Порядок как в запросе, отсутствующие id пропускаются
+        return [by_id[id_] for id_ in ids if id_ in by_id]
 
     async def list_questions(
-        self, theme_id: Optional[int] = None
+        self, theme_id: int | None = None
     ) -> Sequence["QuestionModel"]:
         async with self.app.database.session() as session:
             from app.quiz.models import QuestionModel
-            query = select(QuestionModel).options(selectinload(QuestionModel.answers))
+            query = select(QuestionModel).options(*self._answers_options())
             
             if theme_id is not None:
                 query = query.where(QuestionModel.theme_id == theme_id)
             
             query = query.order_by(QuestionModel.id)
             result = await session.execute(query)
-            return result.scalars().all()
\ No newline at end of file
+            questions = result.scalars().all()
+            await self._fill_answers_from_snapshot(session, questions)
+            return questions
+
+    async def search_questions(
+        self,
+        query: str,
+        theme_id: int | None = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Sequence["QuestionModel"]:
+        tsquery_text = build_prefix_tsquery(query)
+        if tsquery_text is None:
+            return []
+
+        async with self.app.database.session() as session:
+            from app.quiz.models import SEARCH_CONFIG, QuestionModel
+
+            tsquery = func.to_tsquery(SEARCH_CONFIG, tsquery_text)
+            # Полнотекстовое совпадение или триграммная похожесть на случай
+            # опечаток; оба условия обслуживаются GIN-индексами. Запрос
+            # обычно короче вопроса, поэтому он сравнивается с самым
+            # похожим куском заголовка (word_similarity, query <% title),
+            # а не со всем заголовком
+            condition = or_(
+                QuestionModel.search_vector.op("@@")(tsquery),
+                literal(query).op("<%")(QuestionModel.title),
+            )
+            rank = func.greatest(
+                func.ts_rank_cd(QuestionModel.search_vector, tsquery),
+                func.word_similarity(query, QuestionModel.title),
+            )
+
+            stmt = select(QuestionModel).where(condition)
+            if theme_id is not None:
+                stmt = stmt.where(QuestionModel.theme_id == theme_id)
+
+            stmt = (
+                stmt.order_by(rank.desc(), QuestionModel.id)
+                .limit(limit)
+                .offset(offset)
+                .options(*self._answers_options())
+            )
+            result = await session.execute(stmt)
+            questions = result.scalars().all()
+            await self._fill_answers_from_snapshot(session, questions)
+            return questions
+
+    async def delete_theme(self, theme_id: int) -> dict[str, int]:
+        """
+        Удаляет тему со всеми вопросами и ответами.
+
+        Возвращает, сколько строк каждой таблицы удалено.
+        """
+        from app.quiz.models import QuestionModel, ThemeModel
+
+        themes = (
+            delete(ThemeModel)
+            .where(ThemeModel.id == theme_id)
+            .returning(ThemeModel.id)
+            .cte("deleted_themes")
+        )
+        _, deleted = await self._delete_questions(
+            QuestionModel.theme_id == theme_id, themes
+        )
+        if deleted["themes"]:
+            self.app.store.question_bank.remove_theme(theme_id)
+        return deleted
+
+    async def delete_questions(self, ids: Iterable[int]) -> dict[str, int]:
+        """
+        Удаляет вопросы вместе с их ответами.
+
+        Возвращает, сколько вопросов и ответов удалено.
+        """
+        from app.quiz.models import QuestionModel
+
+        question_ids, deleted = await self._delete_questions(
+            QuestionModel.id.in_(list(ids))
+        )
+        if question_ids:
+            self.app.store.question_bank.remove_questions(question_ids)
+        return deleted
+
+    async def _delete_questions(
+        self, condition: ColumnElement[bool], themes: CTE | None = None
+    ) -> tuple[list[int], dict[str, int]]:
+        from app.quiz.models import (
+            AnswerModel,
+            QuestionDeletionModel,
+            QuestionModel,
+        )
+
+        # Один оператор: каскад расписан по CTE, чтобы RETURNING
+        # посчитал удаленные строки каждой таблицы. Все CTE видят один
+        # снимок, а внешние ключи ON DELETE CASCADE срабатывают уже
+        # после них и находят строки удаленными
+        questions = (
+            delete(QuestionModel)
+            .where(condition)
+            .returning(QuestionModel.id)
+            .cte("deleted_questions")
+        )
+        answers = (
+            delete(AnswerModel)
+            .where(AnswerModel.question_id.in_(select(questions.c.id)))
+            .returning(AnswerModel.id)
+            .cte("deleted_answers")
+        )
+        # Банки других воркеров читают журнал при обновлении. Тема
+        # пишется одной строкой, сколько бы вопросов в ней ни было
+        if themes is None:
+            journal = insert(QuestionDeletionModel).from_select(
+                ["question_id"], select(questions.c.id)
+            )
+        else:
+            journal = insert(QuestionDeletionModel).from_select(
+                ["theme_id"], select(themes.c.id)
+            )
+        # Журнал нужен только банкам, которые отстали меньше чем на срок
+        # хранения; остальные перечитывают БД целиком
+        pruned = delete(QuestionDeletionModel).where(
+            QuestionDeletionModel.created_at
+            < func.now() - DELETIONS_RETENTION
+        )
+        columns = [
+            select(func.array_agg(questions.c.id)).scalar_subquery(),
+            select(func.count()).select_from(answers).scalar_subquery(),
+        ]
+        if themes is not None:
+            columns.append(
+                select(func.count()).select_from(themes).scalar_subquery()
+            )
+        stmt = (
+            select(*columns)
+            .add_cte(journal.cte("journal"))
+            .add_cte(pruned.cte("pruned"))
+        )
+
+        async with self.app.database.session() as session:
+            row = (await session.execute(stmt)).one()
+            await session.commit()
+
+        question_ids = row[0] or []
+        deleted = {"questions": len(question_ids), "answers": row[1]}
+        if themes is not None:
+            deleted["themes"] = row[2]
+        return question_ids, deleted
+
+    async def find_answers_snapshot_drift(self) -> list[int]:
+        # Вопросы, у которых снимок расходится с таблицей answers
+        # (включая вопросы, для которых снимок еще не записан)
+        async with self.app.database.session() as session:
+            result = await session.execute(
+                text(
+                    "SELECT q.id FROM questions AS q "
+                    f"WHERE q.answers_snapshot IS DISTINCT FROM ({ANSWERS_SNAPSHOT_SQL}) "
+                    "ORDER BY q.id"
+                )
+            )
+            return list(result.scalars())
+
+    async def rebuild_answers_snapshots(
+        self, ids: Iterable[int] | None = None
+    ) -> int:
+        async with self.app.database.session() as session:
+            query = (
+                "UPDATE questions AS q "
+                f"SET answers_snapshot = ({ANSWERS_SNAPSHOT_SQL})"
+            )
+            params = {}
+            if ids is not None:
+                query += " WHERE q.id = ANY(:ids)"
+                params["ids"] = list(ids)
+            result = await session.execute(text(query), params)
+            await session.commit()
+            return result.rowcount
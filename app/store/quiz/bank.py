@@ -0,0 +1,554 @@
+import asyncio
+import os
+import random
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy import func, or_, select
+
+from app.base.base_accessor import BaseAccessor
+from app.store.game.state import GameQuestion
+from app.store.quiz.snapshot import (
+    QuestionSegment,
+    Snapshot,
+    SnapshotError,
+    open_snapshot,
+    write_snapshot,
+)
+
+if TYPE_CHECKING:
+    from app.quiz.models import QuestionModel
+    from app.web.app import Application
+
+# Вопросы с id выше max_id - REFRESH_LOOKBACK перечитываются при каждом
+# обновлении: транзакции с меньшими id могли закоммититься позже
+REFRESH_LOOKBACK = 1000
+# То же для журнала удалений question_deletions
+DELETIONS_LOOKBACK = 1000
+# Срок хранения записей журнала. Банк, который не читал журнал дольше,
+# и снимок старше этого срока могли пропустить удаления
+DELETIONS_RETENTION = timedelta(days=1)
+# Удаленные вопросы отсекаются при выборе, а индекс пересобирается,
+# только когда их набралось больше RELOAD_MIN_DELETED и заметной доли
+RELOAD_MIN_DELETED = 1000
+RELOAD_DELETED_SHARE = 0.05
+LOAD_PARTITION = 10_000
+
+
+class QuestionDeck:
+    """
+    Колода вопросов одной игры: случайный выбор без повторов за O(1).
+
+    Ленивый Фишер-Йейтс: перестановка пула не строится целиком,
+    в swaps хранятся только позиции, затронутые уже сделанными выборами.
+    Вопросы, добавленные в банк после создания колоды, тоже попадают в нее.
+    """
+
+    __slots__ = ("generation", "pool", "remaining", "size", "swaps", "theme_id")
+
+    def __init__(
+        self,
+        theme_id: int | None,
+        pool: Sequence[int] | None,
+        size: int,
+        generation: int,
+    ) -> None:
+        self.theme_id = theme_id
+        # None - все вопросы банка, иначе позиции вопросов одной темы
+        self.pool = pool
+        self.size = size
+        self.remaining = size
+        self.swaps: dict[int, int] = {}
+        # Позиции действительны только для той загрузки банка,
+        # при которой колода создана
+        self.generation = generation
+
+    def extend(self, size: int) -> None:
+        # Новые элементы пула встают сразу за невыбранными
+        for index in range(self.size, size):
+            if self.remaining != index:
+                self.swaps[self.remaining] = index
+            self.remaining += 1
+        self.size = size
+
+    def draw(self) -> int | None:
+        if not self.remaining:
+            return None
+
+        last = self.remaining - 1
+        slot = random.randint(0, last)
+        index = self.swaps.get(slot, slot)
+        self.swaps[slot] = self.swaps.pop(last, last)
+        self.remaining = last
+        return index if self.pool is None else self.pool[index]
+
+
+class QuestionIndex:
+    """
+    Одна загрузка банка: вопросы с ответами в компактных массивах.
+
+    Позиции 0..len(base) - вопросы из снимка (QuestionSegment поверх
+    mmap, общий для всех процессов), дальше - tail: вопросы, дочитанные
+    из БД, в обычных array. Без снимка base пуст.
+    """
+
+    def __init__(self) -> None:
+        self.max_id = 0
+        self.snapshot: Snapshot | None = None
+        self.base = QuestionSegment()
+        self.tail = QuestionSegment()
+        self.theme_titles: dict[int, str] = {}
+        # Вопросы грузятся по возрастанию id, поэтому позиция ищется
+        # бинарным поиском по base.ids и tail.ids[:sorted_count]; словарь
+        # нужен только для редких вопросов, дочитанных не по порядку
+        self.sorted_count = 0
+        self.unordered: dict[int, int] = {}
+        self.by_theme: dict[int, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.tail)
+
+    def position(self, id_: int) -> int | None:
+        ids = self.base.ids
+        index = bisect_left(ids, id_)
+        if index < len(ids) and ids[index] == id_:
+            return index
+        ids = self.tail.ids
+        index = bisect_left(ids, id_, 0, self.sorted_count)
+        if index < self.sorted_count and ids[index] == id_:
+            return len(self.base) + index
+        return self.unordered.get(id_)
+
+    def question_id(self, position: int) -> int:
+        if position < len(self.base):
+            return self.base.ids[position]
+        return self.tail.ids[position - len(self.base)]
+
+    def append(
+        self,
+        id_: int,
+        theme_id: int,
+        title: str,
+        answers: Iterable[tuple[str, bool]],
+    ) -> None:
+        if self.position(id_) is not None:
+            return
+
+        position = len(self)
+        if self.sorted_count == len(self.tail) and id_ > self.max_id:
+            self.sorted_count += 1
+        else:
+            self.unordered[id_] = position
+        self.tail.append(id_, theme_id, title, answers)
+        self.by_theme.setdefault(theme_id, array("i")).append(position)
+        self.max_id = max(self.max_id, id_)
+
+    def map_snapshot(self, snapshot: Snapshot) -> None:
+        """Делает снимок основой индекса; вызывается на пустом индексе."""
+        self.snapshot = snapshot
+        self.base = snapshot.segment
+        self.max_id = snapshot.max_id
+        for theme_id, (title, positions) in snapshot.themes.items():
+            self.theme_titles[theme_id] = title
+            # Пулы тем дописываются, поэтому копируются из mmap
+            pool = array("i")
+            pool.frombytes(positions.cast("B"))
+            self.by_theme[theme_id] = pool
+
+    def get(self, position: int) -> GameQuestion:
+        if position < len(self.base):
+            return self.base.question(position)
+        return self.tail.question(position - len(self.base))
+
+
+class QuestionBank(BaseAccessor):
+    """
+    Банк вопросов для игр поверх QuestionIndex.
+
+    Добавленные вопросы дописываются в индекс сразу. Удаления точечно
+    не применяются: id удаленных вопросов и тем попадают в deleted и
+    deleted_themes и отсекаются при выборе. Когда удаленных набирается
+    много, новый индекс собирается в фоне и подменяет старый одним
+    присваиванием.
+    """
+
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+        self._reload_task: asyncio.Task | None = None
+        self.generation = 0
+        # После удалений снимок устарел до выхода следующей версии
+        self._snapshot_stale: os.stat_result | None = None
+        self.clear()
+
+    def clear(self) -> None:
+        if self._reload_task is not None:
+            self._reload_task.cancel()
+            self._reload_task = None
+        self.loaded = False
+        self.generation += 1
+        self.index = QuestionIndex()
+        # Удаленные вопросы и темы, которые еще есть в index
+        self.deleted: set[int] = set()
+        self.deleted_themes: set[int] = set()
+        # До какой записи и когда прочитан журнал удалений
+        self.deletions_seen = 0
+        self._deletions_read_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def snapshot(self) -> Snapshot | None:
+        return self.index.snapshot
+
+    async def connect(self, app: "Application") -> None:
+        await self.load()
+        interval = app.config.quiz.bank_refresh_interval
+        if interval:
+            self._refresh_task = asyncio.create_task(
+                self._refresh_periodically(interval)
+            )
+
+    async def disconnect(self, app: "Application") -> None:
+        for task in (self._refresh_task, self._reload_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._refresh_task = None
+        self._reload_task = None
+
+    def append(
+        self,
+        id_: int,
+        theme_id: int,
+        title: str,
+        answers: Iterable[tuple[str, bool]],
+    ) -> None:
+        self.index.append(id_, theme_id, title, answers)
+
+    def remove_questions(self, ids: Iterable[int]) -> None:
+        self._remove(set(ids))
+
+    def remove_theme(self, theme_id: int) -> None:
+        index = self.index
+        positions = index.by_theme.get(theme_id, ())
+        self._remove(
+            {index.question_id(position) for position in positions},
+            theme_id if positions else None,
+        )
+
+    def _remove(self, ids: set[int], theme_id: int | None = None) -> None:
+        if not ids and theme_id is None:
+            return
+        if self.snapshot is not None:
+            # Снимок тоже хранит удаленные вопросы и в обход него
+            # банк читается до выхода новой версии
+            self._snapshot_stale = self.snapshot.stat
+        # Незагруженный банк и так прочитает БД целиком; загрузка,
+        # которая идет сейчас, могла застать вопросы до удаления
+        if not self.loaded and not self._lock.locked():
+            return
+        self.deleted.update(ids)
+        if theme_id is not None:
+            self.deleted_themes.add(theme_id)
+        if self._needs_reload() and (
+            self._reload_task is None or self._reload_task.done()
+        ):
+            self._reload_task = asyncio.create_task(self._reload())
+
+    def _needs_reload(self) -> bool:
+        return len(self.deleted) > max(
+            RELOAD_MIN_DELETED, len(self.index) * RELOAD_DELETED_SHARE
+        )
+
+    def add_question(self, question: "QuestionModel") -> None:
+        if self.loaded:
+            self.append(
+                question.id,
+                question.theme_id,
+                question.title,
+                [
+                    (answer.title, answer.is_correct)
+                    for answer in question.answers
+                ],
+            )
+
+    def get_by_id(self, id_: int) -> GameQuestion | None:
+        if id_ in self.deleted:
+            return None
+        position = self.index.position(id_)
+        return None if position is None else self.index.get(position)
+
+    def has_theme(self, theme_id: int) -> bool:
+        return (
+            theme_id in self.index.by_theme
+            and theme_id not in self.deleted_themes
+        )
+
+    def deck(self, theme_id: int | None = None) -> QuestionDeck:
+        if theme_id is None:
+            return QuestionDeck(None, None, len(self), self.generation)
+        # Пул темы, которой нет в банке, не заводим: id приходят
+        # из сообщений чата
+        pool = self.index.by_theme.get(theme_id, array("i"))
+        return QuestionDeck(theme_id, pool, len(pool), self.generation)
+
+    def draw(
+        self, deck: QuestionDeck, exclude: frozenset[int] = frozenset()
+    ) -> GameQuestion | None:
+        if deck.generation != self.generation:
+            # Банк перезагружен: собираем колоду заново, уже заданные
+            # вопросы отсекаются через exclude
+            fresh = self.deck(deck.theme_id)
+            for name in QuestionDeck.__slots__:
+                setattr(deck, name, getattr(fresh, name))
+
+        size = len(self) if deck.pool is None else len(deck.pool)
+        if size > deck.size:
+            deck.extend(size)
+
+        # exclude непуст только у игр, восстановленных после рестарта
+        index = self.index
+        while (position := deck.draw()) is not None:
+            id_ = index.question_id(position)
+            if id_ not in exclude and id_ not in self.deleted:
+                return index.get(position)
+        return None
+
+    async def load(self) -> None:
+        async with self._lock:
+            if self.loaded:
+                return
+            # Журнал читается с места до начала загрузки: записи до него
+            # загрузка из БД уже учтет
+            self.deletions_seen = await self._last_deletion_id()
+            await self._swap_index()
+            self.loaded = True
+        self.logger.info(
+            "question bank: %d questions, %d from snapshot",
+            len(self),
+            len(self.index.base),
+        )
+        # Снимок мог застать вопросы, удаленные после его сборки
+        snapshot = self.snapshot
+        await self.apply_deletions(
+            datetime.fromtimestamp(snapshot.stat.st_mtime, UTC)
+            if snapshot is not None
+            else None
+        )
+
+    async def refresh(self) -> int:
+        if not self.loaded:
+            await self.load()
+            return len(self)
+
+        await self.apply_deletions()
+        if self._snapshot_changed():
+            async with self._lock:
+                await self._swap_index()
+            return len(self)
+
+        async with self._lock:
+            before = len(self)
+            await self._load_since(
+                self.index, self.index.max_id - REFRESH_LOOKBACK
+            )
+            return len(self) - before
+
+    async def apply_deletions(self, since: datetime | None = None) -> None:
+        """
+        Убирает вопросы, удаленные через API любого воркера.
+
+        Кроме новых записей журнала читает записи не старше since.
+        """
+        from app.quiz.models import QuestionDeletionModel
+
+        if (
+            time.monotonic() - self._deletions_read_at
+            > DELETIONS_RETENTION.total_seconds()
+        ):
+            # Непрочитанные записи могли уже вычистить
+            async with self._lock:
+                self.deletions_seen = await self._last_deletion_id()
+                await self._swap_index()
+            self._deletions_read_at = time.monotonic()
+            return
+
+        condition = (
+            QuestionDeletionModel.id > self.deletions_seen - DELETIONS_LOOKBACK
+        )
+        if since is not None:
+            condition = or_(
+                condition, QuestionDeletionModel.created_at >= since
+            )
+        async with self.app.database.session() as session:
+            rows = (
+                await session.execute(
+                    select(
+                        QuestionDeletionModel.id,
+                        QuestionDeletionModel.question_id,
+                        QuestionDeletionModel.theme_id,
+                    ).where(condition)
+                )
+            ).all()
+        self._deletions_read_at = time.monotonic()
+        if not rows:
+            return
+        self.deletions_seen = max(
+            self.deletions_seen, *(id_ for id_, _, _ in rows)
+        )
+        index = self.index
+        for _, _, theme_id in rows:
+            if theme_id is not None and self.has_theme(theme_id):
+                self.remove_theme(theme_id)
+        self.remove_questions(
+            question_id
+            for _, question_id, _ in rows
+            if question_id is not None
+            and question_id not in self.deleted
+            and index.position(question_id) is not None
+        )
+
+    async def _last_deletion_id(self) -> int:
+        from app.quiz.models import QuestionDeletionModel
+
+        async with self.app.database.session() as session:
+            last = await session.scalar(
+                select(func.max(QuestionDeletionModel.id))
+            )
+        return last or 0
+
+    async def _reload(self) -> None:
+        # Удаления, пришедшие во время сборки, могут потребовать еще одной;
+        # сборка, которая ничего не отсекла, не повторяется
+        while self._needs_reload():
+            before = len(self.deleted)
+            try:
+                async with self._lock:
+                    await self._swap_index()
+            except Exception:
+                self.logger.exception("question bank reload error")
+                return
+            if len(self.deleted) >= before:
+                return
+
+    async def _swap_index(self) -> None:
+        index = QuestionIndex()
+        snapshot = self._open_snapshot()
+        if snapshot is not None:
+            index.map_snapshot(snapshot)
+            # Снимок мог не застать поздно закоммиченные вопросы
+            await self._load_since(index, snapshot.max_id - REFRESH_LOOKBACK)
+        else:
+            await self._load_since(index, 0)
+        self.index = index
+        self.generation += 1
+        # Отсекать нужно только то, что еще осталось в новом индексе:
+        # вопросы, удаленные во время чтения
+        self.deleted = {
+            id_ for id_ in self.deleted if index.position(id_) is not None
+        }
+        self.deleted_themes &= index.by_theme.keys()
+
+    async def _refresh_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception:
+                self.logger.exception("question bank refresh error")
+
+    def _snapshot_stat(self) -> os.stat_result | None:
+        path = self.app.config.quiz.bank_snapshot_path
+        if not path:
+            return None
+        try:
+            return os.stat(path)
+        except FileNotFoundError:
+            return None
+
+    def _snapshot_changed(self) -> bool:
+        # os.replace подменяет inode, по нему и видна новая версия
+        stat = self._snapshot_stat()
+        current = self.snapshot.stat if self.snapshot else self._snapshot_stale
+        return stat is not None and (
+            current is None
+            or (stat.st_ino, stat.st_mtime_ns)
+            != (current.st_ino, current.st_mtime_ns)
+        )
+
+    def _open_snapshot(self) -> Snapshot | None:
+        stat = self._snapshot_stat()
+        if stat is None:
+            return None
+        stale = self._snapshot_stale
+        if stale is not None and (stat.st_ino, stat.st_mtime_ns) == (
+            stale.st_ino,
+            stale.st_mtime_ns,
+        ):
+            return None
+        if time.time() - stat.st_mtime > DELETIONS_RETENTION.total_seconds():
+            # Удаления после сборки такого снимка в журнале уже не найти
+            self.logger.warning("question bank snapshot is too old")
+            return None
+        self._snapshot_stale = None
+        try:
+            return open_snapshot(self.app.config.quiz.bank_snapshot_path)
+        except (OSError, SnapshotError):
+            self.logger.exception("question bank snapshot is unusable")
+            # Битый файл не перечитываем до следующей версии
+            self._snapshot_stale = stat
+            return None
+
+    def write_snapshot(self, path: str) -> None:
+        index = self.index
+        if len(index.base) or index.unordered:
+            raise SnapshotError("snapshot is built from a fresh full load")
+        write_snapshot(path, index.tail, index.theme_titles, index.max_id)
+
+    async def load_theme_titles(self) -> None:
+        from app.quiz.models import ThemeModel
+
+        async with self.app.database.session() as session:
+            rows = await session.execute(
+                select(ThemeModel.id, ThemeModel.title)
+            )
+            self.index.theme_titles.update(rows.tuples())
+
+    async def _load_since(self, index: QuestionIndex, min_id: int) -> None:
+        from app.quiz.models import AnswerModel, QuestionModel
+
+        async with self.app.database.session() as session:
+            # Один поток строк вопрос+ответ в порядке id: ответы вопроса
+            # идут подряд, промежуточный словарь не нужен
+            rows = await session.stream(
+                select(
+                    QuestionModel.id,
+                    QuestionModel.theme_id,
+                    QuestionModel.title,
+                    AnswerModel.title,
+                    AnswerModel.is_correct,
+                )
+                .outerjoin(AnswerModel)
+                .where(QuestionModel.id > min_id)
+                .order_by(QuestionModel.id, AnswerModel.id)
+                .execution_options(yield_per=LOAD_PARTITION)
+            )
+            current = None
+            answers: list[tuple[str, bool]] = []
+            async for id_, theme_id, title, answer, is_correct in rows:
+                if current is None or current[0] != id_:
+                    if current is not None:
+                        index.append(*current, answers)
+                    current = (id_, theme_id, title)
+                    answers = []
+                if answer is not None:
+                    answers.append((answer, is_correct))
+            if current is not None:
+                index.append(*current, answers)
@@ -0,0 +1,317 @@
+import argparse
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+from app.store.game.state import GameQuestion
+
+MAGIC = b"QBNK"
+VERSION = 2
+# magic, версия, порядок байт (1 - little), вопросов, строк, тем, max id
+HEADER = struct.Struct("<4sIIIIIq")
+# Каждая секция описана парой (смещение, длина в байтах)
+SECTIONS = (
+    ("ids", "i"),
+    ("themes", "i"),
+    ("correct", "I"),
+    ("first", "I"),
+    ("offsets", "I"),
+    ("text", "B"),
+    ("theme_ids", "i"),
+    ("theme_titles", "I"),
+    ("theme_first", "I"),
+    ("theme_positions", "i"),
+)
+SECTION = struct.Struct("<QQ")
+ALIGN = 8
+
+logger = logging.getLogger("snapshot")
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class QuestionSegment:
+    """
+    Вопросы подряд в типизированных последовательностях.
+
+    Строки (формулировки и ответы) лежат в text в UTF-8, на них
+    указывают offsets. Вопрос i занимает строки first[i]..first[i + 1]:
+    формулировку, затем ответы. Последовательности - либо array
+    (сегмент дописывается), либо memoryview над mmap (только чтение).
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[int] | None = None,
+        themes: Sequence[int] | None = None,
+        correct: Sequence[int] | None = None,
+        first: Sequence[int] | None = None,
+        offsets: Sequence[int] | None = None,
+        text: bytearray | memoryview | None = None,
+    ) -> None:
+        # id в БД - integer, хватает 4 байт
+        self.ids = array("i") if ids is None else ids
+        self.themes = array("i") if themes is None else themes
+        # Номер верного ответа: ответов у вопроса может быть больше 255
+        self.correct = array("I") if correct is None else correct
+        # Смещения в 4 байта ограничивают текст 4 ГБ (~25M вопросов)
+        self.first = array("I", [0]) if first is None else first
+        self.offsets = array("I", [0]) if offsets is None else offsets
+        self.text = bytearray() if text is None else text
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def string(self, index: int) -> str:
+        return str(
+            self.text[self.offsets[index] : self.offsets[index + 1]], "utf-8"
+        )
+
+    def add_string(self, value: str) -> int:
+        self.text += value.encode()
+        self.offsets.append(len(self.text))
+        return len(self.offsets) - 2
+
+    def append(
+        self,
+        id_: int,
+        theme_id: int,
+        title: str,
+        answers: Iterable[tuple[str, bool]],
+    ) -> None:
+        self.ids.append(id_)
+        self.themes.append(theme_id)
+        self.add_string(title)
+        correct = None
+        for number, (answer, is_correct) in enumerate(answers):
+            self.add_string(answer)
+            # Как и GameQuestion.from_model, берем первый верный ответ
+            if is_correct and correct is None:
+                correct = number
+        self.correct.append(correct or 0)
+        self.first.append(len(self.offsets) - 1)
+
+    def question(self, index: int) -> GameQuestion:
+        first, end = self.first[index], self.first[index + 1]
+        return GameQuestion(
+            self.ids[index],
+            self.string(first),
+            tuple(self.string(string) for string in range(first + 1, end)),
+            self.correct[index],
+        )
+
+
+@dataclass
+class Snapshot:
+    segment: QuestionSegment
+    max_id: int
+    # id темы -> (название, позиции ее вопросов в сегменте)
+    themes: dict[int, tuple[str, memoryview]]
+    # Держим mmap открытым, пока на него ссылаются memoryview
+    mapping: mmap.mmap
+    stat: os.stat_result
+
+
+def write_snapshot(
+    path: str,
+    segment: QuestionSegment,
+    theme_titles: dict[int, str],
+    max_id: int,
+) -> None:
+    """
+    Пишет снимок во временный файл рядом и атомарно подменяет path.
+
+    Процессы, успевшие открыть старую версию, дочитывают ее.
+    """
+    if list(segment.ids) != sorted(segment.ids):
+        raise SnapshotError("questions must be ordered by id")
+
+    by_theme: dict[int, array] = {
+        theme_id: array("i") for theme_id in theme_titles
+    }
+    for position, theme_id in enumerate(segment.themes):
+        by_theme.setdefault(theme_id, array("i")).append(position)
+
+    strings = QuestionSegment(
+        text=bytearray(segment.text), offsets=array("I", segment.offsets)
+    )
+    theme_ids = array("i", sorted(by_theme))
+    theme_title_strings = array(
+        "I",
+        [strings.add_string(theme_titles.get(id_, "")) for id_ in theme_ids],
+    )
+    theme_first = array("I", [0])
+    theme_positions = array("i")
+    for theme_id in theme_ids:
+        theme_positions.extend(by_theme[theme_id])
+        theme_first.append(len(theme_positions))
+
+    sections = {
+        "ids": segment.ids,
+        "themes": segment.themes,
+        "correct": segment.correct,
+        "first": segment.first,
+        "offsets": strings.offsets,
+        "text": strings.text,
+        "theme_ids": theme_ids,
+        "theme_titles": theme_title_strings,
+        "theme_first": theme_first,
+        "theme_positions": theme_positions,
+    }
+    table_size = HEADER.size + SECTION.size * len(SECTIONS)
+    position = _aligned(table_size)
+    layout = []
+    for name, _ in SECTIONS:
+        data = bytes(sections[name])
+        layout.append((position, data))
+        position = _aligned(position + len(data))
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as file:
+        file.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                int(sys.byteorder == "little"),
+                len(segment),
+                len(strings.offsets) - 1,
+                len(theme_ids),
+                max_id,
+            )
+        )
+        for offset, data in layout:
+            file.write(SECTION.pack(offset, len(data)))
+        for offset, data in layout:
+            file.seek(offset)
+            file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def open_snapshot(path: str) -> Snapshot:
+    """
+    Отображает снимок в память только для чтения.
+
+    Страницы общие для всех процессов, открывших тот же файл.
+    Битый или обрезанный файл дает SnapshotError.
+    """
+    with open(path, "rb") as file:
+        stat = os.fstat(file.fileno())
+        if stat.st_size < HEADER.size + SECTION.size * len(SECTIONS):
+            raise SnapshotError(f"{path}: snapshot is truncated")
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    max_id, sections = _read_sections(path, mapping)
+    segment = QuestionSegment(
+        ids=sections["ids"],
+        themes=sections["themes"],
+        correct=sections["correct"],
+        first=sections["first"],
+        offsets=sections["offsets"],
+        text=sections["text"],
+    )
+    themes = {}
+    theme_first = sections["theme_first"]
+    for index, theme_id in enumerate(sections["theme_ids"]):
+        themes[theme_id] = (
+            segment.string(sections["theme_titles"][index]),
+            sections["theme_positions"][
+                theme_first[index] : theme_first[index + 1]
+            ],
+        )
+    return Snapshot(segment, max_id, themes, mapping, stat)
+
+
+def _read_sections(
+    path: str, mapping: mmap.mmap
+) -> tuple[int, dict[str, memoryview]]:
+    magic, version, little, questions, strings, theme_count, max_id = (
+        HEADER.unpack_from(mapping)
+    )
+    if magic != MAGIC or version != VERSION:
+        raise SnapshotError(f"{path}: unsupported snapshot format")
+    if little != int(sys.byteorder == "little"):
+        raise SnapshotError(f"{path}: snapshot has different byte order")
+
+    # Длины секций в элементах; text и theme_positions проверяются
+    # по секциям, которые на них ссылаются
+    expected = {
+        "ids": questions,
+        "themes": questions,
+        "correct": questions,
+        "first": questions + 1,
+        "offsets": strings + 1,
+        "theme_ids": theme_count,
+        "theme_titles": theme_count,
+        "theme_first": theme_count + 1,
+    }
+    view = memoryview(mapping)
+    sections = {}
+    for index, (name, fmt) in enumerate(SECTIONS):
+        offset, length = SECTION.unpack_from(
+            mapping, HEADER.size + index * SECTION.size
+        )
+        size = struct.calcsize(fmt)
+        if (
+            offset + length > len(mapping)
+            or offset % size
+            or length % size
+            or expected.get(name, length // size) != length // size
+        ):
+            raise SnapshotError(f"{path}: section {name} is corrupted")
+        data = view[offset : offset + length]
+        sections[name] = data if name == "text" else data.cast(fmt)
+
+    if (
+        sections["first"][-1] > strings
+        or sections["offsets"][-1] > len(sections["text"])
+        or sections["theme_first"][-1] > len(sections["theme_positions"])
+    ):
+        raise SnapshotError(f"{path}: snapshot is inconsistent")
+    return max_id, sections
+
+
+def _aligned(position: int) -> int:
+    return (position + ALIGN - 1) // ALIGN * ALIGN
+
+
+async def build(config_path: str, path: str) -> int:
+    from app.web.app import setup_app
+
+    app = setup_app(config_path)
+    # Снимок всегда строится из БД, а не из предыдущего снимка
+    app.config.quiz.bank_snapshot_path = ""
+    await app.database.connect()
+    try:
+        bank = app.store.question_bank
+        await bank.load()
+        await bank.load_theme_titles()
+        bank.write_snapshot(path)
+        return len(bank)
+    finally:
+        await app.database.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Экспорт банка вопросов в снимок для mmap"
+    )
+    parser.add_argument("path")
+    parser.add_argument("--config", default="config.yml")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    count = asyncio.run(build(args.config, args.path))
+    logger.info("%s: %d questions", args.path, count)
+
+
+if __name__ == "__main__":
+    main()
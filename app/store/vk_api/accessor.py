@@ -1,23 +1,32 @@
+import asyncio
 import random
+import time
 import typing
+from functools import cached_property
 from urllib.parse import urlencode, urljoin
 
-from aiohttp import TCPConnector
+from aiohttp import ClientTimeout
 from aiohttp.client import ClientSession
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 
 from app.base.base_accessor import BaseAccessor
-from app.store.vk_api.dataclasses import (
-    Message,
-    Update,
-    UpdateMessage,
-    UpdateObject,
-)
+from app.store.vk_api.dataclasses import Message
+from app.store.vk_api.exceptions import VkApiError
+from app.store.vk_api.http import HttpMetrics, create_session
+from app.store.vk_api.parser import UpdateParser
 from app.store.vk_api.poller import Poller
+from app.store.vk_api.recorder import LongPollRecorder
+from app.store.vk_api.sender import MessageSender, recipient_params
+from app.store.vk_api.state import (
+    LongPollCheckpoint,
+    RecentIds,
+    message_key,
+)
 
 if typing.TYPE_CHECKING:
     from app.web.app import Application
 
-API_PATH = "https://api.vk.com/method/"
 API_VERSION = "5.131"
 
 
@@ -29,93 +38,275 @@ class VkApiAccessor(BaseAccessor):
         self.key: str | None = None
         self.server: str | None = None
         self.poller: Poller | None = None
-        self.ts: int | None = None
+        self.sender: MessageSender | None = None
+        self.recorder: LongPollRecorder | None = None
+        self.ts: str | None = None
+        self.checkpoint: LongPollCheckpoint | None = None
+        # event_id недавно принятых событий Callback API
+        self.callback_events = RecentIds(app.config.bot.dedup_size)
+        self.parser = UpdateParser(self.logger)
+        self.http_metrics = HttpMetrics()
+        self._long_poll_base: tuple[tuple, str] | None = None
+        self.long_poll_timeout: ClientTimeout | None = None
+        self._state_saved_at = 0.0
 
     async def connect(self, app: "Application") -> None:
-        self.session = ClientSession(connector=TCPConnector(verify_ssl=False))
+        http = app.config.http
+        self.session = create_session(http, self.http_metrics)
+        self.long_poll_timeout = ClientTimeout(
+            total=http.long_poll_wait + http.long_poll_margin,
+            connect=http.connect_timeout,
+        )
+        self._long_poll_base = None
+
+        self.sender = MessageSender(
+            self,
+            rate_limit=app.config.bot.rate_limit,
+            linger=app.config.bot.send_linger,
+        )
+        self.sender.start()
+
+        app.store.bots_manager.start()
+
+        # В режиме Callback API апдейты приходят в /vk.callback
+        if app.config.bot.mode == "callback":
+            self.logger.info("waiting for callback api events")
+            return
+
+        self.checkpoint = LongPollCheckpoint(app.config.bot.dedup_size)
+        if app.config.bot.persist_state:
+            try:
+                await self._load_state()
+            except Exception as e:
+                self.logger.error("Exception", exc_info=e)
 
         try:
-            await self._get_long_poll_service()
+            # Продолжаем с сохраненного ts, чтобы не потерять апдейты,
+            # пришедшие пока бот был выключен
+            await self._get_long_poll_service(
+                update_ts=self.checkpoint.ts is None
+            )
         except Exception as e:
             self.logger.error("Exception", exc_info=e)
+        if self.checkpoint.ts is not None:
+            self.ts = self.checkpoint.ts
+
+        if app.config.bot.record_path:
+            self.recorder = LongPollRecorder(app.config.bot.record_path)
+            self.logger.info("recording long poll to %s", self.recorder.path)
 
         self.poller = Poller(app.store)
         self.logger.info("start polling")
         self.poller.start()
 
     async def disconnect(self, app: "Application") -> None:
+        # Сначала прекращаем прием, затем дообрабатываем очередь,
+        # и только потом закрываем сессию, через которую идут ответы
+        if self.poller:
+            await self.poller.stop()
+
+        if self.recorder:
+            await self.recorder.close()
+            self.recorder = None
+
+        await app.store.bots_manager.stop()
+
+        if self.checkpoint and app.config.bot.persist_state:
+            self.checkpoint.advance()
+            if self.checkpoint.dirty:
+                try:
+                    await self._save_state()
+                except Exception as e:
+                    self.logger.error("Exception", exc_info=e)
+
+        if self.sender:
+            await self.sender.stop()
+            self.sender = None
+
         if self.session:
             await self.session.close()
 
-        if self.poller:
-            await self.poller.stop()
+    @cached_property
+    def base_params(self) -> dict:
+        return {"access_token": self.app.config.bot.token, "v": API_VERSION}
 
     @staticmethod
     def _build_query(host: str, method: str, params: dict) -> str:
         params.setdefault("v", API_VERSION)
         return f"{urljoin(host, method)}?{urlencode(params)}"
 
-    async def _get_long_poll_service(self) -> None:
+    def _long_poll_url(self) -> str:
+        # Меняется только ts, поэтому остальную часть URL
+        # собираем заново лишь при смене сервера или ключа
+        server_key = (self.server, self.key)
+        base = self._long_poll_base
+        if base is None or base[0] != server_key:
+            query = urlencode(
+                {
+                    "act": "a_check",
+                    "key": self.key,
+                    "wait": self.app.config.http.long_poll_wait,
+                }
+            )
+            self._long_poll_base = (server_key, f"{self.server}?{query}&ts=")
+        return f"{self._long_poll_base[1]}{self.ts}"
+
+    def stats(self) -> dict:
+        return {
+            "http": self.http_metrics.stats(),
+            "parser": self.parser.stats(),
+        }
+
+    async def _get_long_poll_service(self, update_ts: bool = True) -> None:
         async with self.session.get(
             self._build_query(
-                host=API_PATH,
+                host=self.app.config.bot.api_path,
                 method="groups.getLongPollServer",
                 params={
                     "group_id": self.app.config.bot.group_id,
-                    "access_token": self.app.config.bot.token,
+                    **self.base_params,
                 },
             )
         ) as response:
             data = (await response.json())["response"]
             self.key = data["key"]
             self.server = data["server"]
-            self.ts = data["ts"]
+            if update_ts:
+                self.ts = data["ts"]
+
+    async def _load_state(self) -> None:
+        from app.bot.models import VkLongPollStateModel
+
+        async with self.app.database.session() as session:
+            state = await session.scalar(
+                select(VkLongPollStateModel).where(
+                    VkLongPollStateModel.group_id
+                    == self.app.config.bot.group_id
+                )
+            )
+        if state is not None:
+            self.checkpoint.restore(state.ts, state.recent_ids)
+            self.logger.info("resume long poll from ts %s", state.ts)
+
+    async def _save_state(self) -> None:
+        from app.bot.models import VkLongPollStateModel
+
+        if self.checkpoint.ts is None:
+            return
+
+        values = {
+            "group_id": self.app.config.bot.group_id,
+            "ts": self.checkpoint.ts,
+            "recent_ids": self.checkpoint.handled.to_list(),
+        }
+        # Сбрасываем флаг до записи: апдейты, обработанные во время
+        # запроса, попадут в следующее сохранение
+        self.checkpoint.dirty = False
+        self._state_saved_at = time.monotonic()
+        async with self.app.database.session() as session:
+            stmt = insert(VkLongPollStateModel).values(**values)
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[VkLongPollStateModel.group_id],
+                    set_={
+                        "ts": stmt.excluded.ts,
+                        "recent_ids": stmt.excluded.recent_ids,
+                        "updated_at": stmt.excluded.updated_at,
+                    },
+                )
+            )
+            await session.commit()
+
+    async def _maybe_save_state(self) -> None:
+        if not self.app.config.bot.persist_state:
+            return
+
+        self.checkpoint.advance()
+        interval = self.app.config.bot.state_save_interval
+        if (
+            self.checkpoint.dirty
+            and time.monotonic() - self._state_saved_at >= interval
+        ):
+            await self._save_state()
 
     async def poll(self):
         async with self.session.get(
-            self._build_query(
-                host=self.server,
-                method="",
-                params={
-                    "act": "a_check",
-                    "key": self.key,
-                    "ts": self.ts,
-                    "wait": 30,
-                },
-            )
+            self._long_poll_url(), timeout=self.long_poll_timeout
         ) as response:
             data = await response.json()
+
+        if self.recorder is not None:
+            await self.recorder.write(data)
+
+        # Полный ответ пишем в лог лишь изредка: на потоке в сотни
+        # апдейтов в секунду форматирование сырых данных заметно
+        if random.random() < self.app.config.bot.raw_log_sample_rate:
             self.logger.info(data)
+
+        # https://dev.vk.com/api/bots-long-poll/getting-started
+        failed = data.get("failed")
+        if failed == 1:
+            # История устарела или частично потеряна, VK вернул новый ts
             self.ts = data["ts"]
+            return
+        if failed == 2:
+            await self._get_long_poll_service(update_ts=False)
+            return
+        if failed == 3:
+            await self._get_long_poll_service()
+            return
 
-            updates = [
-                Update(
-                    type=update["type"],
-                    object=UpdateObject(
-                        message=UpdateMessage(
-                            id=update["object"]["message"]["id"],
-                            from_id=update["object"]["message"]["from_id"],
-                            text=update["object"]["message"]["text"],
-                        )
-                    ),
-                )
-                for update in data.get("updates", [])
-            ]
-            await self.app.store.bots_manager.handle_updates(updates)
+        ts = data["ts"]
+        updates = []
+        keys = []
+        for update in self.parser.parse_many(data.get("updates", ())):
+            key = message_key(update.object.message)
+            if not self.checkpoint.is_duplicate(key):
+                updates.append(update)
+                keys.append(key)
 
-    async def send_message(self, message: Message) -> None:
-        async with self.session.get(
-            self._build_query(
-                API_PATH,
-                "messages.send",
-                params={
-                    "user_id": message.user_id,
-                    "random_id": random.randint(1, 2**32),
-                    "peer_id": f"-{self.app.config.bot.group_id}",
-                    "message": message.text,
-                    "access_token": self.app.config.bot.token,
-                },
-            )
+        # Пустые пачки тоже отслеживаем, иначе ts не сдвинется
+        # до прихода следующего сообщения
+        done = asyncio.get_running_loop().create_future()
+        self.checkpoint.track(ts, keys, done)
+        if updates:
+            # При переполненной очереди ждем здесь: это и есть backpressure
+            await self.app.store.bots_manager.queue.put(updates, done)
+        else:
+            done.set_result(None)
+        self.ts = ts
+
+        try:
+            await self._maybe_save_state()
+        except Exception as e:
+            self.logger.error("Exception", exc_info=e)
+
+    async def api_post(self, method: str, params: dict) -> dict:
+        # Параметры и токен уходят в теле запроса, а не в URL
+        async with self.session.post(
+            urljoin(self.app.config.bot.api_path, method),
+            data={**params, **self.base_params},
         ) as response:
             data = await response.json()
-            self.logger.info(data)
+
+        if "error" in data:
+            raise VkApiError(
+                data["error"].get("error_code", 0),
+                data["error"].get("error_msg", "unknown"),
+            )
+        return data
+
+    async def send_message(self, message: Message) -> None:
+        if self.sender is not None:
+            await self.sender.send(message)
+            return
+
+        params = {
+            **recipient_params(message.user_id, self.app.config.bot.group_id),
+            "random_id": message.random_id or random.randint(1, 2**31 - 1),
+            "message": message.text,
+        }
+        if message.keyboard is not None:
+            params["keyboard"] = message.keyboard
+        data = await self.api_post("messages.send", params=params)
+        self.logger.info(data)
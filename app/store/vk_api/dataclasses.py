@@ -3,25 +3,34 @@ from dataclasses import dataclass
 
 # Базовые структуры, для выполнения задания их достаточно,
 # поэтому постарайтесь не менять их, пожалуйста, из-за возможных проблем с тестами
-@dataclass
+@dataclass(slots=True)
 class Message:
     user_id: int
     text: str
+    # Задается, когда сообщение может быть отправлено повторно (outbox)
+    random_id: int | None = None
+    # Сериализованная клавиатура VK (JSON)
+    keyboard: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class UpdateMessage:
     from_id: int
     text: str
     id: int
+    # Беседа или личный диалог, куда пришло сообщение
+    peer_id: int | None = None
+    # Номер сообщения внутри диалога; в беседах VK присылает боту id=0,
+    # и сообщение однозначно определяет только пара (peer_id, этот номер)
+    conversation_message_id: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class UpdateObject:
     message: UpdateMessage
 
 
-@dataclass
+@dataclass(slots=True)
 class Update:
     type: str
     object: UpdateObject
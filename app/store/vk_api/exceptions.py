@@ -0,0 +1,9 @@
+class VkApiError(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(f"[{code}] {message}")
+        self.code = code
+        self.message = message
+
+
+class SenderStoppedError(Exception):
+    """Сообщение не отправлено: отправитель остановлен."""
@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, TraceConfig
+
+from app.web.config import HttpClientConfig
+
+
+@dataclass
+class HttpMetrics:
+    requests: int = 0
+    # Каждое новое соединение к https-хосту - это TCP + TLS handshake
+    connections_created: int = 0
+    connections_reused: int = 0
+    dns_lookups: int = 0
+    dns_cache_hits: int = 0
+
+    def stats(self) -> dict:
+        connections = self.connections_created + self.connections_reused
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": (
+                self.connections_reused / connections if connections else 0.0
+            ),
+            "dns_lookups": self.dns_lookups,
+            "dns_cache_hits": self.dns_cache_hits,
+        }
+
+
+def _trace_config(metrics: HttpMetrics) -> TraceConfig:
+    def counter(name: str):
+        # aiohttp ждет от сигналов трассировки корутину, даже если
+        # обработчику нечего ждать
+        async def on_signal(  # ruff: ignore[unused-async]
+            session: ClientSession, context: SimpleNamespace, params
+        ) -> None:
+            setattr(metrics, name, getattr(metrics, name) + 1)
+
+        return on_signal
+
+    trace = TraceConfig()
+    trace.on_request_start.append(counter("requests"))
+    trace.on_connection_create_end.append(counter("connections_created"))
+    trace.on_connection_reuseconn.append(counter("connections_reused"))
+    trace.on_dns_resolvehost_end.append(counter("dns_lookups"))
+    trace.on_dns_cache_hit.append(counter("dns_cache_hits"))
+    return trace
+
+
+def create_session(
+    config: HttpClientConfig, metrics: HttpMetrics
+) -> ClientSession:
+    """
+    Одна сессия на процесс.
+
+    Соединения с api.vk.com и lp.vk.com переиспользуются между
+    запросами, TLS handshake не повторяется.
+    """
+    connector = TCPConnector(
+        limit=config.limit,
+        limit_per_host=config.limit_per_host,
+        keepalive_timeout=config.keepalive_timeout,
+        ttl_dns_cache=config.dns_cache_ttl,
+        ssl=config.verify_ssl,
+    )
+    return ClientSession(
+        connector=connector,
+        timeout=ClientTimeout(
+            total=config.api_timeout, connect=config.connect_timeout
+        ),
+        trace_configs=[_trace_config(metrics)],
+    )
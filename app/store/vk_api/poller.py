@@ -5,6 +5,8 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from app.store import Store
 
+MAX_BACKOFF = 30
+
 
 class Poller:
     def __init__(self, store: "Store") -> None:
@@ -13,6 +15,8 @@ class Poller:
         self.poll_task: Task | None = None
 
     def _done_callback(self, result: Future) -> None:
+        if result.cancelled():
+            return
         if result.exception():
             self.store.app.logger.exception(
                 "poller stopped with exception", exc_info=result.exception()
@@ -26,14 +30,29 @@ class Poller:
         self.poll_task.add_done_callback(self._done_callback)
 
     async def stop(self) -> None:
+        """
+        Прерывает опрос, не дожидаясь ответа на текущий long poll.
+
+        Ответ может идти до wait секунд, а воркер, переставший быть
+        лидером, за это время уже уступил блокировку: новый лидер опросит
+        VK с того же ts. Прерванная пачка не попадает в очередь и не
+        сдвигает ts, ее получит новый лидер.
+        """
         self.is_running = False
         if self.poll_task:
-            await self.poll_task
+            self.poll_task.cancel()
+            await asyncio.gather(self.poll_task, return_exceptions=True)
+            self.poll_task = None
 
     async def poll(self) -> None:
+        errors = 0
         while self.is_running:
             try:
                 await self.store.vk_api.poll()
-            except Exception as e:
+                errors = 0
+            except Exception:
                 self.store.app.logger.exception("Polling error")
-                await asyncio.sleep(1)
\ No newline at end of file
+                # Не долбим VK, пока он недоступен: 1, 2, 4 ... 30 секунд
+                await asyncio.sleep(min(2**errors, MAX_BACKOFF))
+                # 2**5 уже больше MAX_BACKOFF, дальше счетчик не растет
+                errors = min(errors + 1, 5)
@@ -0,0 +1,69 @@
+import asyncio
+import gzip
+import json
+import time
+from collections.abc import Iterator
+
+
+class LongPollRecorder:
+    """
+    Дописывает сырые ответы long poll в gzip-файл.
+
+    Одна строка JSON на ответ: {"t": unix time, "response": {...}}.
+    Ответы копятся в памяти и сбрасываются пачкой по flush_every штук,
+    каждая пачка - отдельный gzip member. Сжатие и запись идут в
+    потоке, чтобы не блокировать цикл событий. При падении теряется
+    только несброшенный хвост, а недописанный member read_recording
+    пропускает.
+    """
+
+    def __init__(self, path: str, flush_every: int = 100) -> None:
+        self.path = path
+        self.flush_every = flush_every
+        self.records = 0
+        self._buffer: list[str] = []
+
+    async def write(self, response: dict) -> None:
+        self._buffer.append(
+            json.dumps(
+                {"t": time.time(), "response": response}, ensure_ascii=False
+            )
+            + "\n"
+        )
+        self.records += 1
+        if len(self._buffer) >= self.flush_every:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        await asyncio.to_thread(self._append, "".join(lines))
+
+    async def close(self) -> None:
+        await self.flush()
+
+    def _append(self, text: str) -> None:
+        data = gzip.compress(text.encode("utf-8"))
+        with open(self.path, "ab") as file:
+            file.write(data)
+
+
+def read_recording(path: str) -> Iterator[tuple[float, dict]]:
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        while True:
+            try:
+                line = file.readline()
+            except (EOFError, gzip.BadGzipFile):
+                # Последний member мог не дописаться при падении
+                break
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Последняя строка могла не дописаться при падении
+                break
+            yield record["t"], record["response"]
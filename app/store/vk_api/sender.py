@@ -0,0 +1,231 @@
+import asyncio
+import json
+import random
+import time
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from app.base.metrics import LatencyStats
+from app.store.vk_api.dataclasses import Message
+from app.store.vk_api.exceptions import SenderStoppedError, VkApiError
+from app.store.vk_api.rate_limiter import TokenBucket
+
+if TYPE_CHECKING:
+    from app.store.vk_api.accessor import VkApiAccessor
+
+# Максимум обращений к API внутри одного execute
+EXECUTE_BATCH_SIZE = 25
+# Too many requests per second, flood control, rate limit reached
+RATE_LIMIT_ERRORS = frozenset({6, 9, 29})
+# peer_id бесед начинаются с 2e9, меньшие значения - личные диалоги
+CHAT_PEER_ID_OFFSET = 2_000_000_000
+
+
+def recipient_params(user_id: int, group_id: int) -> dict:
+    if user_id >= CHAT_PEER_ID_OFFSET:
+        return {"peer_id": user_id}
+    return {"user_id": user_id, "peer_id": f"-{group_id}"}
+
+
+class _Outgoing:
+    __slots__ = (
+        "attempts",
+        "enqueued_at",
+        "future",
+        "message",
+        "random_id",
+        "retry",
+    )
+
+    def __init__(self, message: Message, future: asyncio.Future) -> None:
+        self.message = message
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+        self.retry: asyncio.TimerHandle | None = None
+        # Один random_id на все попытки: VK не доставит дубль при ретрае
+        self.random_id = message.random_id or random.randint(1, 2**31 - 1)
+
+
+class MessageSender:
+    """
+    Склеивает исходящие сообщения в execute-запросы по 25 вызовов.
+
+    Запросы отправляются с учетом лимита запросов группы.
+    """
+
+    def __init__(
+        self,
+        accessor: "VkApiAccessor",
+        rate_limit: float = 20,
+        linger: float = 0.02,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+    ) -> None:
+        self.accessor = accessor
+        self.limiter = TokenBucket(rate_limit)
+        self.linger = linger
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.logger = getLogger("sender")
+
+        self._queue: asyncio.Queue[_Outgoing] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+        self._in_flight: set[asyncio.Task] = set()
+        # Все сообщения, по которым send еще ждет ответа: в очереди,
+        # в собираемой пачке, в запросе или в ожидании ретрая
+        self._unsent: set[_Outgoing] = set()
+
+        # От постановки в очередь до подтверждения от API
+        self.latency = LatencyStats()
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.requests = 0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+        # Все, что не успело уйти, завершается ошибкой, чтобы
+        # ожидающие send не зависли до конца остановки приложения
+        error = SenderStoppedError("sender is stopped")
+        for item in list(self._unsent):
+            if item.retry is not None:
+                item.retry.cancel()
+            self._fail(item, error)
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    async def send(self, message: Message) -> None:
+        future = asyncio.get_running_loop().create_future()
+        item = _Outgoing(message, future)
+        self._unsent.add(item)
+        self._queue.put_nowait(item)
+        await future
+
+    def _fill_batch(self, batch: list[_Outgoing]) -> list[_Outgoing]:
+        # Остаток, если он не влез в пачку, уйдет следующим execute
+        while len(batch) < EXECUTE_BATCH_SIZE and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            # Небольшая задержка позволяет набрать полный execute
+            if self.linger and self._queue.qsize() < EXECUTE_BATCH_SIZE - 1:
+                await asyncio.sleep(self.linger)
+            batch = self._fill_batch([first])
+            await self.limiter.acquire()
+
+            task = asyncio.create_task(self._send_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    @staticmethod
+    def _build_call(item: _Outgoing, group_id: int) -> str:
+        params = {
+            **recipient_params(item.message.user_id, group_id),
+            "random_id": item.random_id,
+            "message": item.message.text,
+        }
+        if item.message.keyboard is not None:
+            params["keyboard"] = item.message.keyboard
+        return "API.messages.send({})".format(
+            json.dumps(params, ensure_ascii=False)
+        )
+
+    @classmethod
+    def _build_code(cls, batch: list[_Outgoing], group_id: int) -> str:
+        calls = ",".join(cls._build_call(item, group_id) for item in batch)
+        return f"return [{calls}];"
+
+    async def _send_batch(self, batch: list[_Outgoing]) -> None:
+        self.requests += 1
+        code = self._build_code(batch, self.accessor.app.config.bot.group_id)
+        try:
+            data = await self.accessor.api_post("execute", {"code": code})
+        except VkApiError as e:
+            if e.code in RATE_LIMIT_ERRORS:
+                self.limiter.drain()
+                for item in batch:
+                    self._retry(item, e)
+            else:
+                for item in batch:
+                    self._fail(item, e)
+            return
+        except Exception as e:  # ruff: ignore[blind-except]
+            # Любая ошибка транспорта (aiohttp, таймаут) не должна
+            # терять сообщения: пачка уходит на повтор
+            for item in batch:
+                self._retry(item, e)
+            return
+
+        # Неудачные вызовы внутри execute возвращают false,
+        # а их ошибки по порядку перечислены в execute_errors
+        errors = iter(data.get("execute_errors", []))
+        results = data.get("response") or []
+        for index, item in enumerate(batch):
+            result = results[index] if index < len(results) else False
+            if result is not False:
+                self._ack(item)
+                continue
+
+            error = next(errors, {})
+            exc = VkApiError(
+                error.get("error_code", 0), error.get("error_msg", "unknown")
+            )
+            if exc.code in RATE_LIMIT_ERRORS:
+                self.limiter.drain()
+                self._retry(item, exc)
+            else:
+                self._fail(item, exc)
+
+    def _ack(self, item: _Outgoing) -> None:
+        self._unsent.discard(item)
+        self.sent += 1
+        self.latency.add(time.monotonic() - item.enqueued_at)
+        if not item.future.done():
+            item.future.set_result(None)
+
+    def _fail(self, item: _Outgoing, exc: Exception) -> None:
+        self._unsent.discard(item)
+        self.failed += 1
+        self.logger.warning("message was not sent: %s", exc)
+        if not item.future.done():
+            item.future.set_exception(exc)
+
+    def _retry(self, item: _Outgoing, exc: Exception) -> None:
+        item.attempts += 1
+        if item.attempts > self.max_retries:
+            self._fail(item, exc)
+            return
+
+        self.retried += 1
+        # Экспоненциальная задержка с джиттером
+        delay = self.backoff * 2 ** (item.attempts - 1) * random.uniform(1, 1.5)
+        item.retry = asyncio.get_running_loop().call_later(
+            delay, self._requeue, item
+        )
+
+    def _requeue(self, item: _Outgoing) -> None:
+        item.retry = None
+        self._queue.put_nowait(item)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "requests": self.requests,
+            "latency": self.latency.snapshot(),
+        }
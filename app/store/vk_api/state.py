@@ -0,0 +1,94 @@
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import Iterable
+
+from app.store.vk_api.dataclasses import UpdateMessage
+
+# id сообщения или, для бесед, (peer_id, conversation_message_id)
+MessageKey = int | tuple[int, int]
+
+
+def message_key(message: UpdateMessage) -> MessageKey:
+    if message.id or message.conversation_message_id is None:
+        return message.id
+    return (message.peer_id or 0, message.conversation_message_id)
+
+
+class RecentIds:
+    """Ограниченное LRU-множество ключей недавно принятых сообщений."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._ids: OrderedDict[MessageKey, None] = OrderedDict()
+
+    def __contains__(self, id_: MessageKey) -> bool:
+        return id_ in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, id_: MessageKey) -> None:
+        self._ids[id_] = None
+        self._ids.move_to_end(id_)
+        if len(self._ids) > self.maxsize:
+            self._ids.popitem(last=False)
+
+    def update(self, ids: Iterable[MessageKey]) -> None:
+        for id_ in ids:
+            self.add(id_)
+
+    def to_list(self) -> list[MessageKey]:
+        return list(self._ids)
+
+    def clear(self) -> None:
+        self._ids.clear()
+
+
+class LongPollCheckpoint:
+    """
+    Отслеживает, до какого ts все апдейты уже обработаны.
+
+    Пачки завершаются в произвольном порядке (чаты обрабатываются
+    параллельно), поэтому ts сдвигается только через непрерывный
+    префикс завершенных пачек. После рестарта опрос продолжается
+    с этого ts, а уже обработанные сообщения отсекаются по handled.
+    """
+
+    def __init__(self, dedup_size: int) -> None:
+        self.ts: str | None = None
+        self.handled = RecentIds(dedup_size)
+        self.dirty = False
+        self._in_flight: set[MessageKey] = set()
+        self._pending: deque[tuple[str, asyncio.Future]] = deque()
+
+    def restore(
+        self, ts: str | None, handled: Iterable[int | list[int]]
+    ) -> None:
+        self.ts = ts
+        # Из JSON пары возвращаются списками
+        self.handled.update(
+            tuple(key) if isinstance(key, list) else key for key in handled
+        )
+
+    def is_duplicate(self, id_: MessageKey) -> bool:
+        return id_ in self._in_flight or id_ in self.handled
+
+    def track(
+        self, ts: str, ids: list[MessageKey], done: asyncio.Future
+    ) -> None:
+        self._in_flight.update(ids)
+        self._pending.append((ts, done))
+        done.add_done_callback(lambda _: self._on_handled(ids))
+
+    def _on_handled(self, ids: list[MessageKey]) -> None:
+        self._in_flight.difference_update(ids)
+        self.handled.update(ids)
+        self.dirty = True
+
+    def advance(self) -> bool:
+        advanced = False
+        while self._pending and self._pending[0][1].done():
+            self.ts, _ = self._pending.popleft()
+            advanced = True
+        self.dirty = self.dirty or advanced
+        return advanced
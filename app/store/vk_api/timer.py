@@ -0,0 +1,119 @@
+import asyncio
+import math
+from collections.abc import Callable
+from logging import getLogger
+from typing import Any
+
+
+class TimerHandle:
+    __slots__ = ("expires", "payload", "wheel")
+
+    def __init__(self, wheel: "TimingWheel", expires: int, payload: Any):
+        self.wheel = wheel
+        # Номер тика, на котором таймер сработает
+        self.expires = expires
+        self.payload = payload
+
+    def cancel(self) -> None:
+        self.wheel.cancel(self)
+
+
+class TimingWheel:
+    """
+    Хэшированное колесо таймеров с грубым тиком.
+
+    Таймер кладется в слот expires % slots, постановка и отмена - O(1)
+    без кучи и без отдельного handle в цикле событий на каждый таймер.
+    Раз в tick секунд одна задача обходит очередной слот и отдает
+    все истекшие таймеры в callback одной пачкой. Таймер срабатывает
+    не раньше срока и не позже чем через tick после него.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[list[Any]], None],
+        tick: float = 0.1,
+        slots: int = 512,
+    ) -> None:
+        self.callback = callback
+        self.tick = tick
+        self.slots: list[dict[TimerHandle, None]] = [
+            {} for _ in range(slots)
+        ]
+        self.logger = getLogger("timer")
+        self._task: asyncio.Task | None = None
+        self._origin = 0.0
+        # Последний обработанный тик
+        self._current = 0
+        self._count = 0
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def start(self) -> None:
+        if self._task is None:
+            loop = asyncio.get_running_loop()
+            self._origin = loop.time() - self._current * self.tick
+            self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def schedule(self, delay: float, payload: Any) -> TimerHandle:
+        self.start()
+        now = asyncio.get_running_loop().time()
+        expires = max(
+            math.ceil((now + delay - self._origin) / self.tick),
+            self._current + 1,
+        )
+        handle = TimerHandle(self, expires, payload)
+        self.slots[expires % len(self.slots)][handle] = None
+        self._count += 1
+        return handle
+
+    def cancel(self, handle: TimerHandle) -> None:
+        slot = self.slots[handle.expires % len(self.slots)]
+        if slot.pop(handle, False) is None:
+            self._count -= 1
+
+    def clear(self) -> None:
+        for slot in self.slots:
+            slot.clear()
+        self._count = 0
+
+    def advance(self, until: int) -> None:
+        """Обрабатывает тики до until включительно."""
+        expired = []
+        while self._current < until:
+            self._current += 1
+            slot = self.slots[self._current % len(self.slots)]
+            if not slot:
+                continue
+            # В слоте лежат и таймеры следующих оборотов колеса
+            due = [h for h in slot if h.expires <= self._current]
+            for handle in due:
+                del slot[handle]
+                expired.append(handle.payload)
+        if expired:
+            self._count -= len(expired)
+            self.fired += len(expired)
+            self.callback(expired)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            deadline = self._origin + (self._current + 1) * self.tick
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            # После долгой блокировки цикла догоняем все пропущенные тики
+            try:
+                elapsed = (loop.time() - self._origin) / self.tick
+                self.advance(int(elapsed + 1e-9))
+            except Exception:
+                self.logger.exception("timer callback error")
+
+    def stats(self) -> dict:
+        return {"scheduled": self._count, "fired": self.fired}
@@ -1,5 +1,5 @@
 import typing
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 import yaml
@@ -23,6 +23,39 @@ class AdminConfig:
 class BotConfig:
     token: str
     group_id: int
+    # long_poll - сами забираем апдейты, callback - VK присылает их на /vk.callback
+    mode: str = "long_poll"
+    callback_confirmation: str = ""
+    callback_secret: str = ""
+    # Адрес API; в нагрузочных тестах указывает на tests/fake_vk
+    api_path: str = "https://api.vk.com/method/"
+    # Максимум пачек апдейтов, ожидающих обработки
+    queue_size: int = 1000
+    # Сколько обработчиков выполняется одновременно (по разным чатам)
+    concurrency: int = 100
+    # Максимум принятых диспетчером, но еще не обработанных апдейтов
+    max_pending: int = 10_000
+    # Через сколько секунд простоя воркер чата завершается
+    worker_idle_timeout: float = 60
+    # Лимит запросов к API в секунду (execute считается одним запросом)
+    rate_limit: float = 20
+    # Сколько ждать попутных сообщений перед отправкой execute
+    send_linger: float = 0.02
+    # Сохранять ts long poll в БД и продолжать с него после рестарта
+    persist_state: bool = True
+    # Как часто (в секундах) сбрасывать ts в БД
+    state_save_interval: float = 1.0
+    # Сколько id последних сообщений помнить для отсечения повторов
+    dedup_size: int = 10_000
+    # Доля ответов long poll, которые пишутся в лог целиком
+    raw_log_sample_rate: float = 0.01
+    # Куда дописывать сырые ответы long poll (gzip), пусто - не писать
+    record_path: str = ""
+
+    def __post_init__(self) -> None:
+        # /vk.callback открыт без сессии, события проверяются по секрету
+        if self.mode == "callback" and not self.callback_secret:
+            raise ValueError("bot.callback_secret is required in callback mode")
 
 
 @dataclass
@@ -34,12 +67,113 @@ class DatabaseConfig:
     database: str = "project"
 
 
+@dataclass
+class QuizConfig:
+    # Читать ответы из денормализованной колонки questions.answers_snapshot
+    answers_snapshot: bool = False
+    # Как часто банк вопросов дочитывает новые вопросы из БД (0 - никогда)
+    bank_refresh_interval: float = 30
+    # Снимок банка (python -m app.store.quiz.snapshot); пусто - грузить из БД
+    bank_snapshot_path: str = ""
+
+
+@dataclass
+class OutboxConfig:
+    # Отправлять ответы бота через таблицу outbox
+    enabled: bool = False
+    workers: int = 2
+    batch_size: int = 50
+    max_attempts: int = 10
+    # Пауза воркера, когда отправлять нечего
+    poll_interval: float = 0.5
+    # Базовая задержка повторной попытки, растет экспоненциально
+    retry_backoff: float = 1
+    # На сколько секунд взятое воркером сообщение скрыто от остальных
+    lease: float = 60
+
+
+@dataclass
+class GameConfig:
+    rounds: int = 10
+    # Секунд на ответ в одном раунде
+    round_duration: float = 30
+    # Как часто изменения игр сбрасываются в БД
+    flush_interval: float = 1.0
+    # Сколько разных порядков кнопок у одного вопроса
+    layouts: int = 4
+    render_cache_size: int = 10_000
+    # Шаг колеса таймеров: на сколько раунд может закончиться позже срока
+    timer_tick: float = 0.1
+
+
+@dataclass
+class AnalyticsConfig:
+    # Журнал ответов игроков для статистики по вопросам
+    enabled: bool = True
+    # Кольцевой буфер событий: при переполнении теряются самые старые
+    buffer_size: int = 100_000
+    flush_interval: float = 1.0
+    flush_batch: int = 10_000
+    # Как часто журнал сворачивается в question_stats (0 - никогда)
+    rollup_interval: float = 60
+    # Свежие события ждут: их транзакции могли еще не закоммититься
+    rollup_lag: float = 5
+
+
+@dataclass
+class ServerConfig:
+    host: str = "0.0.0.0"
+    port: int = 8080
+    # Число процессов с общим портом (SO_REUSEPORT); 0 - по числу ядер.
+    # Несколько воркеров - только с bot.mode long_poll: апдейты
+    # обрабатывает один лидер, а событие callback VK присылает
+    # в случайный воркер
+    workers: int = 1
+    # Как часто воркеры пытаются стать лидером, а лидер проверяет
+    # соединение, на котором держит блокировку
+    election_interval: float = 1.0
+    # Как часто не-лидеры перечитывают рейтинг из БД (0 - никогда)
+    leaderboard_refresh_interval: float = 30
+
+
+@dataclass
+class HttpClientConfig:
+    # Общий лимит соединений и лимит на один хост (api.vk.com, lp.vk.com)
+    limit: int = 100
+    limit_per_host: int = 20
+    # Сколько держать простаивающее соединение открытым
+    keepalive_timeout: float = 60
+    dns_cache_ttl: int = 300
+    verify_ssl: bool = True
+    connect_timeout: float = 5
+    # Таймаут обычного вызова API
+    api_timeout: float = 10
+    # Сколько VK держит запрос long poll и запас сверху на сеть
+    long_poll_wait: int = 30
+    long_poll_margin: float = 10
+
+
 @dataclass
 class Config:
     admin: AdminConfig
     session: Optional[SessionConfig] = None
     bot: Optional[BotConfig] = None
     database: Optional[DatabaseConfig] = None
+    quiz: QuizConfig = field(default_factory=QuizConfig)
+    outbox: OutboxConfig = field(default_factory=OutboxConfig)
+    http: HttpClientConfig = field(default_factory=HttpClientConfig)
+    game: GameConfig = field(default_factory=GameConfig)
+    analytics: AnalyticsConfig = field(default_factory=AnalyticsConfig)
+    server: ServerConfig = field(default_factory=ServerConfig)
+
+    def __post_init__(self) -> None:
+        if self.bot is not None:
+            check_workers(self.bot.mode, self.server)
+
+
+def check_workers(mode: str, server: ServerConfig) -> None:
+    if mode == "callback" and server.workers != 1:
+        raise ValueError("bot.mode callback requires server.workers: 1")
 
 
 def setup_config(app: "Application", config_path: str):
@@ -54,9 +188,22 @@ def setup_config(app: "Application", config_path: str):
             email=raw_config["admin"]["email"],
             password=raw_config["admin"]["password"],
         ),
-        bot=BotConfig(
-            token=raw_config["bot"]["token"],
-            group_id=raw_config["bot"]["group_id"],
-        ),
+        bot=BotConfig(**raw_config["bot"]),
         database=DatabaseConfig(**raw_config["database"]),
-    )
\ No newline at end of file
+        quiz=QuizConfig(**raw_config.get("quiz", {})),
+        outbox=OutboxConfig(**raw_config.get("outbox", {})),
+        http=HttpClientConfig(**raw_config.get("http", {})),
+        game=GameConfig(**raw_config.get("game", {})),
+        analytics=AnalyticsConfig(**raw_config.get("analytics", {})),
+        server=ServerConfig(**raw_config.get("server", {})),
+    )
+
+
+def load_server_config(config_path: str) -> ServerConfig:
+    # Нужен до создания приложения: по нему запускаются воркеры
+    with open(config_path, "r") as f:
+        raw_config = yaml.safe_load(f)
+    server = ServerConfig(**raw_config.get("server", {}))
+    # Проверка до fork: иначе воркеры падали бы при старте по кругу
+    check_workers(raw_config["bot"].get("mode", BotConfig.mode), server)
+    return server
\ No newline at end of file
@@ -0,0 +1,113 @@
+import logging
+import os
+import signal
+import time
+
+from aiohttp.web import run_app
+
+from app.web.app import setup_app
+from app.web.config import ServerConfig
+
+# Воркер, упавший быстрее этого, перезапускается с паузой, чтобы
+# ошибка при старте не превращалась в бесконечный цикл fork
+RESPAWN_MIN_UPTIME = 5.0
+RESPAWN_DELAY = 1.0
+
+logger = logging.getLogger("launcher")
+
+
+def _run_worker(config_path: str, server: ServerConfig) -> None:
+    # Обработчики мастера воркеру не нужны, run_app ставит свои
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    run_app(
+        setup_app(config_path=config_path),
+        host=server.host,
+        port=server.port,
+        # Каждый воркер слушает свой сокет на общем порту,
+        # соединения между ними распределяет ядро
+        reuse_port=True,
+        print=None,
+    )
+
+
+def _spawn(config_path: str, server: ServerConfig) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    code = 0
+    try:
+        _run_worker(config_path, server)
+    except Exception:
+        logger.exception("worker %d failed", os.getpid())
+        code = 1
+    finally:
+        # Не выходим в код мастера и не запускаем его atexit
+        os._exit(code)
+
+
+class _Master:
+    def __init__(self, config_path: str, server: ServerConfig) -> None:
+        self.config_path = config_path
+        self.server = server
+        # pid воркера -> время запуска
+        self.workers: dict[int, float] = {}
+        self.stopping = False
+
+    def install_signal_handlers(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+    def stop(self, signum: int, _frame) -> None:
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def spawn(self) -> None:
+        if not self.stopping:
+            self.workers[_spawn(self.config_path, self.server)] = (
+                time.monotonic()
+            )
+
+    def supervise(self) -> None:
+        """Ждет завершения воркеров и перезапускает упавшие."""
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started_at = self.workers.pop(pid, None)
+            if started_at is None or self.stopping:
+                continue
+
+            logger.warning(
+                "worker %d exited with code %d",
+                pid,
+                os.waitstatus_to_exitcode(status),
+            )
+            if time.monotonic() - started_at < RESPAWN_MIN_UPTIME:
+                time.sleep(RESPAWN_DELAY)
+            self.spawn()
+
+
+def run_workers(config_path: str, server: ServerConfig) -> None:
+    """
+    Запускает server.workers процессов aiohttp на одном порту.
+
+    Упавшие воркеры перезапускаются. Апдейты бота принимает только
+    лидер (LeaderElection); если упал он, его место за
+    election_interval займет другой воркер.
+    """
+    logging.basicConfig(level=logging.INFO)
+    count = server.workers or os.cpu_count() or 1
+    master = _Master(config_path, server)
+    master.install_signal_handlers()
+    for _ in range(count):
+        master.spawn()
+    logger.info(
+        "serving on %s:%d with %d workers", server.host, server.port, count
+    )
+    master.supervise()
@@ -18,6 +18,13 @@ if typing.TYPE_CHECKING:
     from app.web.app import Application, Request
 
 
+# Маршруты, доступные без сессии администратора
+PUBLIC_ROUTES = {
+    ("/admin.login", "POST"),
+    # VK проверяет подлинность через secret в теле запроса
+    ("/vk.callback", "POST"),
+}
+
 HTTP_ERROR_CODES = {
     400: "bad_request",
     401: "unauthorized",
@@ -33,7 +40,7 @@ HTTP_ERROR_CODES = {
 async def auth_middleware(request: "Request", handler):
     """Проверка авторизации для защищенных маршрутов"""
     # Пропускаем маршруты, не требующие авторизации
-    if request.path == "/admin.login" and request.method == "POST":
+    if (request.path, request.method) in PUBLIC_ROUTES:
         return await handler(request)
     
     try:
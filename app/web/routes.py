@@ -3,7 +3,11 @@ from aiohttp.web_app import Application
 
 def setup_routes(app: Application):
     from app.admin.routes import setup_routes as admin_setup_routes
+    from app.bot.routes import setup_routes as bot_setup_routes
+    from app.game.routes import setup_routes as game_setup_routes
     from app.quiz.routes import setup_routes as quiz_setup_routes
 
     admin_setup_routes(app)
     quiz_setup_routes(app)
+    bot_setup_routes(app)
+    game_setup_routes(app)
@@ -3,12 +3,19 @@ import os
 from aiohttp.web import run_app
 
 from app.web.app import setup_app
+from app.web.config import load_server_config
+from app.web.launcher import run_workers
 
 if __name__ == "__main__":
-    run_app(
-        setup_app(
-            config_path=os.path.join(
-                os.path.dirname(os.path.realpath(__file__)), "config.yml"
-            )
-        )
+    config_path = os.path.join(
+        os.path.dirname(os.path.realpath(__file__)), "config.yml"
     )
+    server = load_server_config(config_path)
+    if server.workers == 1:
+        run_app(
+            setup_app(config_path=config_path),
+            host=server.host,
+            port=server.port,
+        )
+    else:
+        run_workers(config_path, server)
@@ -15,6 +15,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 from app.store.database.sqlalchemy_base import BaseModel
 # Импортируем модели из правильных мест
 from app.admin.models import AdminModel
+from app.bot.models import OutboxModel, VkLongPollStateModel
+from app.game.models import GameModel, PlayerModel, ScoreModel
 from app.quiz.models import ThemeModel, QuestionModel, AnswerModel
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,108 @@
+"""theme question count
+
+Revision ID: 008bf85fc26a
+Revises: 87a76c35f5bf
+Create Date: 2026-10-19 13:05:12.640917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008bf85fc26a'
+down_revision: Union[str, None] = '87a76c35f5bf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COUNT_FUNCTION = """
+CREATE OR REPLACE FUNCTION themes_question_count_{name}()
+RETURNS trigger AS $$
+BEGIN
+    UPDATE themes AS t
+    SET question_count = t.question_count + d.delta
+    FROM (
+        SELECT theme_id, sum(delta) AS delta
+        FROM ({changes}) AS changes
+        GROUP BY theme_id
+        HAVING sum(delta) <> 0
+    ) AS d
+    WHERE t.id = d.theme_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+INSERTED = "SELECT theme_id, 1 AS delta FROM new_questions"
+DELETED = "SELECT theme_id, -1 AS delta FROM old_questions"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'themes',
+        sa.Column(
+            'question_count',
+            sa.Integer(),
+            server_default='0',
+            nullable=False,
+        ),
+    )
+
+    op.execute(COUNT_FUNCTION.format(name='insert', changes=INSERTED))
+    op.execute(COUNT_FUNCTION.format(name='delete', changes=DELETED))
+    op.execute(
+        COUNT_FUNCTION.format(
+            name='update', changes=f"{INSERTED} UNION ALL {DELETED}"
+        )
+    )
+    # CREATE TRIGGER берет блокировку на questions до конца транзакции,
+    # поэтому вставки не проскочат между созданием триггеров и backfill
+    op.execute(
+        """
+        CREATE TRIGGER questions_count_insert
+        AFTER INSERT ON questions
+        REFERENCING NEW TABLE AS new_questions
+        FOR EACH STATEMENT EXECUTE FUNCTION themes_question_count_insert()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER questions_count_delete
+        AFTER DELETE ON questions
+        REFERENCING OLD TABLE AS old_questions
+        FOR EACH STATEMENT EXECUTE FUNCTION themes_question_count_delete()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER questions_count_update
+        AFTER UPDATE ON questions
+        REFERENCING OLD TABLE AS old_questions NEW TABLE AS new_questions
+        FOR EACH STATEMENT EXECUTE FUNCTION themes_question_count_update()
+        """
+    )
+
+    op.execute(
+        """
+        UPDATE themes AS t
+        SET question_count = c.cnt
+        FROM (
+            SELECT theme_id, count(*) AS cnt
+            FROM questions
+            GROUP BY theme_id
+        ) AS c
+        WHERE t.id = c.theme_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in ('insert', 'delete', 'update'):
+        op.execute(f"DROP TRIGGER IF EXISTS questions_count_{name} ON questions")
+        op.execute(f"DROP FUNCTION IF EXISTS themes_question_count_{name}()")
+    op.drop_column('themes', 'question_count')
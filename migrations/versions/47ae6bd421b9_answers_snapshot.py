@@ -0,0 +1,54 @@
+"""answers snapshot
+
+Revision ID: 47ae6bd421b9
+Revises: 008bf85fc26a
+Create Date: 2026-10-19 14:21:37.114052
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '47ae6bd421b9'
+down_revision: Union[str, None] = '008bf85fc26a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'questions',
+        sa.Column(
+            'answers_snapshot',
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=True,
+        ),
+    )
+    op.execute(
+        """
+        UPDATE questions AS q
+        SET answers_snapshot = (
+            SELECT coalesce(
+                jsonb_agg(
+                    jsonb_build_object(
+                        'title', a.title, 'is_correct', a.is_correct
+                    )
+                    ORDER BY a.id
+                ),
+                '[]'::jsonb
+            )
+            FROM answers AS a
+            WHERE a.question_id = q.id
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('questions', 'answers_snapshot')
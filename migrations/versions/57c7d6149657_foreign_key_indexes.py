@@ -0,0 +1,58 @@
+"""foreign key indexes
+
+Revision ID: 57c7d6149657
+Revises: 57f02b466686
+Create Date: 2026-10-19 10:12:04.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '57c7d6149657'
+down_revision: Union[str, None] = '57f02b466686'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции,
+    # поэтому строим индексы в autocommit-блоке без блокировки записи
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_questions_theme_id'),
+            'questions',
+            ['theme_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            op.f('ix_answers_question_id'),
+            'answers',
+            ['question_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_answers_question_id'),
+            table_name='answers',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            op.f('ix_questions_theme_id'),
+            table_name='questions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
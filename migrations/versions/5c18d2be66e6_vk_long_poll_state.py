@@ -0,0 +1,37 @@
+"""vk long poll state
+
+Revision ID: 5c18d2be66e6
+Revises: b1a4f0dd31dd
+Create Date: 2026-10-19 17:21:09.334812
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c18d2be66e6'
+down_revision: Union[str, None] = 'b1a4f0dd31dd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('vk_long_poll_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('group_id', sa.BigInteger(), nullable=False),
+    sa.Column('ts', sa.String(), nullable=False),
+    sa.Column('recent_ids', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('group_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('vk_long_poll_state')
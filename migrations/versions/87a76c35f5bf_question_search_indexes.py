@@ -0,0 +1,72 @@
+"""question search indexes
+
+Revision ID: 87a76c35f5bf
+Revises: 57c7d6149657
+Create Date: 2026-10-19 11:40:51.203377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '87a76c35f5bf'
+down_revision: Union[str, None] = '57c7d6149657'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        'questions',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', title)", persisted=True),
+            nullable=True,
+        ),
+    )
+    # Сначала фиксируем новую колонку, затем строим индексы без блокировок
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_questions_search_vector',
+            'questions',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_questions_title_trgm',
+            'questions',
+            ['title'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_questions_title_trgm',
+            table_name='questions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_questions_search_vector',
+            table_name='questions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('questions', 'search_vector')
@@ -0,0 +1,71 @@
+"""games, players and scores
+
+Revision ID: 9e3c7a51b2f4
+Revises: 5c18d2be66e6
+Create Date: 2026-10-19 19:04:37.118920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3c7a51b2f4'
+down_revision: Union[str, None] = '5c18d2be66e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('games',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('peer_id', sa.BigInteger(), nullable=False),
+    sa.Column('theme_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('round', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=True),
+    sa.Column('asked_question_ids', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False),
+    sa.Column('round_deadline', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_games_active_peer_id',
+        'games',
+        ['peer_id'],
+        unique=True,
+        postgresql_where=sa.text("status = 'active'"),
+    )
+    op.create_table('players',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('vk_id', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('vk_id')
+    )
+    op.create_table('scores',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('game_id', sa.BigInteger(), nullable=False),
+    sa.Column('player_id', sa.BigInteger(), nullable=False),
+    sa.Column('points', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['game_id'], ['games.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['player_id'], ['players.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('game_id', 'player_id')
+    )
+    op.create_index(op.f('ix_scores_player_id'), 'scores', ['player_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_scores_player_id'), table_name='scores')
+    op.drop_table('scores')
+    op.drop_table('players')
+    op.drop_index('ix_games_active_peer_id', table_name='games')
+    op.drop_table('games')
@@ -0,0 +1,28 @@
+"""outbox keyboard
+
+Revision ID: b7d1e9f04a6c
+Revises: 9e3c7a51b2f4
+Create Date: 2026-10-19 20:31:15.482017
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d1e9f04a6c'
+down_revision: Union[str, None] = '9e3c7a51b2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('outbox', sa.Column('keyboard', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('outbox', 'keyboard')
@@ -0,0 +1,29 @@
+"""games answered players
+
+Revision ID: c42f8e1a9d03
+Revises: d83f2a6c5e17
+Create Date: 2026-10-19 23:12:48.205391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c42f8e1a9d03'
+down_revision: Union[str, None] = 'd83f2a6c5e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('games', sa.Column('answered_vk_ids', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('games', 'answered_vk_ids')
@@ -0,0 +1,57 @@
+"""answer events and question stats rollups
+
+Revision ID: d83f2a6c5e17
+Revises: b7d1e9f04a6c
+Create Date: 2026-10-19 21:47:02.663190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd83f2a6c5e17'
+down_revision: Union[str, None] = 'b7d1e9f04a6c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('answer_events',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('peer_id', sa.BigInteger(), nullable=False),
+    sa.Column('vk_id', sa.BigInteger(), nullable=False),
+    sa.Column('is_correct', sa.Boolean(), nullable=False),
+    sa.Column('answer_time_ms', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('question_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.BigInteger(), nullable=False),
+    sa.Column('correct', sa.BigInteger(), nullable=False),
+    sa.Column('total_answer_time_ms', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('question_id')
+    )
+    op.create_table('rollup_watermarks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('last_event_id', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rollup_watermarks')
+    op.drop_table('question_stats')
+    op.drop_table('answer_events')
@@ -0,0 +1,34 @@
+"""question deletions
+
+Revision ID: e6b90d4c1f27
+Revises: c42f8e1a9d03
+Create Date: 2026-10-19 23:41:09.573846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b90d4c1f27'
+down_revision: Union[str, None] = 'c42f8e1a9d03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('question_deletions',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=True),
+    sa.Column('theme_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('question_deletions')
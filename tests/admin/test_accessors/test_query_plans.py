@@ -0,0 +1,36 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.store import Store
+from tests.utils import find_seq_scans
+
+SEQ_SCAN_ROW_THRESHOLD = 100
+
+
+@pytest.mark.usefixtures("seeded_db")
+class TestAdminAccessorQueryPlans:
+    async def test_get_by_email(
+        self, store: Store, db_engine: AsyncEngine, recorded_queries: list
+    ) -> None:
+        await store.admins.get_by_email("seed-100@admin.com")
+
+        assert recorded_queries
+        assert (
+            await find_seq_scans(
+                db_engine, list(recorded_queries), SEQ_SCAN_ROW_THRESHOLD
+            )
+            == []
+        )
+
+    async def test_get_by_id(
+        self, store: Store, db_engine: AsyncEngine, recorded_queries: list
+    ) -> None:
+        await store.admins.get_by_id(100)
+
+        assert recorded_queries
+        assert (
+            await find_seq_scans(
+                db_engine, list(recorded_queries), SEQ_SCAN_ROW_THRESHOLD
+            )
+            == []
+        )
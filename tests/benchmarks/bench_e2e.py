@@ -0,0 +1,83 @@
+"""
+Сквозной бенчмарк бота на локальном фейковом VK.
+
+Сообщения проходят весь путь Poller -> UpdatesQueue -> BotManager ->
+MessageSender -> execute. Считается пропускная способность и время
+от появления сообщения в long poll до получения ответа фейковым VK.
+
+Запуск: python -m tests.benchmarks.bench_e2e --messages 5000 --rate 1000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from app.base.metrics import LatencyStats
+from app.web.app import setup_app
+from tests.fake_vk import FakeVkServer
+
+CONFIG = os.path.join(os.path.dirname(__file__), "..", "config.yml")
+
+
+async def run(args: argparse.Namespace) -> None:
+    app = setup_app(CONFIG)
+    config = app.config
+    server = FakeVkServer(
+        group_id=config.bot.group_id,
+        latency=args.latency,
+        rate_limit=args.rate_limit,
+    )
+    await server.start()
+
+    config.bot.api_path = server.api_path
+    config.bot.persist_state = False
+    config.bot.rate_limit = args.rate_limit
+    config.bot.raw_log_sample_rate = 0
+    config.http.long_poll_wait = 1
+
+    await app.store.vk_api.connect(app)
+    started = time.monotonic()
+    try:
+        await server.generate(args.messages, rate=args.rate, chunk=10)
+        await server.wait_replies(args.messages, timeout=args.timeout)
+    finally:
+        elapsed = time.monotonic() - started
+        await app.store.vk_api.disconnect(app)
+        await server.close()
+
+    latency = LatencyStats(window=args.messages)
+    for reply in server.replies:
+        latency.add(reply.received_at - server.pushed_at[reply.user_id - 1])
+
+    print(
+        f"{len(server.replies)} replies in {elapsed:.2f}s: "
+        f"{len(server.replies) / elapsed:.0f} updates/s"
+    )
+    print(
+        f"message -> reply: p50 {latency.percentile(50) * 1000:.1f} ms, "
+        f"p99 {latency.percentile(99) * 1000:.1f} ms, "
+        f"max {latency.snapshot()['max'] * 1000:.1f} ms"
+    )
+    print(
+        f"api calls: {server.api_calls}, "
+        f"rate limited: {server.rate_limited}, "
+        f"http: {app.store.vk_api.http_metrics.stats()}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=2000)
+    # Сообщений в секунду; 0 - выложить все сразу
+    parser.add_argument("--rate", type=float, default=500)
+    # Задержка ответа API фейкового VK, секунды
+    parser.add_argument("--latency", type=float, default=0.05)
+    # Запросов к API в секунду (у VK для сообществ - 20)
+    parser.add_argument("--rate-limit", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=120)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Скорость проверки ответов игроков.
+
+Сравнивает AnswerMatcher (варианты нормализованы заранее, точный
+поиск по dict, Левенштейн с порогом и ранним выходом) с проверкой,
+которая на каждое сообщение нормализует все варианты и считает
+полное расстояние до каждого.
+
+Запуск: python -m tests.benchmarks.bench_matcher --replies 200000
+"""
+
+import argparse
+import random
+import time
+
+from app.store.game.matcher import (
+    FUZZY_CHARS_PER_EDIT,
+    FUZZY_MIN_LENGTH,
+    MAX_DISTANCE,
+    AnswerMatcher,
+    normalize,
+)
+
+WORDS = (
+    "Москва",
+    "Санкт-Петербург",
+    "Новосибирск",
+    "Екатеринбург",
+    "Казань",
+    "Нижний",
+    "Новгород",
+    "Челябинск",
+    "Самара",
+    "Омск",
+    "Ростов-на-Дону",
+    "Уфа",
+    "Красноярск",
+    "Воронеж",
+    "Пермь",
+    "Волгоград",
+    "Пушкин",
+    "Лермонтов",
+    "Толстой",
+    "Достоевский",
+    "Чехов",
+    "Гоголь",
+    "Тургенев",
+)
+QUESTIONS = 1000
+ANSWERS = 4
+
+
+def distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j - 1] + (char != other),
+                    current[j - 1] + 1,
+                    previous[j] + 1,
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+def naive_match(options: tuple[str, ...], text: str) -> int | None:
+    form = normalize(text)
+    forms = [normalize(option) for option in options]
+    if form in forms:
+        return forms.index(form)
+    text = text.strip()
+    if text.isdigit() and 0 < int(text) <= len(options):
+        return int(text) - 1
+    best, best_distance = None, MAX_DISTANCE + 1
+    for index, option in enumerate(forms):
+        if len(option) < FUZZY_MIN_LENGTH:
+            continue
+        limit = min(MAX_DISTANCE, len(option) // FUZZY_CHARS_PER_EDIT)
+        value = distance(form, option)
+        if value <= limit and value < best_distance:
+            best, best_distance = index, value
+    return best
+
+
+def typo(text: str) -> str:
+    position = random.randrange(len(text))
+    return text[:position] + "ъ" + text[position + 1 :]
+
+
+def generate(count: int) -> tuple[list, list]:
+    options = [
+        tuple(random.sample(WORDS, ANSWERS)) for _ in range(QUESTIONS)
+    ]
+    replies = []
+    for _ in range(count):
+        question = random.randrange(QUESTIONS)
+        answer = random.choice(options[question])
+        reply = random.choice(
+            (
+                answer,
+                f" {answer.upper()}! ",
+                typo(answer),
+                random.choice(WORDS),
+                "не знаю, может быть что-то другое",
+                str(random.randint(1, ANSWERS)),
+            )
+        )
+        replies.append((question, reply))
+    return options, replies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--replies", type=int, default=200_000)
+    args = parser.parse_args()
+    random.seed(1)
+    options, replies = generate(args.replies)
+
+    started = time.perf_counter()
+    matchers = [AnswerMatcher(question) for question in options]
+    prepared = time.perf_counter() - started
+    print(
+        f"prepared {QUESTIONS} questions in {prepared * 1000:.1f} ms "
+        f"({prepared / QUESTIONS * 1e6:.1f} us per question)"
+    )
+
+    started = time.perf_counter()
+    naive = [naive_match(options[q], reply) for q, reply in replies]
+    naive_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    fast = [matchers[q].match(reply) for q, reply in replies]
+    fast_time = time.perf_counter() - started
+
+    mismatches = sum(a != b for a, b in zip(naive, fast, strict=True))
+    for name, elapsed in (("naive", naive_time), ("matcher", fast_time)):
+        print(
+            f"{name:>7}: {args.replies / elapsed:10,.0f} matches/s "
+            f"({elapsed / args.replies * 1e6:.2f} us per reply)"
+        )
+    # Расходятся только неоднозначные опечатки: matcher их отвергает
+    print(f"different verdicts: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
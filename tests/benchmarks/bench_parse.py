@@ -0,0 +1,111 @@
+"""
+Микробенчмарк разбора апдейтов long poll.
+
+Сравнивает прежний разбор (обычные dataclass, разбор каждого события
+с проверкой на наличие message) с UpdateParser и slots-dataclass на
+записанных ответах VK из data/long_poll.json.
+
+Запуск: python -m tests.benchmarks.bench_parse
+"""
+
+import json
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.store.vk_api.parser import UpdateParser
+
+DATA = Path(__file__).parent / "data" / "long_poll.json"
+REPEAT = 500
+ROUNDS = 10
+
+
+@dataclass
+class LegacyUpdateMessage:
+    from_id: int
+    text: str
+    id: int
+
+
+@dataclass
+class LegacyUpdateObject:
+    message: LegacyUpdateMessage
+
+
+@dataclass
+class LegacyUpdate:
+    type: str
+    object: LegacyUpdateObject
+
+
+def legacy_parse_many(raws: list[dict]) -> list[LegacyUpdate]:
+    return [
+        LegacyUpdate(
+            type=raw["type"],
+            object=LegacyUpdateObject(
+                message=LegacyUpdateMessage(
+                    id=raw["object"]["message"]["id"],
+                    from_id=raw["object"]["message"]["from_id"],
+                    text=raw["object"]["message"]["text"],
+                )
+            ),
+        )
+        for raw in raws
+        if "message" in raw["object"]
+    ]
+
+
+def allocations(parse_many, batches: list[list[dict]]) -> tuple[int, int]:
+    """Число живых блоков и байт, занятых результатами разбора."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [parse_many(batch) for batch in batches]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    diff = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in diff)
+    size = sum(stat.size_diff for stat in diff)
+    del results
+    return blocks, size
+
+
+def main() -> None:
+    batches = [response["updates"] for response in json.loads(DATA.read_text())]
+    events = sum(len(batch) for batch in batches)
+    parser = UpdateParser()
+    candidates = {
+        "legacy": legacy_parse_many,
+        "parser": parser.parse_many,
+    }
+
+    parsed = len(parser.parse_many([raw for batch in batches for raw in batch]))
+    print(f"{events} events per pass, {parsed} of them are message_new")
+    # Прогоны кандидатов чередуются, а берется лучший из них: так
+    # результат меньше зависит от шума машины
+    timings = {name: [] for name in candidates}
+    for _ in range(ROUNDS):
+        for name, parse_many in candidates.items():
+            timings[name].append(
+                timeit.timeit(
+                    lambda parse_many=parse_many: [
+                        parse_many(batch) for batch in batches
+                    ],
+                    number=REPEAT,
+                )
+            )
+
+    for name, parse_many in candidates.items():
+        seconds = min(timings[name])
+        blocks, size = allocations(parse_many, batches * 100)
+        updates = parsed * 100
+        print(
+            f"{name:>7}: {seconds / (REPEAT * events) * 1e9:7.0f} ns/event, "
+            f"{blocks / updates:5.2f} blocks/update, "
+            f"{size / updates:6.1f} B/update"
+        )
+
+
+if __name__ == "__main__":
+    main()
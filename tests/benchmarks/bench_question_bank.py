@@ -0,0 +1,163 @@
+"""
+Память и скорость банка вопросов.
+
+Сравнивает QuestionBank (строки в одном bytearray, индексы в array)
+с наивным хранением: dict id -> GameQuestion и списки id по темам.
+Память считается через tracemalloc и пересчитывается на 1M вопросов.
+Холодный старт со снимка: mmap файла против сборки банка с нуля;
+tracemalloc видит только приватную память процесса, страницы mmap
+общие и в нее не входят.
+
+Запуск: python -m tests.benchmarks.bench_question_bank --questions 1000000
+"""
+
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from app.store.game.state import GameQuestion
+from app.store.quiz.bank import QuestionBank
+from app.store.quiz.snapshot import open_snapshot
+
+ANSWERS = 4
+THEMES = 50
+
+
+class _App:
+    """Минимум, нужный BaseAccessor, без конфигурации и БД."""
+
+    def __init__(self) -> None:
+        self.on_startup = []
+        self.on_cleanup = []
+
+
+def generate(count: int):
+    for id_ in range(1, count + 1):
+        yield (
+            id_,
+            id_ % THEMES + 1,
+            f"Вопрос номер {id_}: в каком году произошло событие {id_ * 7}?",
+            [
+                (f"{1000 + (id_ + number) % 1000} год", number == 0)
+                for number in range(ANSWERS)
+            ],
+        )
+
+
+def build_bank(count: int) -> QuestionBank:
+    bank = QuestionBank(_App())
+    for id_, theme_id, title, answers in generate(count):
+        bank.append(id_, theme_id, title, answers)
+    bank.loaded = True
+    return bank
+
+
+def build_naive(count: int) -> tuple[dict, dict]:
+    questions = {}
+    by_theme: dict[int, list[int]] = {}
+    for id_, theme_id, title, answers in generate(count):
+        questions[id_] = GameQuestion(
+            id_, title, tuple(answer for answer, _ in answers), 0
+        )
+        by_theme.setdefault(theme_id, []).append(id_)
+    return questions, by_theme
+
+
+def map_bank(path: str) -> QuestionBank:
+    bank = QuestionBank(_App())
+    bank.index.map_snapshot(open_snapshot(path))
+    bank.loaded = True
+    return bank
+
+
+def measure(build, count: int):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build(count)
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def bench_build(count: int) -> tuple[QuestionBank, float]:
+    bank, bank_size, bank_time = measure(build_bank, count)
+    naive, naive_size, naive_time = measure(build_naive, count)
+    del naive
+    scale = 1_000_000 / count
+    for name, size, elapsed in (
+        ("bank", bank_size, bank_time),
+        ("naive", naive_size, naive_time),
+    ):
+        print(
+            f"{name:>5}: {size / count:6.1f} B/question, "
+            f"{size * scale / 2**20:7.1f} MiB per 1M questions, "
+            f"built in {elapsed:.2f}s"
+        )
+    return bank, bank_time
+
+
+def bench_draws(bank: QuestionBank, draws: int) -> None:
+    deck = bank.deck()
+    started = time.perf_counter()
+    for _ in range(draws):
+        bank.draw(deck)
+    elapsed = time.perf_counter() - started
+    print(
+        f"draw without replacement: {elapsed / draws * 1e6:.2f} us, "
+        f"deck state {len(deck.swaps)} swaps"
+    )
+
+    theme_deck = bank.deck(random.randint(1, THEMES))
+    started = time.perf_counter()
+    drawn = 0
+    while bank.draw(theme_deck) is not None:
+        drawn += 1
+    elapsed = time.perf_counter() - started
+    print(f"drained a theme of {drawn} questions in {elapsed * 1000:.1f} ms")
+
+
+def bench_snapshot(path: str, draws: int, build_time: float) -> None:
+    mapped, mapped_size, mapped_time = measure(map_bank, path)
+    print(
+        f"cold start from snapshot: {mapped_time * 1000:.1f} ms, "
+        f"{mapped_size / 2**20:.1f} MiB private "
+        f"(build from scratch {build_time:.2f}s)"
+    )
+    deck = mapped.deck()
+    started = time.perf_counter()
+    for _ in range(draws):
+        mapped.draw(deck)
+    elapsed = time.perf_counter() - started
+    print(f"draw from snapshot: {elapsed / draws * 1e6:.2f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=200_000)
+    parser.add_argument("--draws", type=int, default=100_000)
+    args = parser.parse_args()
+
+    bank, build_time = bench_build(args.questions)
+    bench_draws(bank, args.draws)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bank.bin")
+        started = time.perf_counter()
+        bank.write_snapshot(path)
+        elapsed = time.perf_counter() - started
+        print(
+            f"snapshot: {os.path.getsize(path) / 2**20:.1f} MiB "
+            f"written in {elapsed:.2f}s"
+        )
+        del bank
+        bench_snapshot(path, args.draws, build_time)
+
+
+if __name__ == "__main__":
+    main()
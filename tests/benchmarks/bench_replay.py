@@ -0,0 +1,164 @@
+"""
+Воспроизведение записанного трафика long poll.
+
+Запись включается параметром bot.record_path. Драйвер подает
+записанные апдейты в BotManager.handle_updates с исходными интервалами
+(--speed 1), ускоренно (--speed N) или без пауз (--speed 0). Отправка
+сообщений заменена заглушкой с задержкой --send-latency.
+
+Команды игры (/start и ответы) идут в БД и банк вопросов, поэтому нужен
+Postgres из tests/config.yml: драйвер подключает БД и компоненты игры
+без VK API. Если банк пуст, в него добавляются --questions вопросов
+в отдельной теме, иначе записанный /start только ответит, что
+вопросов нет.
+
+Запуск: python -m tests.benchmarks.bench_replay recording.jsonl.gz --speed 10
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from unittest.mock import AsyncMock
+
+from app.base.metrics import LatencyStats, LoopLagMonitor
+from app.quiz.models import AnswerModel
+from app.store.vk_api.dataclasses import Message
+from app.store.vk_api.parser import UpdateParser
+from app.store.vk_api.recorder import read_recording
+from app.web.app import Application, setup_app
+
+CONFIG = os.path.join(os.path.dirname(__file__), "..", "config.yml")
+ANSWERS = 4
+
+
+async def seed(app: Application, questions: int) -> None:
+    """Заполнить пустой банк вопросами для записанных игр."""
+    if len(app.store.question_bank) or not questions:
+        return
+    quizzes = app.store.quizzes
+    theme = await quizzes.get_theme_by_title("replay")
+    if theme is None:
+        theme = await quizzes.create_theme("replay")
+    for number in range(questions):
+        await quizzes.create_question(
+            f"Вопрос для воспроизведения {number}",
+            theme.id,
+            [
+                AnswerModel(title=f"Ответ {answer}", is_correct=answer == 0)
+                for answer in range(ANSWERS)
+            ],
+        )
+
+
+async def replay(
+    records: list[tuple[float, dict]],
+    speed: float,
+    send_latency: float,
+    questions: int,
+) -> None:
+    app = setup_app(CONFIG)
+    store = app.store
+    # Восстановленные игры могут ответить еще до начала воспроизведения
+    store.vk_api.send_message = AsyncMock()
+    # Как в on_startup, но без VK API: ответы уходят в заглушку
+    components = (
+        store.question_bank,
+        store.leaderboard,
+        store.analytics,
+        store.games,
+    )
+    connected = []
+    await app.database.connect()
+    try:
+        for component in components:
+            await component.connect(app)
+            connected.append(component)
+        await seed(app, questions)
+        await run(app, records, speed, send_latency)
+    finally:
+        for component in reversed(connected):
+            await component.disconnect(app)
+        await app.database.disconnect()
+
+
+async def run(
+    app: Application,
+    records: list[tuple[float, dict]],
+    speed: float,
+    send_latency: float,
+) -> None:
+    store = app.store
+    parser = UpdateParser()
+    sent = 0
+
+    async def send_message(message: Message) -> None:
+        nonlocal sent
+        await asyncio.sleep(send_latency)
+        sent += 1
+
+    store.vk_api.send_message = send_message
+
+    latency = LatencyStats(window=len(records))
+    monitor = LoopLagMonitor()
+
+    async def handle(updates: list, scheduled_at: float) -> None:
+        await store.bots_manager.handle_updates(updates)
+        latency.add(time.monotonic() - scheduled_at)
+
+    monitor.start()
+    started = time.monotonic()
+    first_t = records[0][0] if records else 0.0
+    tasks = []
+    updates_count = 0
+    for t, response in records:
+        updates = parser.parse_many(response.get("updates", ()))
+        if not updates:
+            continue
+
+        if speed:
+            delay = started + (t - first_t) / speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        updates_count += len(updates)
+        tasks.append(asyncio.create_task(handle(updates, time.monotonic())))
+
+    await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - started
+    await monitor.stop()
+    await store.bots_manager.dispatcher.stop()
+
+    print(
+        f"speed {speed or 'max'}: {updates_count} updates "
+        f"in {len(tasks)} batches, {elapsed:.2f}s, "
+        f"{updates_count / elapsed:.0f} updates/s, {sent} replies"
+    )
+    batch = latency.snapshot()
+    print(
+        f"batch latency: p50 {batch['p50'] * 1000:.1f} ms, "
+        f"p99 {batch['p99'] * 1000:.1f} ms, max {batch['max'] * 1000:.1f} ms"
+    )
+    lag = monitor.lag.snapshot()
+    print(
+        f"loop lag: p50 {lag['p50'] * 1000:.2f} ms, "
+        f"p99 {lag['p99'] * 1000:.2f} ms, max {lag['max'] * 1000:.2f} ms"
+    )
+    print(f"parser: {parser.stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording")
+    # Во сколько раз ускорить; 0 - без пауз
+    parser.add_argument("--speed", type=float, default=1)
+    parser.add_argument("--send-latency", type=float, default=0.05)
+    # Сколько вопросов добавить, если банк пуст; 0 - не добавлять
+    parser.add_argument("--questions", type=int, default=100)
+    args = parser.parse_args()
+
+    records = list(read_recording(args.recording))
+    asyncio.run(replay(records, args.speed, args.send_latency, args.questions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Таймауты раундов: колесо таймеров против таймера на каждую игру.
+
+Для каждого N ставит N таймеров, один раз переставляет каждый
+(отмена + новая постановка, как при ответе в чате) и ждет, пока все
+сработают. Сравниваются задача с asyncio.sleep на таймер, handle
+loop.call_later на таймер и TimingWheel. Память - tracemalloc
+после постановки, отдельным прогоном.
+
+Запуск: python -m tests.benchmarks.bench_timers --sizes 10000 100000 1000000
+"""
+
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from app.store.vk_api.timer import TimingWheel
+
+DELAY = 1.0
+
+
+class Tasks:
+    def __init__(self, done) -> None:
+        self.done = done
+
+    async def _sleep(self, delay: float, payload: int) -> None:
+        await asyncio.sleep(delay)
+        self.done([payload])
+
+    def schedule(self, delay: float, payload: int):
+        return asyncio.create_task(self._sleep(delay, payload))
+
+    @staticmethod
+    def cancel(timer) -> None:
+        timer.cancel()
+
+
+class CallLater:
+    def __init__(self, done) -> None:
+        self.done = done
+        self.loop = asyncio.get_running_loop()
+
+    def _fire(self, payload: int) -> None:
+        self.done([payload])
+
+    def schedule(self, delay: float, payload: int):
+        return self.loop.call_later(delay, self._fire, payload)
+
+    @staticmethod
+    def cancel(timer) -> None:
+        timer.cancel()
+
+
+class Wheel(TimingWheel):
+    def __init__(self, done) -> None:
+        super().__init__(done, tick=0.1)
+
+
+async def run(factory, count: int) -> dict:
+    fired = 0
+    batches = 0
+    finished = asyncio.Event()
+
+    def done(payloads: list) -> None:
+        nonlocal fired, batches
+        fired += len(payloads)
+        batches += 1
+        if fired == count:
+            finished.set()
+
+    timers = factory(done)
+    started = time.perf_counter()
+    handles = [timers.schedule(DELAY, i) for i in range(count)]
+    scheduled = time.perf_counter()
+    # Ход в каждой игре переставляет ее таймер
+    for i, handle in enumerate(handles):
+        timers.cancel(handle)
+        handles[i] = timers.schedule(DELAY, i)
+    rescheduled = time.perf_counter()
+    deadline = rescheduled + DELAY
+    await finished.wait()
+    ended = time.perf_counter()
+    if isinstance(timers, TimingWheel):
+        await timers.stop()
+    # Отмененные задачи тоже должны завершиться
+    await asyncio.sleep(0)
+    return {
+        "schedule": (scheduled - started) / count * 1e6,
+        "reschedule": (rescheduled - scheduled) / count * 1e6,
+        "lateness": max(0.0, ended - deadline),
+        "batches": batches,
+    }
+
+
+async def memory(factory, count: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    timers = factory(lambda payloads: None)
+    handles = [timers.schedule(60, i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for handle in handles:
+        timers.cancel(handle)
+    if isinstance(timers, TimingWheel):
+        await timers.stop()
+    await asyncio.sleep(0)
+    return size
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+
+    for count in args.sizes:
+        print(f"{count:,} timers")
+        for name, factory in (
+            ("tasks", Tasks),
+            ("call_later", CallLater),
+            ("wheel", Wheel),
+        ):
+            result = await run(factory, count)
+            size = await memory(factory, count)
+            print(
+                f"  {name:>10}: schedule {result['schedule']:5.2f} us, "
+                f"reschedule {result['reschedule']:5.2f} us, "
+                f"all fired {result['lateness'] * 1000:7.1f} ms after "
+                f"deadline in {result['batches']:,} callbacks, "
+                f"{size / count:5.0f} B/timer"
+            )
+            gc.collect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
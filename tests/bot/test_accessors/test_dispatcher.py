@@ -0,0 +1,84 @@
+import asyncio
+
+from app.store.bot.dispatcher import Dispatcher
+
+
+class TestDispatcher:
+    async def test_keeps_order_within_key(self) -> None:
+        handled = []
+
+        async def handler(item: tuple[int, int]) -> None:
+            await asyncio.sleep(0.01 if item[1] == 0 else 0)
+            handled.append(item)
+
+        dispatcher = Dispatcher(handler)
+        futures = [
+            await dispatcher.submit(key, (key, number))
+            for number in range(3)
+            for key in (1, 2)
+        ]
+        await asyncio.gather(*futures)
+        await dispatcher.stop()
+
+        assert [item for item in handled if item[0] == 1] == [
+            (1, 0),
+            (1, 1),
+            (1, 2),
+        ]
+        assert [item for item in handled if item[0] == 2] == [
+            (2, 0),
+            (2, 1),
+            (2, 2),
+        ]
+
+    async def test_slow_key_does_not_block_others(self) -> None:
+        slow_started = asyncio.Event()
+        release_slow = asyncio.Event()
+
+        async def handler(key: int) -> None:
+            if key == 1:
+                slow_started.set()
+                await release_slow.wait()
+
+        dispatcher = Dispatcher(handler)
+        slow = await dispatcher.submit(1, 1)
+        await slow_started.wait()
+
+        fast = await dispatcher.submit(2, 2)
+        await asyncio.wait_for(fast, timeout=1)
+        assert not slow.done()
+
+        release_slow.set()
+        await slow
+        await dispatcher.stop()
+
+    async def test_concurrency_cap(self) -> None:
+        running = 0
+        max_running = 0
+
+        async def handler(_: int) -> None:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        dispatcher = Dispatcher(handler, concurrency=2)
+        futures = [await dispatcher.submit(key, key) for key in range(10)]
+        await asyncio.gather(*futures)
+        await dispatcher.stop()
+
+        assert max_running == 2
+
+    async def test_idle_workers_are_reaped(self) -> None:
+        async def handler(_: int) -> None:
+            await asyncio.sleep(0)
+
+        dispatcher = Dispatcher(handler, idle_timeout=0.05)
+        await (await dispatcher.submit(1, 1))
+        assert dispatcher.active_workers == 1
+
+        await asyncio.sleep(0.2)
+        assert dispatcher.active_workers == 0
+        assert dispatcher.reaped == 1
+        await dispatcher.stop()
@@ -0,0 +1,31 @@
+from app.store import Store
+from app.store.game.engine import HELP_TEXT
+from tests.fake_vk import FakeVkServer
+
+
+class TestFakeVk:
+    async def test_updates_are_answered(
+        self, store: Store, fake_vk: FakeVkServer
+    ) -> None:
+        await store.vk_api.connect(store.app)
+        try:
+            await fake_vk.generate(3)
+            await fake_vk.wait_replies(3, timeout=5)
+        finally:
+            await store.vk_api.disconnect(store.app)
+
+        assert sorted(reply.user_id for reply in fake_vk.replies) == [1, 2, 3]
+        assert {reply.text for reply in fake_vk.replies} == {HELP_TEXT}
+
+    async def test_rate_limit_error_is_retried(
+        self, store: Store, fake_vk: FakeVkServer
+    ) -> None:
+        fake_vk.rate_limit = 1
+        await store.vk_api.connect(store.app)
+        try:
+            await fake_vk.generate(2, rate=20)
+            await fake_vk.wait_replies(2, timeout=10)
+        finally:
+            await store.vk_api.disconnect(store.app)
+
+        assert len(fake_vk.replies) == 2
@@ -0,0 +1,28 @@
+from aiohttp import web
+
+from app.store.vk_api.http import HttpMetrics, create_session
+from app.web.config import HttpClientConfig
+
+
+# aiohttp принимает обработчиками только корутины
+async def handler(  # ruff: ignore[unused-async]
+    request: web.Request,
+) -> web.Response:
+    return web.json_response({"response": 1})
+
+
+class TestHttpClient:
+    async def test_connection_is_reused(self, aiohttp_server) -> None:
+        app = web.Application()
+        app.router.add_get("/", handler)
+        server = await aiohttp_server(app)
+        metrics = HttpMetrics()
+
+        async with create_session(HttpClientConfig(), metrics) as session:
+            for _ in range(3):
+                async with session.get(server.make_url("/")) as response:
+                    assert await response.json() == {"response": 1}
+
+        assert metrics.requests == 3
+        assert metrics.connections_created == 1
+        assert metrics.connections_reused == 2
@@ -0,0 +1,210 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.base.base_accessor import BaseAccessor
+from app.quiz.models import QuestionModel
+from app.store.bot.leader import LeaderElection, try_lock
+from app.store.game.engine import GameEngine
+from app.web.config import Config
+
+
+async def close(connection: AsyncConnection) -> None:
+    await connection.invalidate()
+    await connection.close()
+
+
+async def wait_lock(connection: AsyncConnection, group_id: int) -> bool:
+    # Сервер снимает блокировку, когда завершит процесс соединения
+    for _ in range(50):
+        if await try_lock(connection, group_id):
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+class FakeConnection:
+    def __init__(self, database: "FakeDatabase") -> None:
+        self.database = database
+        self.invalidated = False
+
+    async def scalar(self, query) -> object:
+        if self.database.is_down:
+            raise ConnectionError("connection lost")
+        if "pg_try_advisory_lock" not in str(query):
+            return 1
+        if self.database.holder is None:
+            self.database.holder = self
+        return self.database.holder is self
+
+    async def commit(self) -> None:
+        if self.database.is_down:
+            raise ConnectionError("connection lost")
+
+    async def invalidate(self) -> None:
+        self.invalidated = True
+        # Как и на сервере, блокировка снимается вместе с соединением
+        if self.database.holder is self:
+            self.database.holder = None
+
+    async def close(self) -> None:
+        return
+
+
+class FakeDatabase:
+    def __init__(self) -> None:
+        self.holder: FakeConnection | None = None
+        self.is_down = False
+        self.engine = self
+
+    async def connect(self) -> FakeConnection:
+        if self.is_down:
+            raise ConnectionError("connection refused")
+        return FakeConnection(self)
+
+
+class FakeLeaderboard:
+    async def load(self) -> None:
+        return
+
+
+class FakeComponent(BaseAccessor):
+    def __init__(self, app) -> None:
+        super().__init__(app)
+        self.running = False
+
+    async def connect(self, app) -> None:
+        self.running = True
+
+    async def disconnect(self, app) -> None:
+        self.running = False
+
+
+def fake_app(database: FakeDatabase) -> SimpleNamespace:
+    return SimpleNamespace(
+        on_startup=[],
+        on_cleanup=[],
+        database=database,
+        config=SimpleNamespace(
+            server=SimpleNamespace(
+                election_interval=0.01, leaderboard_refresh_interval=0
+            ),
+            bot=SimpleNamespace(group_id=1),
+        ),
+        store=SimpleNamespace(leaderboard=FakeLeaderboard()),
+    )
+
+
+def make_election(database: FakeDatabase) -> LeaderElection:
+    app = fake_app(database)
+    component = FakeComponent(app)
+    return LeaderElection(app, [component])
+
+
+async def wait_for(condition) -> None:
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition is not met")
+
+
+class TestLeaderElection:
+    async def test_components_start_only_on_leader(self) -> None:
+        database = FakeDatabase()
+        first = make_election(database)
+        second = make_election(database)
+
+        await first.connect(first.app)
+        await wait_for(lambda: first.is_leader)
+        await second.connect(second.app)
+        await asyncio.sleep(0.05)
+        try:
+            assert first.components[0].running
+            assert not second.is_leader
+            assert not second.components[0].running
+        finally:
+            await first.disconnect(first.app)
+            await second.disconnect(second.app)
+
+    async def test_step_down_on_failed_ping(self) -> None:
+        database = FakeDatabase()
+        election = make_election(database)
+
+        await election.connect(election.app)
+        await wait_for(lambda: election.is_leader)
+        connection = election.connection
+        database.is_down = True
+        try:
+            await wait_for(lambda: not election.is_leader)
+            assert not election.components[0].running
+            assert connection.invalidated
+            assert election.connection is None
+        finally:
+            await election.disconnect(election.app)
+
+    async def test_step_down_clears_games_when_flush_fails(
+        self,
+        games: GameEngine,
+        question_1: QuestionModel,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        app = fake_app(FakeDatabase())
+        app.on_startup.append(games.connect)
+        app.on_cleanup.append(games.disconnect)
+        election = LeaderElection(app, [games])
+        election.is_leader = True
+        election._started.append(games)
+        await games.handle_message(2_000_000_001, 1, "/start")
+        monkeypatch.setattr(
+            games.writer,
+            "flush",
+            AsyncMock(side_effect=ConnectionError("connection lost")),
+        )
+        await election._step_down()
+
+        assert not election.is_leader
+        assert games.games == {}
+
+
+class TestLeaderLock:
+    async def test_single_leader(
+        self, db_engine: AsyncEngine, config: Config
+    ) -> None:
+        group_id = config.bot.group_id
+        leader = await db_engine.connect()
+        follower = await db_engine.connect()
+        try:
+            assert await try_lock(leader, group_id)
+            assert not await try_lock(follower, group_id)
+        finally:
+            await close(leader)
+            await close(follower)
+
+    async def test_failover_when_leader_connection_is_lost(
+        self, db_engine: AsyncEngine, config: Config
+    ) -> None:
+        group_id = config.bot.group_id
+        leader = await db_engine.connect()
+        follower = await db_engine.connect()
+        try:
+            assert await try_lock(leader, group_id)
+            await close(leader)
+            assert await wait_lock(follower, group_id)
+        finally:
+            await close(follower)
+
+    async def test_groups_are_independent(
+        self, db_engine: AsyncEngine, config: Config
+    ) -> None:
+        first = await db_engine.connect()
+        second = await db_engine.connect()
+        try:
+            assert await try_lock(first, config.bot.group_id)
+            assert await try_lock(second, config.bot.group_id + 1)
+        finally:
+            await close(first)
+            await close(second)
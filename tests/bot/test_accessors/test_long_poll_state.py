@@ -0,0 +1,204 @@
+import asyncio
+from collections.abc import Iterator
+from typing import Self
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.store import Store
+from app.store.vk_api.state import LongPollCheckpoint, RecentIds
+
+
+def raw_update(message_id: int) -> dict:
+    return {
+        "type": "message_new",
+        "object": {
+            "message": {"id": message_id, "from_id": message_id, "text": "kek"}
+        },
+    }
+
+
+def raw_chat_update(conversation_message_id: int) -> dict:
+    # В беседах VK присылает боту id=0
+    return {
+        "type": "message_new",
+        "object": {
+            "message": {
+                "id": 0,
+                "peer_id": 2_000_000_001,
+                "conversation_message_id": conversation_message_id,
+                "from_id": 1,
+                "text": "kek",
+            }
+        },
+    }
+
+
+class FakeResponse:
+    def __init__(self, data: dict) -> None:
+        self.data = data
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        return None
+
+    async def json(self) -> dict:
+        return self.data
+
+
+class FakeSession:
+    def __init__(self, responses: list[dict]) -> None:
+        self.responses = responses
+
+    def get(self, url: str, **kwargs) -> FakeResponse:
+        return FakeResponse(self.responses.pop(0))
+
+
+@pytest.fixture
+def long_poll(store: Store) -> Iterator[AsyncMock]:
+    vk_api = store.vk_api
+    vk_api.checkpoint = LongPollCheckpoint(dedup_size=100)
+    vk_api.server = "https://lp.vk.com/"
+    vk_api.key = "key"
+    vk_api.ts = "1"
+    put_mock = AsyncMock()
+    store.bots_manager.queue.put = put_mock
+    yield put_mock
+    del store.bots_manager.queue.put
+    vk_api.checkpoint = None
+    vk_api.session = None
+
+
+class TestRecentIds:
+    def test_evicts_oldest(self) -> None:
+        ids = RecentIds(maxsize=2)
+        ids.update([1, 2, 3])
+
+        assert 1 not in ids
+        assert ids.to_list() == [2, 3]
+
+
+class TestLongPollCheckpoint:
+    async def test_ts_advances_through_completed_prefix(self) -> None:
+        loop = asyncio.get_running_loop()
+        checkpoint = LongPollCheckpoint(dedup_size=100)
+        first, second = loop.create_future(), loop.create_future()
+        checkpoint.track("2", [1], first)
+        checkpoint.track("3", [2], second)
+
+        second.set_result(None)
+        await asyncio.sleep(0)
+        assert not checkpoint.advance()
+        assert checkpoint.ts is None
+        assert 2 in checkpoint.handled
+
+        first.set_result(None)
+        await asyncio.sleep(0)
+        assert checkpoint.advance()
+        assert checkpoint.ts == "3"
+        assert checkpoint.dirty
+
+    async def test_in_flight_ids_are_duplicates(self) -> None:
+        checkpoint = LongPollCheckpoint(dedup_size=100)
+        checkpoint.track("2", [1], asyncio.get_running_loop().create_future())
+
+        assert checkpoint.is_duplicate(1)
+        assert not checkpoint.is_duplicate(2)
+
+
+class TestPoll:
+    async def test_skips_duplicates(
+        self, store: Store, long_poll: AsyncMock
+    ) -> None:
+        store.vk_api.checkpoint.restore("1", [1])
+        store.vk_api.session = FakeSession(
+            [{"ts": "2", "updates": [raw_update(1), raw_update(2)]}]
+        )
+
+        await store.vk_api.poll()
+
+        [[updates, _]] = [call.args for call in long_poll.call_args_list]
+        assert [update.object.message.id for update in updates] == [2]
+        assert store.vk_api.ts == "2"
+
+    async def test_chat_messages_are_keyed_by_conversation(
+        self, store: Store, long_poll: AsyncMock
+    ) -> None:
+        store.vk_api.session = FakeSession(
+            [
+                {"ts": "2", "updates": [raw_chat_update(1)]},
+                {"ts": "3", "updates": [raw_chat_update(2), raw_chat_update(1)]},
+            ]
+        )
+
+        await store.vk_api.poll()
+        await store.vk_api.poll()
+
+        batches = [call.args[0] for call in long_poll.call_args_list]
+        assert [
+            [u.object.message.conversation_message_id for u in updates]
+            for updates in batches
+        ] == [[1], [2]]
+
+    async def test_failed_history_takes_new_ts(
+        self, store: Store, long_poll: AsyncMock
+    ) -> None:
+        store.vk_api.session = FakeSession([{"failed": 1, "ts": "10"}])
+
+        await store.vk_api.poll()
+
+        assert store.vk_api.ts == "10"
+        long_poll.assert_not_called()
+
+    async def test_failed_key_keeps_ts(
+        self, store: Store, long_poll: AsyncMock
+    ) -> None:
+        store.vk_api.session = FakeSession(
+            [
+                {"failed": 2},
+                {"response": {"key": "new", "server": "s", "ts": "99"}},
+            ]
+        )
+
+        await store.vk_api.poll()
+
+        assert store.vk_api.key == "new"
+        assert store.vk_api.ts == "1"
+
+
+class TestStatePersistence:
+    async def test_state_survives_restart(
+        self, store: Store, long_poll: AsyncMock
+    ) -> None:
+        vk_api = store.vk_api
+        done = asyncio.get_running_loop().create_future()
+        vk_api.checkpoint.track("5", [1, 2], done)
+        done.set_result(None)
+        await asyncio.sleep(0)
+        vk_api.checkpoint.advance()
+        await vk_api._save_state()
+
+        vk_api.checkpoint = LongPollCheckpoint(dedup_size=100)
+        await vk_api._load_state()
+
+        assert vk_api.checkpoint.ts == "5"
+        assert vk_api.checkpoint.is_duplicate(2)
+
+    async def test_chat_keys_survive_restart(
+        self, store: Store, long_poll: AsyncMock
+    ) -> None:
+        vk_api = store.vk_api
+        done = asyncio.get_running_loop().create_future()
+        vk_api.checkpoint.track("5", [(2_000_000_001, 7)], done)
+        done.set_result(None)
+        await asyncio.sleep(0)
+        vk_api.checkpoint.advance()
+        await vk_api._save_state()
+
+        vk_api.checkpoint = LongPollCheckpoint(dedup_size=100)
+        await vk_api._load_state()
+
+        assert vk_api.checkpoint.is_duplicate((2_000_000_001, 7))
+        assert not vk_api.checkpoint.is_duplicate((2_000_000_001, 8))
@@ -0,0 +1,148 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.bot.models import OutboxModel
+from app.store import Store
+from app.store.vk_api.dataclasses import (
+    Message,
+    Update,
+    UpdateMessage,
+    UpdateObject,
+)
+from app.store.vk_api.exceptions import VkApiError
+
+
+async def get_outbox(
+    db_sessionmaker: async_sessionmaker[AsyncSession],
+) -> list[OutboxModel]:
+    async with db_sessionmaker() as session:
+        return list(await session.scalars(select(OutboxModel)))
+
+
+class TestOutboxAccessor:
+    async def test_table_exists(self, inspect_list_tables: list[str]):
+        assert "outbox" in inspect_list_tables
+
+    async def test_enqueue_in_caller_transaction(
+        self,
+        store: Store,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+    ) -> None:
+        async with db_sessionmaker() as session:
+            await store.outbox.enqueue(
+                [Message(user_id=1, text="lost")], session=session
+            )
+            await session.rollback()
+
+        async with db_sessionmaker() as session:
+            await store.outbox.enqueue(
+                [Message(user_id=2, text="kept")], session=session
+            )
+            await session.commit()
+
+        rows = await get_outbox(db_sessionmaker)
+        assert [(row.user_id, row.text) for row in rows] == [(2, "kept")]
+
+    async def test_sent_messages_are_deleted(
+        self,
+        store: Store,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+        vk_api_send_message_mock: AsyncMock,
+    ) -> None:
+        await store.outbox.enqueue(
+            [Message(user_id=1, text="a"), Message(user_id=2, text="b")]
+        )
+
+        assert await store.outbox.send_batch() == 2
+        assert vk_api_send_message_mock.call_count == 2
+        assert await get_outbox(db_sessionmaker) == []
+
+    async def test_claimed_message_is_hidden_while_sending(
+        self,
+        store: Store,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+        vk_api_send_message_mock: AsyncMock,
+    ) -> None:
+        concurrent = []
+
+        async def send_message(message: Message) -> None:
+            # Второй воркер, пришедший во время отправки, ничего не берет
+            concurrent.append(await store.outbox.send_batch())
+
+        vk_api_send_message_mock.side_effect = send_message
+        await store.outbox.enqueue([Message(user_id=1, text="a")])
+
+        assert await store.outbox.send_batch() == 1
+        assert concurrent == [0]
+        assert await get_outbox(db_sessionmaker) == []
+
+    async def test_failed_message_is_rescheduled(
+        self,
+        store: Store,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+        vk_api_send_message_mock: AsyncMock,
+    ) -> None:
+        vk_api_send_message_mock.side_effect = ConnectionError("boom")
+        await store.outbox.enqueue([Message(user_id=1, text="a")])
+
+        assert await store.outbox.send_batch() == 1
+        # Следующая попытка еще не наступила
+        assert await store.outbox.send_batch() == 0
+
+        [row] = await get_outbox(db_sessionmaker)
+        assert row.attempts == 1
+        assert not row.dead
+        assert row.last_error == "boom"
+
+    async def test_permanent_error_is_dead_lettered(
+        self,
+        store: Store,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+        vk_api_send_message_mock: AsyncMock,
+    ) -> None:
+        vk_api_send_message_mock.side_effect = VkApiError(901, "forbidden")
+        await store.outbox.enqueue([Message(user_id=1, text="a")])
+
+        await store.outbox.send_batch()
+
+        [row] = await get_outbox(db_sessionmaker)
+        assert row.dead
+
+    async def test_random_id_is_stable(
+        self,
+        store: Store,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+        vk_api_send_message_mock: AsyncMock,
+    ) -> None:
+        await store.outbox.enqueue([Message(user_id=1, text="a")])
+        [row] = await get_outbox(db_sessionmaker)
+
+        await store.outbox.send_batch()
+
+        message: Message = vk_api_send_message_mock.mock_calls[0].args[0]
+        assert message.random_id == row.random_id
+
+    @pytest.mark.usefixtures("outbox_enabled")
+    async def test_bot_replies_through_outbox(
+        self,
+        store: Store,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+        vk_api_send_message_mock: AsyncMock,
+    ) -> None:
+        await store.bots_manager.handle_updates(
+            [
+                Update(
+                    type="message_new",
+                    object=UpdateObject(
+                        message=UpdateMessage(id=1, from_id=2, text="kek")
+                    ),
+                )
+            ]
+        )
+
+        vk_api_send_message_mock.assert_not_called()
+        rows = await get_outbox(db_sessionmaker)
+        assert [row.user_id for row in rows] == [2]
@@ -0,0 +1,35 @@
+from app.store.vk_api.parser import UpdateParser
+
+
+def message_new(message_id: int) -> dict:
+    return {
+        "type": "message_new",
+        "object": {
+            "message": {"id": message_id, "from_id": 1, "text": "kek"},
+            "client_info": {"keyboard": True},
+        },
+    }
+
+
+class TestUpdateParser:
+    def test_skips_unhandled_events(self) -> None:
+        parser = UpdateParser()
+        updates = parser.parse_many(
+            [
+                {"type": "message_typing_state", "object": {"from_id": 1}},
+                message_new(1),
+                {"type": "message_reply", "object": {"id": 2, "text": "hi"}},
+            ]
+        )
+
+        assert [update.object.message.id for update in updates] == [1]
+        assert parser.stats() == {"parsed": 1, "skipped": 2, "malformed": 0}
+
+    def test_malformed_event_does_not_break_batch(self) -> None:
+        parser = UpdateParser()
+        updates = parser.parse_many(
+            [{"type": "message_new", "object": {}}, message_new(2)]
+        )
+
+        assert [update.object.message.id for update in updates] == [2]
+        assert parser.malformed == 1
@@ -0,0 +1,39 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from app.store.vk_api.poller import Poller
+
+
+class HangingVkApi:
+    def __init__(self) -> None:
+        self.started = asyncio.Event()
+        self.cancelled = False
+
+    async def poll(self) -> None:
+        # Long poll, на который VK еще не ответил
+        self.started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+class TestPoller:
+    async def test_stop_does_not_wait_for_long_poll(self) -> None:
+        vk_api = HangingVkApi()
+        poller = Poller(
+            SimpleNamespace(
+                vk_api=vk_api,
+                app=SimpleNamespace(logger=logging.getLogger("test")),
+            )
+        )
+        poller.start()
+        await vk_api.started.wait()
+
+        await asyncio.wait_for(poller.stop(), 1)
+
+        assert vk_api.cancelled
+        assert poller.poll_task is None
+        assert not poller.is_running
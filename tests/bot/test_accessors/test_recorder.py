@@ -0,0 +1,43 @@
+from pathlib import Path
+
+from app.store.vk_api.recorder import LongPollRecorder, read_recording
+
+
+class TestLongPollRecorder:
+    async def test_recordings_are_appended(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "long_poll.jsonl.gz")
+        for ts in ("1", "2"):
+            recorder = LongPollRecorder(path)
+            await recorder.write(
+                {"ts": ts, "updates": [{"type": "message_new"}]}
+            )
+            await recorder.close()
+
+        records = list(read_recording(path))
+
+        assert [response["ts"] for _, response in records] == ["1", "2"]
+        assert records[0][0] <= records[1][0]
+
+    async def test_records_are_flushed_in_batches(self, tmp_path: Path) -> None:
+        path = tmp_path / "long_poll.jsonl.gz"
+        recorder = LongPollRecorder(str(path), flush_every=2)
+
+        await recorder.write({"ts": "1"})
+        assert not path.exists()
+        await recorder.write({"ts": "2"})
+
+        assert [r["ts"] for _, r in read_recording(str(path))] == ["1", "2"]
+
+    async def test_truncated_recording_is_read_up_to_last_member(
+        self, tmp_path: Path
+    ) -> None:
+        path = tmp_path / "long_poll.jsonl.gz"
+        recorder = LongPollRecorder(str(path), flush_every=1)
+        await recorder.write({"ts": "1"})
+        size = path.stat().st_size
+        await recorder.write({"ts": "2"})
+        # Процесс упал посреди записи второго member
+        with path.open("r+b") as file:
+            file.truncate(size + 10)
+
+        assert [r["ts"] for _, r in read_recording(str(path))] == ["1"]
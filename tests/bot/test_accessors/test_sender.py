@@ -0,0 +1,149 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.store.vk_api.dataclasses import Message
+from app.store.vk_api.exceptions import SenderStoppedError, VkApiError
+from app.store.vk_api.rate_limiter import TokenBucket
+from app.store.vk_api.sender import MessageSender
+
+
+class FakeVkApi:
+    def __init__(self, responses: list) -> None:
+        self.app = SimpleNamespace(
+            config=SimpleNamespace(bot=SimpleNamespace(group_id=1))
+        )
+        self.calls: list[str] = []
+        self._responses = responses
+
+    async def api_post(self, method: str, params: dict) -> dict:
+        assert method == "execute"
+        self.calls.append(params["code"])
+        size = params["code"].count("API.messages.send(")
+        response = self._responses.pop(0) if self._responses else None
+        if isinstance(response, Exception):
+            raise response
+        if response is None:
+            return {"response": list(range(1, size + 1))}
+        return response
+
+
+class TestMessageSender:
+    async def test_messages_are_batched_into_execute(self) -> None:
+        vk_api = FakeVkApi([])
+        sender = MessageSender(vk_api, rate_limit=100, linger=0.01)
+        sender.start()
+
+        await asyncio.gather(
+            *(
+                sender.send(Message(user_id=user_id, text="hi"))
+                for user_id in range(30)
+            )
+        )
+        await sender.stop()
+
+        assert [code.count("API.messages.send(") for code in vk_api.calls] == [
+            25,
+            5,
+        ]
+        assert sender.sent == 30
+        assert sender.latency.count == 30
+
+    async def test_keyboard_is_sent_with_message(self) -> None:
+        vk_api = FakeVkApi([])
+        sender = MessageSender(vk_api, rate_limit=100, linger=0)
+        sender.start()
+
+        await sender.send(Message(user_id=1, text="hi", keyboard='{"a":1}'))
+        await sender.stop()
+
+        [code] = vk_api.calls
+        assert '"keyboard": "{\\"a\\":1}"' in code
+
+    async def test_rate_limit_error_is_retried(self) -> None:
+        vk_api = FakeVkApi([VkApiError(6, "Too many requests per second")])
+        sender = MessageSender(vk_api, rate_limit=100, linger=0, backoff=0.01)
+        sender.start()
+
+        await sender.send(Message(user_id=1, text="hi"))
+        await sender.stop()
+
+        assert len(vk_api.calls) == 2
+        assert sender.retried == 1
+        assert sender.sent == 1
+
+    async def test_failed_call_inside_execute(self) -> None:
+        vk_api = FakeVkApi(
+            [
+                {
+                    "response": [1, False],
+                    "execute_errors": [
+                        {
+                            "method": "messages.send",
+                            "error_code": 901,
+                            "error_msg": "Can't send messages",
+                        }
+                    ],
+                }
+            ]
+        )
+        sender = MessageSender(vk_api, rate_limit=100, linger=0.01)
+        sender.start()
+
+        results = await asyncio.gather(
+            sender.send(Message(user_id=1, text="hi")),
+            sender.send(Message(user_id=2, text="hi")),
+            return_exceptions=True,
+        )
+        await sender.stop()
+
+        assert results[0] is None
+        assert isinstance(results[1], VkApiError)
+        assert results[1].code == 901
+
+    async def test_random_id_is_kept_between_retries(self) -> None:
+        vk_api = FakeVkApi([VkApiError(9, "Flood control")])
+        sender = MessageSender(vk_api, rate_limit=100, linger=0, backoff=0.01)
+        sender.start()
+
+        await sender.send(Message(user_id=1, text="hi"))
+        await sender.stop()
+
+        first, second = vk_api.calls
+        assert first == second
+
+    async def test_stop_fails_message_waiting_for_retry(self) -> None:
+        vk_api = FakeVkApi([VkApiError(6, "Too many requests per second")])
+        sender = MessageSender(vk_api, rate_limit=100, linger=0, backoff=10)
+        sender.start()
+
+        task = asyncio.create_task(sender.send(Message(user_id=1, text="hi")))
+        while not sender.retried:
+            await asyncio.sleep(0.01)
+        await sender.stop()
+
+        with pytest.raises(SenderStoppedError):
+            await asyncio.wait_for(task, 1)
+
+    async def test_stop_fails_queued_message(self) -> None:
+        sender = MessageSender(FakeVkApi([]), rate_limit=100, linger=0)
+
+        task = asyncio.create_task(sender.send(Message(user_id=1, text="hi")))
+        await asyncio.sleep(0)
+        await sender.stop()
+
+        with pytest.raises(SenderStoppedError):
+            await asyncio.wait_for(task, 1)
+        assert sender.stats()["queued"] == 0
+
+
+class TestTokenBucket:
+    @pytest.mark.parametrize("rate", (10, 50))
+    async def test_limits_rate(self, rate: int) -> None:
+        bucket = TokenBucket(rate, capacity=1)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for _ in range(5):
+            await bucket.acquire()
+        assert loop.time() - started >= 4 / rate * 0.9
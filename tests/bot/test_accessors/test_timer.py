@@ -0,0 +1,45 @@
+import asyncio
+
+from app.store.vk_api.timer import TimingWheel
+
+
+class TestTimingWheel:
+    async def test_expired_timers_fire_in_one_batch(self) -> None:
+        fired: list[list[str]] = []
+        wheel = TimingWheel(fired.append, tick=10, slots=8)
+        wheel.schedule(5, "a")
+        cancelled = wheel.schedule(5, "b")
+        wheel.schedule(15, "c")
+        wheel.schedule(100, "late")
+        cancelled.cancel()
+        await wheel.stop()
+
+        wheel.advance(2)
+
+        assert fired == [["a", "c"]]
+        assert len(wheel) == 1
+
+    async def test_timer_waits_for_its_round_of_the_wheel(self) -> None:
+        fired: list[list[str]] = []
+        wheel = TimingWheel(fired.append, tick=10, slots=4)
+        wheel.schedule(55, "far")
+        await wheel.stop()
+
+        wheel.advance(5)
+        assert fired == []
+        wheel.advance(6)
+        assert fired == [["far"]]
+
+    async def test_fires_on_time(self) -> None:
+        fired: list[list[int]] = []
+        wheel = TimingWheel(fired.append, tick=0.01)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        wheel.schedule(0.05, 1)
+
+        while not fired:
+            await asyncio.sleep(0.01)
+        await wheel.stop()
+
+        assert fired == [[1]]
+        assert 0.05 <= loop.time() - started < 0.5
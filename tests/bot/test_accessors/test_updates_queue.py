@@ -0,0 +1,47 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+from app.store import Store
+from app.store.bot.queue import UpdatesQueue
+from app.store.vk_api.dataclasses import Update, UpdateMessage, UpdateObject
+
+
+def make_update(from_id: int) -> Update:
+    return Update(
+        type="message_new",
+        object=UpdateObject(
+            message=UpdateMessage(id=from_id, from_id=from_id, text="kek"),
+        ),
+    )
+
+
+class TestUpdatesQueue:
+    async def test_consumer_handles_queued_updates(
+        self, store: Store, vk_api_send_message_mock: AsyncMock
+    ) -> None:
+        store.bots_manager.start()
+        try:
+            await store.bots_manager.queue.put([make_update(1), make_update(2)])
+            await store.bots_manager.queue.put([make_update(3)])
+        finally:
+            await store.bots_manager.stop()
+
+        assert vk_api_send_message_mock.call_count == 3
+        stats = store.bots_manager.queue.stats()
+        assert stats["depth"] == 0
+        assert stats["lag"]["count"] >= 2
+
+    async def test_put_blocks_when_queue_is_full(self) -> None:
+        queue = UpdatesQueue(maxsize=1)
+
+        await queue.put([make_update(1)])
+        blocked_put = asyncio.create_task(queue.put([make_update(2)]))
+        await asyncio.sleep(0)
+
+        assert not blocked_put.done()
+        assert queue.metrics.blocked_puts == 1
+
+        await queue.get()
+        queue.task_done()
+        await blocked_put
+        assert queue.depth == 1
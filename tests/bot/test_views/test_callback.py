@@ -0,0 +1,191 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from aiohttp.test_utils import TestClient
+
+from app.store import Store
+from app.web.config import (
+    AdminConfig,
+    BotConfig,
+    Config,
+    ServerConfig,
+    load_server_config,
+)
+
+
+def message_event(config: Config, secret: str | None) -> dict:
+    event = {
+        "type": "message_new",
+        "group_id": config.bot.group_id,
+        "object": {"message": {"id": 1, "from_id": 2, "text": "kek"}},
+    }
+    if secret is not None:
+        event["secret"] = secret
+    return event
+
+
+class TestVkCallbackView:
+    async def test_confirmation(self, cli: TestClient, config: Config) -> None:
+        config.bot.callback_confirmation = "a1b2c3"
+
+        response = await cli.post(
+            "/vk.callback",
+            json={"type": "confirmation", "group_id": config.bot.group_id},
+        )
+        assert response.status == 200
+        assert await response.text() == "a1b2c3"
+
+    async def test_forbidden_for_other_group(
+        self, cli: TestClient, config: Config
+    ) -> None:
+        response = await cli.post(
+            "/vk.callback",
+            json={"type": "confirmation", "group_id": config.bot.group_id + 1},
+        )
+        assert response.status == 403
+
+    @pytest.mark.usefixtures("callback_secret")
+    async def test_forbidden_with_wrong_secret(
+        self, cli: TestClient, config: Config
+    ) -> None:
+        response = await cli.post(
+            "/vk.callback", json=message_event(config, "wrong")
+        )
+        assert response.status == 403
+
+    @pytest.mark.usefixtures("callback_secret")
+    async def test_forbidden_without_secret(
+        self, cli: TestClient, config: Config
+    ) -> None:
+        response = await cli.post(
+            "/vk.callback", json=message_event(config, None)
+        )
+        assert response.status == 403
+
+    async def test_forbidden_when_secret_is_not_configured(
+        self, cli: TestClient, config: Config, store: Store
+    ) -> None:
+        response = await cli.post(
+            "/vk.callback", json=message_event(config, "")
+        )
+        assert response.status == 403
+        assert store.bots_manager.queue.depth == 0
+
+    async def test_bad_request_on_invalid_json(self, cli: TestClient) -> None:
+        response = await cli.post("/vk.callback", data=b"{not json")
+        assert response.status == 400
+
+        data = await response.json()
+        assert data["status"] == "bad_request"
+
+    async def test_message_is_queued(
+        self,
+        cli: TestClient,
+        config: Config,
+        store: Store,
+        callback_secret: str,
+    ) -> None:
+        response = await cli.post(
+            "/vk.callback", json=message_event(config, callback_secret)
+        )
+        assert response.status == 200
+        assert await response.text() == "ok"
+
+        queue = store.bots_manager.queue
+        assert queue.depth == 1
+        [update] = (await queue.get()).updates
+        queue.task_done()
+        assert update.object.message.from_id == 2
+
+    async def test_retried_event_is_queued_once(
+        self,
+        cli: TestClient,
+        config: Config,
+        store: Store,
+        callback_secret: str,
+    ) -> None:
+        event = {**message_event(config, callback_secret), "event_id": "e1"}
+
+        for _ in range(2):
+            response = await cli.post("/vk.callback", json=event)
+            assert response.status == 200
+            assert await response.text() == "ok"
+
+        queue = store.bots_manager.queue
+        assert queue.depth == 1
+        await queue.get()
+        queue.task_done()
+
+    async def test_event_rejected_when_busy_is_queued_on_retry(
+        self,
+        cli: TestClient,
+        config: Config,
+        store: Store,
+        callback_secret: str,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        event = {**message_event(config, callback_secret), "event_id": "e2"}
+        queue = store.bots_manager.queue
+
+        with monkeypatch.context() as patch:
+            patch.setattr(
+                queue, "put_nowait", Mock(side_effect=asyncio.QueueFull)
+            )
+            response = await cli.post("/vk.callback", json=event)
+            assert response.status == 503
+
+        response = await cli.post("/vk.callback", json=event)
+        assert response.status == 200
+        assert queue.depth == 1
+        await queue.get()
+        queue.task_done()
+
+    async def test_unsupported_event_is_acknowledged(
+        self,
+        cli: TestClient,
+        config: Config,
+        store: Store,
+        callback_secret: str,
+    ) -> None:
+        response = await cli.post(
+            "/vk.callback",
+            json={
+                "type": "group_join",
+                "group_id": config.bot.group_id,
+                "secret": callback_secret,
+                "object": {"user_id": 1},
+            },
+        )
+        assert response.status == 200
+        assert store.bots_manager.queue.depth == 0
+
+
+class TestCallbackConfig:
+    def test_callback_mode_requires_secret(self) -> None:
+        with pytest.raises(ValueError, match="callback_secret"):
+            BotConfig(token="token", group_id=1, mode="callback")
+
+    def test_callback_mode_requires_single_worker(self) -> None:
+        with pytest.raises(ValueError, match="workers"):
+            Config(
+                admin=AdminConfig(email="admin@admin.com", password="admin"),
+                bot=BotConfig(
+                    token="token",
+                    group_id=1,
+                    mode="callback",
+                    callback_secret="secret",
+                ),
+                server=ServerConfig(workers=2),
+            )
+
+    def test_launcher_refuses_callback_workers(self, tmp_path: Path) -> None:
+        path = tmp_path / "config.yml"
+        path.write_text(
+            "bot: {token: token, group_id: 1, mode: callback}\n"
+            "server: {workers: 0}\n"
+        )
+
+        with pytest.raises(ValueError, match="workers"):
+            load_server_config(str(path))
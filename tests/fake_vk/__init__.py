@@ -0,0 +1,3 @@
+from .server import FakeVkServer, Reply, message_event
+
+__all__ = ["FakeVkServer", "Reply", "message_event"]
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from aiohttp import web
+
+SEND_CALL = "API.messages.send("
+
+
+@dataclass(slots=True)
+class Reply:
+    user_id: int
+    text: str
+    random_id: int
+    received_at: float
+
+
+def message_event(index: int, group_id: int = 1) -> dict:
+    """Событие message_new от пользователя с from_id == index."""
+    return {
+        "group_id": group_id,
+        "type": "message_new",
+        "event_id": f"{index:040x}",
+        "v": "5.131",
+        "object": {
+            "message": {
+                "date": int(time.time()),
+                "from_id": index,
+                "id": index,
+                "out": 0,
+                "peer_id": index,
+                "text": f"message {index}",
+                "attachments": [],
+                "fwd_messages": [],
+            },
+            "client_info": {"keyboard": True, "inline_keyboard": True},
+        },
+    }
+
+
+class FakeVkServer:
+    """
+    Локальная замена api.vk.com и lp.vk.com для нагрузочных тестов.
+
+    Отдает groups.getLongPollServer и a_check из заранее заданных или
+    сгенерированных событий, принимает messages.send и execute
+    с настраиваемой задержкой ответа и лимитом запросов в секунду.
+    """
+
+    def __init__(
+        self,
+        group_id: int = 1,
+        latency: float = 0.0,
+        rate_limit: int | None = None,
+        max_batch: int = 100,
+    ) -> None:
+        self.group_id = group_id
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.max_batch = max_batch
+        self.key = "fake-key"
+
+        self.events: list[dict] = []
+        self.pushed_at: list[float] = []
+        self.replies: list[Reply] = []
+        self.api_calls = 0
+        self.rate_limited = 0
+
+        self._random_ids: set[tuple[int, int]] = set()
+        self._calls: deque[float] = deque()
+        self._pushed = asyncio.Event()
+        self._replied = asyncio.Event()
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+        self.app = web.Application()
+        self.app.router.add_route(
+            "*", "/method/groups.getLongPollServer", self.get_long_poll_server
+        )
+        self.app.router.add_route("*", "/method/messages.send", self.send)
+        self.app.router.add_route("*", "/method/execute", self.execute)
+        self.app.router.add_get("/lp", self.a_check)
+
+    @property
+    def api_path(self) -> str:
+        return f"{self.base_url}/method/"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{port}"
+
+    async def close(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+    # Генерация апдейтов
+
+    def push(self, events: list[dict]) -> None:
+        now = time.monotonic()
+        self.events.extend(events)
+        self.pushed_at.extend([now] * len(events))
+        self._pushed.set()
+        self._pushed = asyncio.Event()
+
+    async def generate(
+        self,
+        count: int,
+        rate: float | None = None,
+        factory: Callable[[int], dict] = message_event,
+        chunk: int = 1,
+    ) -> None:
+        """Добавляет count событий, не быстрее rate в секунду."""
+        start = len(self.events) + 1
+        interval = chunk / rate if rate else 0
+        for offset in range(0, count, chunk):
+            first = start + offset
+            last = min(first + chunk, start + count)
+            self.push([factory(index) for index in range(first, last)])
+            await asyncio.sleep(interval)
+
+    async def wait_replies(self, count: int, timeout: float) -> None:
+        async with asyncio.timeout(timeout):
+            while len(self.replies) < count:
+                await self._replied.wait()
+                self._replied.clear()
+
+    # Long poll
+
+    async def get_long_poll_server(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "response": {
+                    "key": self.key,
+                    "server": f"{self.base_url}/lp",
+                    "ts": str(len(self.events)),
+                }
+            }
+        )
+
+    async def a_check(self, request: web.Request) -> web.Response:
+        if request.query.get("key") != self.key:
+            return web.json_response({"failed": 2})
+
+        ts = int(request.query["ts"])
+        if ts > len(self.events):
+            return web.json_response({"failed": 1, "ts": str(len(self.events))})
+
+        if ts == len(self.events):
+            try:
+                await asyncio.wait_for(
+                    self._pushed.wait(), float(request.query.get("wait", 25))
+                )
+            except TimeoutError:
+                pass
+
+        updates = self.events[ts : ts + self.max_batch]
+        return web.json_response(
+            {"ts": str(ts + len(updates)), "updates": updates}
+        )
+
+    # Методы API
+
+    async def _params(self, request: web.Request) -> dict:
+        if request.method == "POST":
+            return dict(await request.post())
+        return dict(request.query)
+
+    def _throttled(self) -> bool:
+        self.api_calls += 1
+        if self.rate_limit is None:
+            return False
+
+        now = time.monotonic()
+        while self._calls and now - self._calls[0] >= 1:
+            self._calls.popleft()
+        if len(self._calls) >= self.rate_limit:
+            self.rate_limited += 1
+            return True
+        self._calls.append(now)
+        return False
+
+    def _deliver(self, params: dict) -> int:
+        user_id = int(params.get("user_id") or params["peer_id"])
+        random_id = int(params.get("random_id", 0))
+        # Как и VK, не доставляем повторно сообщение с тем же random_id
+        if random_id and (user_id, random_id) in self._random_ids:
+            return len(self.replies)
+        self._random_ids.add((user_id, random_id))
+        self.replies.append(
+            Reply(user_id, params["message"], random_id, time.monotonic())
+        )
+        self._replied.set()
+        return len(self.replies)
+
+    @staticmethod
+    def _error(code: int, message: str) -> web.Response:
+        return web.json_response(
+            {"error": {"error_code": code, "error_msg": message}}
+        )
+
+    async def send(self, request: web.Request) -> web.Response:
+        params = await self._params(request)
+        if self._throttled():
+            return self._error(6, "Too many requests per second")
+        await asyncio.sleep(self.latency)
+        return web.json_response({"response": self._deliver(params)})
+
+    async def execute(self, request: web.Request) -> web.Response:
+        params = await self._params(request)
+        if self._throttled():
+            return self._error(6, "Too many requests per second")
+        await asyncio.sleep(self.latency)
+
+        # Из VKScript поддерживаем только "return [API.messages.send({...}), ...];"
+        code = params["code"]
+        decoder = json.JSONDecoder()
+        results = []
+        position = code.find(SEND_CALL)
+        while position != -1:
+            call, end = decoder.raw_decode(code, position + len(SEND_CALL))
+            results.append(self._deliver(call))
+            position = code.find(SEND_CALL, end)
+        return web.json_response({"response": results})
@@ -1,2 +1,4 @@
 from .bot import *
+from .database import *
+from .game import *
 from .quiz import *
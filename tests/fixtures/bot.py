@@ -1,8 +1,10 @@
+from collections.abc import AsyncIterator, Iterator
 from unittest.mock import AsyncMock
 
 import pytest
 
 from app.store import Store
+from tests.fake_vk import FakeVkServer
 
 
 @pytest.fixture
@@ -10,3 +12,42 @@ def vk_api_send_message_mock(store: Store) -> AsyncMock:
     mock = AsyncMock()
     store.vk_api.send_message = mock
     return mock
+
+
+@pytest.fixture
+def outbox_enabled(store: Store) -> Iterator[None]:
+    store.app.config.outbox.enabled = True
+    yield
+    store.app.config.outbox.enabled = False
+
+
+@pytest.fixture
+async def fake_vk(store: Store) -> AsyncIterator[FakeVkServer]:
+    config = store.app.config
+    server = FakeVkServer(group_id=config.bot.group_id)
+    await server.start()
+
+    saved = (
+        config.bot.api_path,
+        config.bot.persist_state,
+        config.http.long_poll_wait,
+    )
+    config.bot.api_path = server.api_path
+    config.bot.persist_state = False
+    # Короткий long poll, чтобы остановка Poller не ждала 30 секунд
+    config.http.long_poll_wait = 1
+    yield server
+    (
+        config.bot.api_path,
+        config.bot.persist_state,
+        config.http.long_poll_wait,
+    ) = saved
+    await server.close()
+
+
+@pytest.fixture
+def callback_secret(store: Store) -> Iterator[str]:
+    config = store.app.config.bot
+    config.callback_secret = "secret"
+    yield config.callback_secret
+    config.callback_secret = ""
@@ -0,0 +1,109 @@
+from collections.abc import Iterator
+from hashlib import sha256
+
+import pytest
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.admin.models import AdminModel
+from app.quiz.models import AnswerModel, QuestionModel, ThemeModel
+from app.store import Store
+
+SEED_THEMES = 20
+SEED_QUESTIONS_PER_THEME = 250
+SEED_ANSWERS_PER_QUESTION = 4
+SEED_ADMINS = 2000
+
+
+@pytest.fixture
+def recorded_queries(db_engine: AsyncEngine) -> Iterator[list[tuple]]:
+    queries: list[tuple] = []
+
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        if not executemany:
+            queries.append((statement, parameters))
+
+    event.listen(
+        db_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+    )
+    yield queries
+    event.remove(
+        db_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_memory(store: Store) -> Iterator[None]:
+    yield
+    # Приложение общее на всю сессию, а состояние в памяти повторяет
+    # таблицы, которые clear_db очищает после каждого теста
+    games = store.games
+    for game in games.games.values():
+        games._cancel_timer(game)
+    games.games.clear()
+    games.dirty.clear()
+    games.renderer.clear()
+    store.question_bank.clear()
+    store.leaderboard.clear()
+    store.analytics.clear()
+    store.vk_api.callback_events.clear()
+
+
+@pytest.fixture
+async def seeded_db(
+    db_sessionmaker: async_sessionmaker[AsyncSession],
+) -> None:
+    async with db_sessionmaker() as session:
+        await session.execute(
+            insert(ThemeModel),
+            [
+                {"id": theme_id, "title": f"theme {theme_id}"}
+                for theme_id in range(1, SEED_THEMES + 1)
+            ],
+        )
+        questions = [
+            {
+                "id": (theme_id - 1) * SEED_QUESTIONS_PER_THEME + number,
+                "title": f"question {theme_id}-{number}",
+                "theme_id": theme_id,
+            }
+            for theme_id in range(1, SEED_THEMES + 1)
+            for number in range(1, SEED_QUESTIONS_PER_THEME + 1)
+        ]
+        await session.execute(insert(QuestionModel), questions)
+        await session.execute(
+            insert(AnswerModel),
+            [
+                {
+                    "title": f"answer {number}",
+                    "is_correct": number == 0,
+                    "question_id": question["id"],
+                }
+                for question in questions
+                for number in range(SEED_ANSWERS_PER_QUESTION)
+            ],
+        )
+        await session.execute(
+            insert(AdminModel),
+            [
+                {
+                    "email": f"seed-{number}@admin.com",
+                    "password": sha256(str(number).encode()).hexdigest(),
+                }
+                for number in range(SEED_ADMINS)
+            ],
+        )
+        # id заданы явно, поэтому сдвигаем последовательности вручную
+        for table in ("themes", "questions"):
+            await session.execute(
+                text(
+                    f"SELECT setval('{table}_id_seq', "
+                    f"(SELECT max(id) FROM {table}))"
+                )
+            )
+        await session.commit()
+        # Свежая статистика нужна, чтобы планировщик видел реальный объем
+        await session.execute(text("ANALYZE"))
+        await session.commit()
@@ -0,0 +1,9 @@
+import pytest
+
+from app.store import Store
+from app.store.game.engine import GameEngine
+
+
+@pytest.fixture
+def games(store: Store) -> GameEngine:
+    return store.games
@@ -0,0 +1,93 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.game.models import (
+    AnswerEventModel,
+    QuestionStatsModel,
+    RollupWatermarkModel,
+)
+from app.quiz.models import QuestionModel
+from app.store.game.analytics import AnswerEvent, EventRing
+from app.store.game.engine import GameEngine
+from app.web.config import Config
+
+PEER_ID = 2_000_000_001
+
+
+def event(number: int) -> AnswerEvent:
+    return AnswerEvent(
+        number,
+        PEER_ID,
+        1,
+        is_correct=False,
+        answer_time_ms=0,
+        created_at=datetime.now(UTC),
+    )
+
+
+class TestEventRing:
+    def test_overwrites_oldest_and_drains_in_order(self) -> None:
+        ring = EventRing(3)
+        for number in range(5):
+            ring.push(event(number))
+
+        assert ring.dropped == 2
+        assert [e.question_id for e in ring.drain(2)] == [2, 3]
+        ring.push(event(5))
+        ring.push(event(6))
+        assert [e.question_id for e in ring.drain(10)] == [4, 5, 6]
+        assert len(ring) == 0
+
+
+class TestAnswerAnalytics:
+    async def test_answers_are_copied_and_rolled_up(
+        self,
+        games: GameEngine,
+        config: Config,
+        question_1: QuestionModel,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+    ) -> None:
+        analytics = games.app.store.analytics
+        config.analytics.rollup_lag = -1
+        await games.handle_message(PEER_ID, 1, "/start")
+        await games.handle_message(PEER_ID, 2, "bad")
+        await games.handle_message(PEER_ID, 1, "well")
+
+        assert await analytics.flush() == 2
+        try:
+            assert await analytics.rollup() == 2
+            assert await analytics.rollup() == 0
+        finally:
+            config.analytics.rollup_lag = 5
+
+        async with db_sessionmaker() as session:
+            events = (await session.scalars(select(AnswerEventModel))).all()
+            stats = await session.scalar(select(QuestionStatsModel))
+            watermark = await session.scalar(select(RollupWatermarkModel))
+        assert [(e.vk_id, e.is_correct) for e in events] == [
+            (2, False),
+            (1, True),
+        ]
+        assert (stats.question_id, stats.attempts, stats.correct) == (
+            question_1.id,
+            2,
+            1,
+        )
+        assert watermark.last_event_id == max(e.id for e in events)
+
+    async def test_fresh_events_wait_for_lag(
+        self, games: GameEngine, question_1: QuestionModel
+    ) -> None:
+        analytics = games.app.store.analytics
+        analytics.record(
+            question_1.id,
+            PEER_ID,
+            1,
+            is_correct=True,
+            shown_at=datetime.now(UTC) - timedelta(1),
+        )
+
+        assert await analytics.flush() == 1
+        assert await analytics.rollup() == 0
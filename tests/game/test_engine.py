@@ -0,0 +1,109 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.game.models import GameModel, PlayerModel, ScoreModel
+from app.quiz.models import QuestionModel
+from app.store.game.engine import GameEngine
+from app.store.game.state import RoundTimeout
+
+PEER_ID = 2_000_000_001
+
+
+class TestGameEngine:
+    async def test_correct_answer_scores_and_finishes(
+        self, games: GameEngine, question_1: QuestionModel
+    ) -> None:
+        [question] = await games.handle_message(PEER_ID, 1, "/start")
+        assert question.user_id == PEER_ID
+        assert question_1.title in question.text
+
+        assert await games.handle_message(PEER_ID, 2, "bad") == []
+        correct, finished = await games.handle_message(PEER_ID, 1, "Well")
+
+        assert "@id1" in correct.text
+        assert finished.text.startswith("Игра окончена")
+        assert PEER_ID not in games.games
+
+    async def test_start_with_unknown_theme(
+        self, games: GameEngine, question_1: QuestionModel
+    ) -> None:
+        [reply] = await games.handle_message(PEER_ID, 1, "/start 999")
+
+        assert reply.text == "Темы с таким id нет."
+        assert PEER_ID not in games.games
+
+    async def test_only_first_answer_in_round_counts(
+        self, games: GameEngine, question_1: QuestionModel
+    ) -> None:
+        await games.handle_message(PEER_ID, 1, "/start")
+
+        assert await games.handle_message(PEER_ID, 1, "bad") == []
+        assert await games.handle_message(PEER_ID, 1, "Well") == []
+
+        assert games.games[PEER_ID].scores == {1: 0}
+
+    async def test_timeout_of_old_round_is_ignored(
+        self, games: GameEngine, question_1: QuestionModel
+    ) -> None:
+        await games.handle_message(PEER_ID, 1, "/start")
+
+        assert await games.handle_timeout(RoundTimeout(PEER_ID, 0)) == []
+        timed_out, finished = await games.handle_timeout(
+            RoundTimeout(PEER_ID, 1)
+        )
+
+        assert "well" in timed_out.text
+        assert finished.text.startswith("Игра окончена")
+
+    async def test_flush_and_restore(
+        self,
+        games: GameEngine,
+        question_1: QuestionModel,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+    ) -> None:
+        await games.handle_message(PEER_ID, 1, "/start")
+        await games.handle_message(PEER_ID, 2, "bad")
+
+        assert await games.flush() == 1
+        assert await games.flush() == 0
+
+        async with db_sessionmaker() as session:
+            game = await session.scalar(select(GameModel))
+            players = (await session.scalars(select(PlayerModel))).all()
+            scores = (await session.scalars(select(ScoreModel))).all()
+        assert game.peer_id == PEER_ID
+        assert game.question_id == question_1.id
+        assert game.answered_vk_ids == [2]
+        assert [player.vk_id for player in players] == [2]
+        assert [score.points for score in scores] == [0]
+
+        # Имитация рестарта: состояние в памяти потеряно
+        games._cancel_timer(games.games.pop(PEER_ID))
+        [restored] = await games.writer.load_active()
+
+        assert restored.id == game.id
+        assert restored.round == 1
+        assert restored.question.id == question_1.id
+        assert restored.scores == {2: 0}
+        assert restored.answered == {2}
+
+    async def test_restart_in_one_flush_window(
+        self,
+        games: GameEngine,
+        question_1: QuestionModel,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+    ) -> None:
+        await games.handle_message(PEER_ID, 1, "/start")
+        assert await games.flush() == 1
+
+        await games.handle_message(PEER_ID, 1, "/stop")
+        await games.handle_message(PEER_ID, 1, "/start")
+        assert await games.flush() == 2
+        assert not games.dirty
+
+        async with db_sessionmaker() as session:
+            rows = (
+                await session.scalars(select(GameModel).order_by(GameModel.id))
+            ).all()
+        assert [row.status for row in rows] == ["finished", "active"]
+        assert rows[1].id == games.games[PEER_ID].id
@@ -0,0 +1,76 @@
+from app.quiz.models import QuestionModel
+from app.store.game.engine import GameEngine
+from app.store.game.leaderboard import Board, FenwickTree, Leaderboard
+
+PEER_ID = 2_000_000_001
+
+
+class TestFenwickTree:
+    def test_prefix_and_find_after_growth(self) -> None:
+        tree = FenwickTree(size=4)
+        for value in (0, 3, 3, 10):
+            tree.add(value, 1)
+
+        assert len(tree) == 16
+        assert [tree.prefix(value) for value in (0, 2, 3, 9, 10)] == [
+            1,
+            1,
+            3,
+            3,
+            4,
+        ]
+        assert [tree.find(k) for k in (1, 2, 3, 4)] == [0, 3, 3, 10]
+
+
+class TestBoard:
+    def test_rank_and_top_follow_updates(self) -> None:
+        board = Board()
+        board.add(1, 5)
+        board.add(2, 3)
+        board.add(3, 3)
+        board.add(4, 0)
+
+        assert board.top(10) == [(1, 1, 5), (2, 2, 3), (2, 3, 3), (4, 4, 0)]
+        assert board.rank(3) == 2
+
+        board.add(3, 4)
+
+        assert board.rank(3) == 1
+        assert board.rank(1) == 2
+        assert board.top(2, offset=1) == [(2, 1, 5), (3, 2, 3)]
+        assert board.rank(5) is None
+
+
+class TestLeaderboard:
+    async def test_game_scores_update_boards(
+        self, games: GameEngine, question_1: QuestionModel
+    ) -> None:
+        leaderboard = games.app.store.leaderboard
+        await games.handle_message(PEER_ID, 1, "/start")
+        await games.handle_message(PEER_ID, 2, "bad")
+        await games.handle_message(PEER_ID, 1, "well")
+
+        [top] = await games.handle_message(PEER_ID, 2, "/top")
+
+        assert top.text.splitlines() == [
+            "Рейтинг чата:",
+            "1. @id1: 1",
+            "2. @id2: 0",
+            "Ваше место: 2 из 2",
+        ]
+        assert leaderboard.board("global").rank(1) == 1
+        assert leaderboard.board("theme", question_1.theme_id) is None
+
+    async def test_load_seeds_boards_from_scores(
+        self, games: GameEngine, question_1: QuestionModel
+    ) -> None:
+        leaderboard: Leaderboard = games.app.store.leaderboard
+        await games.handle_message(PEER_ID, 1, f"/start {question_1.theme_id}")
+        await games.handle_message(PEER_ID, 1, "well")
+        await games.flush()
+
+        await leaderboard.load()
+
+        assert leaderboard.board("chat", PEER_ID).top(10) == [(1, 1, 1)]
+        assert leaderboard.board("theme", question_1.theme_id).scores == {1: 1}
+        assert leaderboard.board("global").scores == {1: 1}
@@ -0,0 +1,59 @@
+import pytest
+
+from app.store.game.matcher import AnswerMatcher, bounded_distance, normalize
+
+
+class TestNormalize:
+    def test_strips_case_punctuation_and_yo(self) -> None:
+        assert normalize("  Ёлка, «Пушкин»! ") == "елкапушкин"
+
+
+class TestBoundedDistance:
+    @pytest.mark.parametrize(
+        "a, b, limit, expected",
+        (
+            ("москва", "москва", 2, 0),
+            ("москва", "масква", 2, 1),
+            ("москва", "мсква", 2, 1),
+            ("kitten", "sitting", 3, 3),
+            ("kitten", "sitting", 2, 3),
+            ("a", "abcdef", 2, 3),
+            ("", "ab", 2, 2),
+        ),
+    )
+    def test_distance(
+        self, a: str, b: str, limit: int, expected: int
+    ) -> None:
+        assert bounded_distance(a, b, limit) == expected
+        assert bounded_distance(b, a, limit) == expected
+
+
+class TestAnswerMatcher:
+    def test_matches_number_exact_and_typo(self) -> None:
+        matcher = AnswerMatcher(("Москва", "Санкт-Петербург", "1945"))
+
+        assert matcher.match("2") == 1
+        assert matcher.match("1945") == 2
+        assert matcher.match(" санкт петербург ") == 1
+        assert matcher.match("Масква") == 0
+        assert matcher.match("Казань") is None
+        assert matcher.match("") is None
+
+    def test_short_answers_need_exact_match(self) -> None:
+        matcher = AnswerMatcher(("да", "нет"))
+
+        assert matcher.match("ДА!") == 0
+        assert matcher.match("дп") is None
+
+    def test_option_text_wins_over_its_number(self) -> None:
+        matcher = AnswerMatcher(("3", "1", "2"))
+
+        assert matcher.match("1") == 1
+        assert matcher.match("3", order=(2, 0, 1)) == 0
+        assert AnswerMatcher(("4", "6", "8")).match("2") == 1
+
+    def test_ambiguous_typo_is_rejected(self) -> None:
+        matcher = AnswerMatcher(("кошка", "мошка"))
+
+        assert matcher.match("ошка") is None
+        assert matcher.match("кошк") == 0
@@ -0,0 +1,43 @@
+import json
+
+from app.store.game.renderer import QuestionRenderer
+from app.store.game.state import GameQuestion
+
+QUESTION = GameQuestion(1, "Столица?", ("Москва", "Тверь", "Казань"), 0)
+
+
+class TestQuestionRenderer:
+    def test_render_is_cached_per_layout(self) -> None:
+        renderer = QuestionRenderer(layouts=4)
+
+        first = renderer.render(QUESTION, 1)
+
+        assert renderer.render(QUESTION, 1) is first
+        assert renderer.render(QUESTION, 5) is first
+        assert renderer.render(QUESTION, 2) is not first
+        assert renderer.stats() == {"size": 2, "hits": 2, "misses": 2}
+
+    def test_layouts_are_distinct_permutations(self) -> None:
+        renderer = QuestionRenderer(layouts=4)
+
+        permutations = renderer.permutations(3)
+
+        assert permutations[0] == (0, 1, 2)
+        assert len(set(permutations)) == 4
+        assert all(sorted(order) == [0, 1, 2] for order in permutations)
+        assert len(renderer.permutations(2)) == 2
+        assert QuestionRenderer(layouts=4).permutations(3) == permutations
+
+    def test_body_and_keyboard_follow_layout(self) -> None:
+        rendered = QuestionRenderer(layouts=4).render(QUESTION, 3)
+
+        labels = [
+            row[0]["action"]["label"]
+            for row in json.loads(rendered.keyboard)["buttons"]
+        ]
+        options = [QUESTION.options[index] for index in rendered.order]
+        assert labels == options
+        lines = [f"{n}. {option}" for n, option in enumerate(options, 1)]
+        assert rendered.body.splitlines() == ["Столица?", *lines]
+        number = rendered.order.index(QUESTION.correct) + 1
+        assert QUESTION.matcher.match(str(number), rendered.order) == 0
@@ -0,0 +1,37 @@
+from aiohttp.test_utils import TestClient
+
+from app.store import Store
+
+PEER_ID = 2_000_000_001
+
+
+class TestLeaderboardView:
+    async def test_unauthorized(self, cli: TestClient) -> None:
+        response = await cli.get("/game.leaderboard")
+        assert response.status == 401
+
+    async def test_bad_request_without_id(self, auth_cli: TestClient) -> None:
+        response = await auth_cli.get(
+            "/game.leaderboard", params={"scope": "chat"}
+        )
+        assert response.status == 400
+
+    async def test_success(self, auth_cli: TestClient, store: Store) -> None:
+        store.leaderboard.record(PEER_ID, None, 1, 3)
+        store.leaderboard.record(PEER_ID, None, 2, 5)
+
+        response = await auth_cli.get(
+            "/game.leaderboard",
+            params={"scope": "chat", "id": PEER_ID, "vk_id": 1, "limit": 1},
+        )
+        store.leaderboard.clear()
+        assert response.status == 200
+
+        data = await response.json()
+        assert data["data"] == {
+            "scope": "chat",
+            "id": PEER_ID,
+            "total": 2,
+            "players": [{"rank": 1, "vk_id": 2, "score": 5}],
+            "player": {"rank": 2, "vk_id": 1, "score": 3},
+        }
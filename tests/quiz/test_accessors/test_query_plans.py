@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.quiz.models import AnswerModel
+from app.store import Store
+from tests.utils import find_seq_scans
+
+# Полный просмотр таблицы допустим только для небольших справочников
+SEQ_SCAN_ROW_THRESHOLD = 100
+
+
+@pytest.mark.usefixtures("seeded_db")
+class TestQuizAccessorQueryPlans:
+    async def assert_index_only_plans(
+        self, db_engine: AsyncEngine, recorded_queries: list[tuple]
+    ) -> None:
+        assert recorded_queries
+        problems = await find_seq_scans(
+            db_engine, list(recorded_queries), SEQ_SCAN_ROW_THRESHOLD
+        )
+        assert problems == []
+
+    async def test_get_theme_by_title(
+        self, store: Store, db_engine: AsyncEngine, recorded_queries: list
+    ) -> None:
+        await store.quizzes.get_theme_by_title("theme 7")
+        await self.assert_index_only_plans(db_engine, recorded_queries)
+
+    async def test_get_theme_by_id(
+        self, store: Store, db_engine: AsyncEngine, recorded_queries: list
+    ) -> None:
+        await store.quizzes.get_theme_by_id(7)
+        await self.assert_index_only_plans(db_engine, recorded_queries)
+
+    async def test_list_questions_by_theme(
+        self, store: Store, db_engine: AsyncEngine, recorded_queries: list
+    ) -> None:
+        questions = await store.quizzes.list_questions(theme_id=7)
+        assert questions
+        await self.assert_index_only_plans(db_engine, recorded_queries)
+
+    async def test_get_question_by_title(
+        self, store: Store, db_engine: AsyncEngine, recorded_queries: list
+    ) -> None:
+        question = await store.quizzes.get_question_by_title("question 7-15")
+        assert question is not None
+        await self.assert_index_only_plans(db_engine, recorded_queries)
+
+    async def test_create_question(
+        self, store: Store, db_engine: AsyncEngine, recorded_queries: list
+    ) -> None:
+        await store.quizzes.create_question(
+            "new question",
+            7,
+            [
+                AnswerModel(title="1", is_correct=True),
+                AnswerModel(title="2", is_correct=False),
+            ],
+        )
+        await self.assert_index_only_plans(db_engine, recorded_queries)
@@ -167,3 +167,80 @@ class TestQuestionsAccessor:
             )
 
         assert len(db_answers.all()) == 0
+
+    async def test_get_questions_by_ids_preserves_order(
+        self, store: Store, question_1: QuestionModel, question_2: QuestionModel
+    ):
+        questions = await store.quizzes.get_questions_by_ids(
+            [question_2.id, 100500, question_1.id]
+        )
+        assert questions_to_dict(questions) == [
+            question_to_dict(question_2),
+            question_to_dict(question_1),
+        ]
+        assert [answer.title for answer in questions[0].answers] == [
+            "yep",
+            "nop",
+        ]
+
+
+class TestAnswersSnapshot:
+    @pytest.fixture(autouse=True)
+    def enable_snapshot(self, store: Store):
+        store.app.config.quiz.answers_snapshot = True
+        yield
+        store.app.config.quiz.answers_snapshot = False
+
+    async def test_create_question_writes_snapshot(
+        self, store: Store, theme_1: ThemeModel
+    ):
+        await store.quizzes.create_question(
+            "title",
+            theme_1.id,
+            [
+                AnswerModel(title="1", is_correct=True),
+                AnswerModel(title="2", is_correct=False),
+            ],
+        )
+
+        question = await store.quizzes.get_question_by_title("title")
+        assert question.answers_snapshot == [
+            {"title": "1", "is_correct": True},
+            {"title": "2", "is_correct": False},
+        ]
+        assert [(a.title, a.is_correct) for a in question.answers] == [
+            ("1", True),
+            ("2", False),
+        ]
+        assert await store.quizzes.find_answers_snapshot_drift() == []
+
+    async def test_fallback_to_answers_without_snapshot(
+        self, store: Store, question_1: QuestionModel
+    ):
+        questions = await store.quizzes.list_questions()
+        assert [a.title for a in questions[0].answers] == ["well", "bad"]
+
+    async def test_drift_detected_and_rebuilt(
+        self,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+        store: Store,
+        question_1: QuestionModel,
+    ):
+        assert await store.quizzes.find_answers_snapshot_drift() == [
+            question_1.id
+        ]
+
+        await store.quizzes.rebuild_answers_snapshots()
+        assert await store.quizzes.find_answers_snapshot_drift() == []
+
+        async with db_sessionmaker() as session:
+            await session.execute(
+                delete(AnswerModel).where(
+                    AnswerModel.id == question_1.answers[1].id
+                )
+            )
+            await session.commit()
+
+        assert await store.quizzes.find_answers_snapshot_drift() == [
+            question_1.id
+        ]
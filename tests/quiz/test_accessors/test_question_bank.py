@@ -0,0 +1,380 @@
+import os
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.quiz.models import (
+    AnswerModel,
+    QuestionDeletionModel,
+    QuestionModel,
+    ThemeModel,
+)
+from app.store import Store
+from app.store.quiz import bank as bank_module
+from app.store.quiz.bank import (
+    DELETIONS_RETENTION,
+    QuestionBank,
+    QuestionDeck,
+)
+from app.store.quiz.snapshot import (
+    HEADER,
+    SECTION,
+    QuestionSegment,
+    SnapshotError,
+    open_snapshot,
+    write_snapshot,
+)
+
+
+@pytest.fixture
+def bank(store: Store) -> Iterator[QuestionBank]:
+    yield store.question_bank
+    store.question_bank.clear()
+
+
+@pytest.fixture
+def eager_reload(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Индекс пересобирается после каждого удаления
+    monkeypatch.setattr(bank_module, "RELOAD_MIN_DELETED", 0)
+    monkeypatch.setattr(bank_module, "RELOAD_DELETED_SHARE", 0)
+
+
+@pytest.fixture
+def snapshot_path(store: Store, tmp_path: Path) -> Iterator[str]:
+    path = str(tmp_path / "bank.bin")
+    store.app.config.quiz.bank_snapshot_path = path
+    yield path
+    store.app.config.quiz.bank_snapshot_path = ""
+    store.question_bank._snapshot_stale = None
+
+
+class TestQuestionDeck:
+    def test_draws_every_item_once(self) -> None:
+        deck = QuestionDeck(None, None, 3, generation=1)
+
+        drawn = [deck.draw() for _ in range(3)]
+
+        assert sorted(drawn) == [0, 1, 2]
+        assert deck.draw() is None
+
+    def test_extend_adds_new_items(self) -> None:
+        pool = [10, 20]
+        deck = QuestionDeck(1, pool, len(pool), generation=1)
+        first = deck.draw()
+        pool.extend([30, 40])
+        deck.extend(len(pool))
+
+        rest = [deck.draw() for _ in range(3)]
+
+        assert sorted([first, *rest]) == [10, 20, 30, 40]
+        assert deck.draw() is None
+
+
+class TestQuestionSnapshot:
+    def test_roundtrip(self, tmp_path: Path) -> None:
+        segment = QuestionSegment()
+        segment.append(3, 1, "Столица?", [("Москва", True), ("Тверь", False)])
+        segment.append(8, 2, "no answers", [])
+        path = str(tmp_path / "bank.bin")
+
+        write_snapshot(path, segment, {1: "География", 5: "empty"}, max_id=8)
+        snapshot = open_snapshot(path)
+
+        assert snapshot.max_id == 8
+        assert list(snapshot.segment.ids) == [3, 8]
+        question = snapshot.segment.question(0)
+        assert question.title == "Столица?"
+        assert question.options == ("Москва", "Тверь")
+        assert question.correct_answer == "Москва"
+        assert snapshot.segment.question(1).options == ()
+        assert {
+            theme_id: (title, list(positions))
+            for theme_id, (title, positions) in snapshot.themes.items()
+        } == {1: ("География", [0]), 2: ("", [1]), 5: ("empty", [])}
+        assert not [name for name in os.listdir(tmp_path) if ".tmp" in name]
+
+    def test_first_correct_answer_is_kept(self) -> None:
+        segment = QuestionSegment()
+        segment.append(1, 1, "?", [("a", False), ("b", True), ("c", True)])
+
+        assert segment.question(0).correct_answer == "b"
+
+    def test_many_answers_roundtrip(self, tmp_path: Path) -> None:
+        answers = [(f"ответ {number}", number == 300) for number in range(400)]
+        segment = QuestionSegment()
+        segment.append(1, 1, "?", answers)
+        path = str(tmp_path / "bank.bin")
+
+        write_snapshot(path, segment, {1: "Много"}, max_id=1)
+        question = open_snapshot(path).segment.question(0)
+
+        assert len(question.options) == 400
+        assert question.correct_answer == "ответ 300"
+
+    @pytest.mark.parametrize("cut", (1, 100, 1000))
+    def test_truncated_file_is_rejected(self, tmp_path: Path, cut: int) -> None:
+        segment = QuestionSegment()
+        segment.append(3, 1, "Столица?", [("Москва", True), ("Тверь", False)])
+        path = tmp_path / "bank.bin"
+        write_snapshot(str(path), segment, {1: "География"}, max_id=3)
+        data = path.read_bytes()
+        path.write_bytes(data[: max(0, len(data) - cut)])
+
+        with pytest.raises(SnapshotError):
+            open_snapshot(str(path))
+
+    def test_misaligned_section_is_rejected(self, tmp_path: Path) -> None:
+        segment = QuestionSegment()
+        segment.append(3, 1, "Столица?", [("Москва", True)])
+        path = tmp_path / "bank.bin"
+        write_snapshot(str(path), segment, {}, max_id=3)
+        with path.open("r+b") as file:
+            file.seek(HEADER.size)
+            file.write(SECTION.pack(1, 4))
+
+        with pytest.raises(SnapshotError):
+            open_snapshot(str(path))
+
+
+class TestQuestionBank:
+    async def test_load_and_draw_without_repeats(
+        self,
+        bank: QuestionBank,
+        question_1: QuestionModel,
+        question_2: QuestionModel,
+    ) -> None:
+        await bank.load()
+        deck = bank.deck(question_1.theme_id)
+
+        first, second = bank.draw(deck), bank.draw(deck)
+
+        assert {first.id, second.id} == {question_1.id, question_2.id}
+        assert bank.draw(deck) is None
+        loaded = bank.get_by_id(question_1.id)
+        assert loaded.title == question_1.title
+        assert loaded.options == tuple(a.title for a in question_1.answers)
+        assert loaded.correct_answer == "well"
+
+    async def test_created_question_is_added(
+        self, store: Store, bank: QuestionBank, theme_1: ThemeModel
+    ) -> None:
+        await bank.load()
+        deck = bank.deck(theme_1.id)
+        assert bank.draw(deck) is None
+
+        question = await store.quizzes.create_question(
+            title="new?",
+            theme_id=theme_1.id,
+            answers=[
+                AnswerModel(title="yes", is_correct=True),
+                AnswerModel(title="no", is_correct=False),
+            ],
+        )
+
+        assert bank.draw(deck).id == question.id
+
+    async def test_delete_is_hidden_without_reload(
+        self,
+        store: Store,
+        bank: QuestionBank,
+        question_1: QuestionModel,
+        question_2: QuestionModel,
+    ) -> None:
+        await bank.load()
+        await store.quizzes.delete_questions([question_1.id])
+
+        # Единичное удаление не пересобирает индекс: старый индекс
+        # отдает все, кроме удаленного
+        assert bank._reload_task is None
+        assert bank.index.position(question_1.id) is not None
+        assert bank.get_by_id(question_1.id) is None
+        deck = bank.deck(question_1.theme_id)
+        assert bank.draw(deck).id == question_2.id
+        assert bank.draw(deck) is None
+
+    async def test_many_deletes_reload_in_background(
+        self,
+        store: Store,
+        bank: QuestionBank,
+        eager_reload: None,
+        question_1: QuestionModel,
+        question_2: QuestionModel,
+    ) -> None:
+        await bank.load()
+        await store.quizzes.delete_questions([question_1.id])
+
+        assert bank.get_by_id(question_1.id) is None
+        await bank._reload_task
+        assert bank.index.position(question_1.id) is None
+        assert bank.deleted == set()
+        assert bank.get_by_id(question_2.id) is not None
+
+    async def test_deleted_theme_is_hidden(
+        self, store: Store, bank: QuestionBank, question_1: QuestionModel
+    ) -> None:
+        await bank.load()
+        await store.quizzes.delete_theme(question_1.theme_id)
+
+        assert not bank.has_theme(question_1.theme_id)
+        assert bank.draw(bank.deck()) is None
+
+    async def test_deletes_are_logged(
+        self,
+        store: Store,
+        question_1: QuestionModel,
+        question_2: QuestionModel,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+    ) -> None:
+        await store.quizzes.delete_questions([question_1.id])
+        await store.quizzes.delete_theme(question_2.theme_id)
+
+        async with db_sessionmaker() as session:
+            logged = await session.execute(
+                select(
+                    QuestionDeletionModel.question_id,
+                    QuestionDeletionModel.theme_id,
+                ).order_by(QuestionDeletionModel.id)
+            )
+            assert logged.all() == [
+                (question_1.id, None),
+                (None, question_2.theme_id),
+            ]
+
+    async def test_old_log_entries_are_pruned(
+        self,
+        store: Store,
+        question_1: QuestionModel,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+    ) -> None:
+        async with db_sessionmaker() as session:
+            await session.execute(
+                insert(QuestionDeletionModel).values(
+                    question_id=question_1.id + 100,
+                    created_at=datetime.now(UTC)
+                    - DELETIONS_RETENTION
+                    - timedelta(minutes=1),
+                )
+            )
+            await session.commit()
+
+        await store.quizzes.delete_questions([question_1.id])
+
+        async with db_sessionmaker() as session:
+            logged = await session.scalars(
+                select(QuestionDeletionModel.question_id)
+            )
+            assert list(logged) == [question_1.id]
+
+    async def test_load_starts_after_existing_log(
+        self,
+        bank: QuestionBank,
+        question_1: QuestionModel,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+    ) -> None:
+        async with db_sessionmaker() as session:
+            await session.execute(
+                insert(QuestionDeletionModel),
+                [{"question_id": id_} for id_ in range(1000, 1010)],
+            )
+            last = await session.scalar(
+                select(func.max(QuestionDeletionModel.id))
+            )
+            await session.commit()
+
+        await bank.load()
+
+        assert bank.deletions_seen == last
+        assert bank.get_by_id(question_1.id) is not None
+
+    async def test_refresh_applies_deletes_from_other_workers(
+        self,
+        bank: QuestionBank,
+        question_1: QuestionModel,
+        question_2: QuestionModel,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+    ) -> None:
+        await bank.load()
+        # Вопрос удалил другой воркер: в этот банк уведомление не пришло
+        async with db_sessionmaker() as session:
+            await session.execute(
+                delete(QuestionModel).where(QuestionModel.id == question_1.id)
+            )
+            await session.execute(
+                insert(QuestionDeletionModel).values(question_id=question_1.id)
+            )
+            await session.commit()
+        assert bank.get_by_id(question_1.id) is not None
+
+        await bank.refresh()
+
+        assert bank.get_by_id(question_1.id) is None
+        assert bank.get_by_id(question_2.id) is not None
+
+    async def test_refresh_applies_theme_deletes_from_other_workers(
+        self,
+        bank: QuestionBank,
+        question_1: QuestionModel,
+        question_2: QuestionModel,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+    ) -> None:
+        await bank.load()
+        theme_id = question_1.theme_id
+        async with db_sessionmaker() as session:
+            await session.execute(
+                delete(ThemeModel).where(ThemeModel.id == theme_id)
+            )
+            await session.execute(
+                insert(QuestionDeletionModel).values(theme_id=theme_id)
+            )
+            await session.commit()
+
+        await bank.refresh()
+
+        assert not bank.has_theme(theme_id)
+        assert bank.get_by_id(question_1.id) is None
+        assert bank.get_by_id(question_2.id) is None
+
+    async def test_load_from_snapshot_and_delta(
+        self,
+        store: Store,
+        bank: QuestionBank,
+        snapshot_path: str,
+        question_1: QuestionModel,
+    ) -> None:
+        await bank.load()
+        bank.write_snapshot(snapshot_path)
+        question = await store.quizzes.create_question(
+            title="after snapshot?",
+            theme_id=question_1.theme_id,
+            answers=[AnswerModel(title="yes", is_correct=True)],
+        )
+        bank.clear()
+
+        await bank.load()
+
+        assert len(bank.index.base) == 1
+        assert bank.get_by_id(question_1.id).title == question_1.title
+        assert bank.get_by_id(question.id).title == "after snapshot?"
+
+    async def test_delete_bypasses_stale_snapshot(
+        self,
+        store: Store,
+        bank: QuestionBank,
+        snapshot_path: str,
+        eager_reload: None,
+        question_1: QuestionModel,
+    ) -> None:
+        await bank.load()
+        bank.write_snapshot(snapshot_path)
+        bank.clear()
+        await bank.load()
+
+        await store.quizzes.delete_questions([question_1.id])
+        await bank._reload_task
+
+        assert bank.snapshot is None
+        assert bank.get_by_id(question_1.id) is None
@@ -22,6 +22,7 @@ class TestThemeIntegration:
                     {
                         "id": add_theme_response_data["data"]["id"],
                         "title": "integration",
+                        "question_count": 0,
                     },
                 ],
             },
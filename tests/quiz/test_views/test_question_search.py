@@ -0,0 +1,96 @@
+from aiohttp.test_utils import TestClient
+
+from app.quiz.models import QuestionModel, ThemeModel
+
+
+class TestQuestionSearchView:
+    async def test_unauthorized(self, cli: TestClient) -> None:
+        response = await cli.get(
+            "/quiz.search_questions", params={"query": "how"}
+        )
+        assert response.status == 401
+
+        data = await response.json()
+        assert data["status"] == "unauthorized"
+
+    async def test_bad_request_when_missed_query(
+        self, auth_cli: TestClient
+    ) -> None:
+        response = await auth_cli.get("/quiz.search_questions")
+        assert response.status == 400
+
+        data = await response.json()
+        assert data["status"] == "bad_request"
+
+    async def test_success_prefix_match(
+        self,
+        auth_cli: TestClient,
+        question_1: QuestionModel,
+        question_2: QuestionModel,
+    ) -> None:
+        response = await auth_cli.get(
+            "/quiz.search_questions", params={"query": "how are y"}
+        )
+        assert response.status == 200
+
+        data = await response.json()
+        assert [q["id"] for q in data["data"]["questions"]] == [question_1.id]
+        assert data["data"]["limit"] == 20
+        assert data["data"]["offset"] == 0
+
+    async def test_success_typo_tolerant(
+        self, auth_cli: TestClient, question_1: QuestionModel
+    ) -> None:
+        response = await auth_cli.get(
+            "/quiz.search_questions", params={"query": "how are yuo?"}
+        )
+        assert response.status == 200
+
+        data = await response.json()
+        assert [q["id"] for q in data["data"]["questions"]] == [question_1.id]
+
+    async def test_short_typo_in_long_title(
+        self,
+        auth_cli: TestClient,
+        question_1: QuestionModel,
+        question_2: QuestionModel,
+    ) -> None:
+        # С опечаткой полнотекстовый поиск не находит ничего, а похожесть
+        # на весь заголовок слишком мала
+        response = await auth_cli.get(
+            "/quiz.search_questions", params={"query": "doinf"}
+        )
+        assert response.status == 200
+
+        data = await response.json()
+        assert [q["id"] for q in data["data"]["questions"]] == [question_2.id]
+
+    async def test_filter_by_theme(
+        self,
+        auth_cli: TestClient,
+        question_1: QuestionModel,
+        theme_2: ThemeModel,
+    ) -> None:
+        response = await auth_cli.get(
+            "/quiz.search_questions",
+            params={"query": "how", "theme_id": theme_2.id},
+        )
+        assert response.status == 200
+
+        data = await response.json()
+        assert data["data"]["questions"] == []
+
+    async def test_pagination(
+        self,
+        auth_cli: TestClient,
+        question_1: QuestionModel,
+        question_2: QuestionModel,
+    ) -> None:
+        response = await auth_cli.get(
+            "/quiz.search_questions",
+            params={"query": "you", "limit": 1, "offset": 1},
+        )
+        assert response.status == 200
+
+        data = await response.json()
+        assert len(data["data"]["questions"]) == 1
@@ -0,0 +1,46 @@
+import pytest
+from aiohttp.test_utils import TestClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.game.models import QuestionStatsModel
+
+
+class TestQuestionStatsView:
+    async def test_unauthorized(self, cli: TestClient) -> None:
+        response = await cli.get("/quiz.question_stats")
+        assert response.status == 401
+
+    async def test_hardest_first(
+        self,
+        auth_cli: TestClient,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+    ) -> None:
+        async with db_sessionmaker() as session:
+            await session.execute(
+                insert(QuestionStatsModel),
+                [
+                    {
+                        "question_id": 1,
+                        "attempts": 4,
+                        "correct": 3,
+                        "total_answer_time_ms": 4000,
+                    },
+                    {
+                        "question_id": 2,
+                        "attempts": 10,
+                        "correct": 1,
+                        "total_answer_time_ms": 50000,
+                    },
+                ],
+            )
+            await session.commit()
+
+        response = await auth_cli.get("/quiz.question_stats")
+        assert response.status == 200
+
+        data = await response.json()
+        stats = data["data"]["stats"]
+        assert [item["question_id"] for item in stats] == [2, 1]
+        assert stats[0]["correct_rate"] == pytest.approx(0.1)
+        assert stats[0]["avg_answer_time_ms"] == 5000
@@ -0,0 +1,70 @@
+from aiohttp.test_utils import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.quiz.models import AnswerModel, QuestionModel
+
+
+class TestQuestionsDeleteView:
+    async def test_unauthorized(self, cli: TestClient) -> None:
+        response = await cli.post("/quiz.delete_questions", json={"ids": [1]})
+        assert response.status == 401
+
+        data = await response.json()
+        assert data["status"] == "unauthorized"
+
+    async def test_bad_request_when_empty_ids(
+        self, auth_cli: TestClient
+    ) -> None:
+        response = await auth_cli.post(
+            "/quiz.delete_questions", json={"ids": []}
+        )
+        assert response.status == 400
+
+        data = await response.json()
+        assert data["status"] == "bad_request"
+
+    async def test_no_limit_on_ids(self, auth_cli: TestClient) -> None:
+        # Лимит batch-чтения не распространяется на удаление
+        response = await auth_cli.post(
+            "/quiz.delete_questions", json={"ids": list(range(1, 1002))}
+        )
+        assert response.status == 200
+
+        data = await response.json()
+        assert data == {
+            "status": "ok",
+            "data": {"questions": 0, "answers": 0},
+        }
+
+    async def test_success(
+        self,
+        auth_cli: TestClient,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+        question_1: QuestionModel,
+        question_2: QuestionModel,
+    ) -> None:
+        response = await auth_cli.post(
+            "/quiz.delete_questions",
+            json={"ids": [question_1.id, question_1.id + 100]},
+        )
+        assert response.status == 200
+
+        data = await response.json()
+        assert data == {
+            "status": "ok",
+            "data": {"questions": 1, "answers": 2},
+        }
+
+        async with db_sessionmaker() as session:
+            questions = list(await session.scalars(select(QuestionModel)))
+            answers = list(
+                await session.scalars(
+                    select(AnswerModel).where(
+                        AnswerModel.question_id == question_1.id
+                    )
+                )
+            )
+
+        assert [q.id for q in questions] == [question_2.id]
+        assert answers == []
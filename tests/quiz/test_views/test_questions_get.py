@@ -0,0 +1,46 @@
+from aiohttp.test_utils import TestClient
+
+from app.quiz.models import QuestionModel
+
+
+class TestQuestionsGetView:
+    async def test_unauthorized(self, cli: TestClient) -> None:
+        response = await cli.post("/quiz.get_questions", json={"ids": [1]})
+        assert response.status == 401
+
+        data = await response.json()
+        assert data["status"] == "unauthorized"
+
+    async def test_success_with_missing(
+        self,
+        auth_cli: TestClient,
+        question_1: QuestionModel,
+        question_2: QuestionModel,
+    ) -> None:
+        response = await auth_cli.post(
+            "/quiz.get_questions",
+            json={"ids": [question_2.id, 100500, question_1.id]},
+        )
+        assert response.status == 200
+
+        data = await response.json()
+        assert [q["id"] for q in data["data"]["questions"]] == [
+            question_2.id,
+            question_1.id,
+        ]
+        assert data["data"]["questions"][0]["answers"] == [
+            {"title": "yep", "is_correct": True},
+            {"title": "nop", "is_correct": False},
+        ]
+        assert data["data"]["missing_ids"] == [100500]
+
+    async def test_bad_request_when_too_many_ids(
+        self, auth_cli: TestClient
+    ) -> None:
+        response = await auth_cli.post(
+            "/quiz.get_questions", json={"ids": list(range(1, 1002))}
+        )
+        assert response.status == 400
+
+        data = await response.json()
+        assert data["status"] == "bad_request"
@@ -31,6 +31,7 @@ class TestThemeAddView:
             "data": {
                 "id": data["data"]["id"],
                 "title": "web-development",
+                "question_count": 0,
             },
         }
 
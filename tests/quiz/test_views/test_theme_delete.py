@@ -0,0 +1,50 @@
+from aiohttp.test_utils import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.quiz.models import AnswerModel, QuestionModel, ThemeModel
+
+
+class TestThemeDeleteView:
+    async def test_unauthorized(self, cli: TestClient) -> None:
+        response = await cli.post("/quiz.delete_theme", json={"theme_id": 1})
+        assert response.status == 401
+
+        data = await response.json()
+        assert data["status"] == "unauthorized"
+
+    async def test_not_found(self, auth_cli: TestClient) -> None:
+        response = await auth_cli.post(
+            "/quiz.delete_theme", json={"theme_id": 1}
+        )
+        assert response.status == 404
+
+        data = await response.json()
+        assert data["status"] == "not_found"
+
+    async def test_success_cascade(
+        self,
+        auth_cli: TestClient,
+        db_sessionmaker: async_sessionmaker[AsyncSession],
+        question_1: QuestionModel,
+        question_2: QuestionModel,
+    ) -> None:
+        response = await auth_cli.post(
+            "/quiz.delete_theme", json={"theme_id": question_1.theme_id}
+        )
+        assert response.status == 200
+
+        data = await response.json()
+        assert data == {
+            "status": "ok",
+            "data": {"themes": 1, "questions": 2, "answers": 4},
+        }
+
+        async with db_sessionmaker() as session:
+            themes = list(await session.scalars(select(ThemeModel)))
+            questions = list(await session.scalars(select(QuestionModel)))
+            answers = list(await session.scalars(select(AnswerModel)))
+
+        assert themes == []
+        assert questions == []
+        assert answers == []
@@ -1,6 +1,6 @@
 from aiohttp.test_utils import TestClient
 
-from app.quiz.models import ThemeModel
+from app.quiz.models import QuestionModel, ThemeModel
 
 
 class TestThemeList:
@@ -37,6 +37,7 @@ class TestThemeList:
                     {
                         "id": theme_1.id,
                         "title": theme_1.title,
+                        "question_count": 0,
                     }
                 ],
             },
@@ -56,11 +57,37 @@ class TestThemeList:
                     {
                         "id": theme_1.id,
                         "title": theme_1.title,
+                        "question_count": 0,
                     },
                     {
                         "id": theme_2.id,
                         "title": theme_2.title,
+                        "question_count": 0,
                     },
                 ],
             },
         }
+
+    async def test_question_count(
+        self,
+        auth_cli: TestClient,
+        question_1: QuestionModel,
+        question_2: QuestionModel,
+        theme_2: ThemeModel,
+    ) -> None:
+        response = await auth_cli.get("/quiz.list_themes")
+        assert response.status == 200
+
+        data = await response.json()
+        assert [
+            (theme["id"], theme["question_count"])
+            for theme in data["data"]["themes"]
+        ] == [(question_1.theme_id, 2), (theme_2.id, 0)]
+
+        await auth_cli.post(
+            "/quiz.delete_questions", json={"ids": [question_1.id]}
+        )
+
+        response = await auth_cli.get("/quiz.list_themes")
+        data = await response.json()
+        assert data["data"]["themes"][0]["question_count"] == 1
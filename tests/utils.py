@@ -1,5 +1,9 @@
+import json
 from collections.abc import Iterable
 
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
 from app.quiz.models import AnswerModel, QuestionModel, ThemeModel
 
 
@@ -37,3 +41,49 @@ def answer_to_dict(answer: AnswerModel) -> dict:
 
 def answers_to_dict(answers: Iterable[AnswerModel]) -> list[dict]:
     return [answer_to_dict(answer) for answer in answers]
+
+
+def _iter_plan_nodes(node: dict) -> Iterable[dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _iter_plan_nodes(child)
+
+
+async def find_seq_scans(
+    engine: AsyncEngine, queries: Iterable[tuple], row_threshold: int
+) -> list[str]:
+    """Возвращает Seq Scan по таблицам крупнее row_threshold строк."""
+    problems = []
+    async with engine.connect() as conn:
+        for statement, parameters in queries:
+            if (
+                not statement.lstrip()
+                .upper()
+                .startswith(("SELECT", "UPDATE", "DELETE", "WITH"))
+            ):
+                continue
+
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement}", parameters
+            )
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            for node in _iter_plan_nodes(plan[0]["Plan"]):
+                if node["Node Type"] != "Seq Scan":
+                    continue
+                relation = node["Relation Name"]
+                rows = await conn.scalar(
+                    text(
+                        "SELECT reltuples::bigint FROM pg_class "
+                        "WHERE oid = to_regclass(:relation)"
+                    ),
+                    {"relation": relation},
+                )
+                if rows is not None and rows > row_threshold:
+                    problems.append(
+                        f"Seq Scan on {relation} ({rows} rows): {statement}"
+                    )
+        await conn.rollback()
+    return problems